@@ -0,0 +1,32 @@
+#/********************************************************************************
+# * Copyright (c) 2014, 2018 Cirrus Link Solutions and others
+# *
+# * This program and the accompanying materials are made available under the
+# * terms of the Eclipse Public License 2.0 which is available at
+# * http://www.eclipse.org/legal/epl-2.0.
+# *
+# * SPDX-License-Identifier: EPL-2.0
+# *
+# * Contributors:
+# *   Cirrus Link Solutions - initial implementation
+# ********************************************************************************/
+
+# Builds the optional native payload codec used by sparkplug_b_native from
+# the nanopb code in client_libraries/c:
+#   python3 setup_native.py build_ext --inplace
+from setuptools import setup, Extension
+
+NANOPB = "../c/"
+
+setup(
+    name="sparkplug_b_native",
+    ext_modules=[
+        Extension("_sparkplug_b_native",
+            sources=["sparkplug_b_native.c"] + [NANOPB + "src/" + source for source in ("pb_common.c", "pb_encode.c", "pb_decode.c", "tahu.pb.c")],
+            include_dirs=[NANOPB + "include"],
+            # sparkplug_b.proto is proto2 without [packed=true], encode
+            # repeated scalars unpacked like the protobuf runtime does
+            define_macros=[("PB_ENCODE_ARRAYS_UNPACKED", "1")],
+            extra_compile_args=["-O2"]),
+    ],
+)
@@ -10,13 +10,62 @@
 # * Contributors:
 # *   Cirrus Link Solutions - initial implementation
 # ********************************************************************************/
-import sparkplug_b_pb2
+import numbers
 import time
-from sparkplug_b_pb2 import Payload
+
+# The protobuf runtime takes longer to import than everything else, so
+# sparkplug_b_pb2 is only imported by the first helper that needs it,
+# see _payloadClass()
+_Payload = None
+
+# NumPy takes longer to import than the rest of the library so it is
+# only imported by the first bulk helper that can use it, see _numpy()
+numpy = False
+
+try:
+    _stringTypes = (str, unicode)
+except NameError:
+    _stringTypes = (str,)
 
 seqNum = 0
 bdSeq = 0
 
+######################################################################
+# Protobuf runtime backend in use: "python", "cpp" or "upb".  The bulk
+# helpers pick the fastest way of filling messages for the backend.
+######################################################################
+def protobufBackend():
+    try:
+        from google.protobuf.internal import api_implementation
+        return api_implementation.Type()
+    except ImportError:
+        return "python"
+######################################################################
+
+_nativeBackend = protobufBackend() != "python"
+
+######################################################################
+# The Payload message class, importing sparkplug_b_pb2 on first use.
+# The module attributes sparkplug_b_pb2 and Payload import it as well.
+######################################################################
+def _payloadClass():
+    global sparkplug_b_pb2, Payload, _Payload
+    if _Payload is None:
+        import sparkplug_b_pb2
+        Payload = _Payload = sparkplug_b_pb2.Payload
+    return _Payload
+
+def __getattr__(name):
+    if name in ("sparkplug_b_pb2", "Payload"):
+        _payloadClass()
+        return globals()[name]
+    raise AttributeError("module " + repr(__name__) + " has no attribute " + repr(name))
+######################################################################
+
+# Hot path instrumentation, see enableInstrumentation()
+instrumentation = None
+_timer = getattr(time, "perf_counter", time.time)
+
 class DataSetDataType:
     Unknown = 0
     Int8 = 1
@@ -90,11 +139,48 @@ class ParameterDataType:
     DateTime = 13
     Text = 14
 
+# The Metric value field used to carry each MetricDataType
+_valueFields = {
+    MetricDataType.Int8 : "int_value",
+    MetricDataType.Int16 : "int_value",
+    MetricDataType.Int32 : "int_value",
+    MetricDataType.Int64 : "long_value",
+    MetricDataType.UInt8 : "int_value",
+    MetricDataType.UInt16 : "int_value",
+    MetricDataType.UInt32 : "int_value",
+    MetricDataType.UInt64 : "long_value",
+    MetricDataType.Float : "float_value",
+    MetricDataType.Double : "double_value",
+    MetricDataType.Boolean : "boolean_value",
+    MetricDataType.String : "string_value",
+    MetricDataType.DateTime : "long_value",
+    MetricDataType.Text : "string_value",
+    MetricDataType.UUID : "string_value",
+    MetricDataType.Bytes : "bytes_value",
+    MetricDataType.File : "bytes_value",
+}
+
+# Valid range and wire mask of each integer MetricDataType.  Signed values
+# are carried in the unsigned int_value/long_value fields as two's complement.
+_intRanges = {
+    MetricDataType.Int8 : (-2**7, 2**7 - 1, 0xFFFFFFFF),
+    MetricDataType.Int16 : (-2**15, 2**15 - 1, 0xFFFFFFFF),
+    MetricDataType.Int32 : (-2**31, 2**31 - 1, 0xFFFFFFFF),
+    MetricDataType.Int64 : (-2**63, 2**63 - 1, 0xFFFFFFFFFFFFFFFF),
+    MetricDataType.UInt8 : (0, 2**8 - 1, 0xFFFFFFFF),
+    MetricDataType.UInt16 : (0, 2**16 - 1, 0xFFFFFFFF),
+    MetricDataType.UInt32 : (0, 2**32 - 1, 0xFFFFFFFF),
+    MetricDataType.UInt64 : (0, 2**64 - 1, 0xFFFFFFFFFFFFFFFF),
+    MetricDataType.DateTime : (0, 2**64 - 1, 0xFFFFFFFFFFFFFFFF),
+}
+
 ######################################################################
 # Always request this before requesting the Node Birth Payload
 ######################################################################
 def getNodeDeathPayload():
-    payload = sparkplug_b_pb2.Payload()
+    payload = _payloadClass()()
+    if instrumentation is not None:
+        instrumentation.payloadCreated(payload)
     addMetric(payload, "bdSeq", None, MetricDataType.Int64, getBdSeqNum())
     return payload
 ######################################################################
@@ -105,10 +191,13 @@ def getNodeDeathPayload():
 def getNodeBirthPayload():
     global seqNum
     seqNum = 0
-    payload = sparkplug_b_pb2.Payload()
+    payload = _payloadClass()()
+    if instrumentation is not None:
+        instrumentation.payloadCreated(payload)
     payload.timestamp = int(round(time.time() * 1000))
     payload.seq = getSeqNum()
-    addMetric(payload, "bdSeq", None, MetricDataType.Int64, --bdSeq)
+    # Same bdSeq as the death payload requested just before
+    addMetric(payload, "bdSeq", None, MetricDataType.Int64, (bdSeq - 1) % 256)
     return payload
 ######################################################################
 
@@ -116,7 +205,9 @@ def getNodeBirthPayload():
 # Get the DBIRTH payload
 ######################################################################
 def getDeviceBirthPayload():
-    payload = sparkplug_b_pb2.Payload()
+    payload = _payloadClass()()
+    if instrumentation is not None:
+        instrumentation.payloadCreated(payload)
     payload.timestamp = int(round(time.time() * 1000))
     payload.seq = getSeqNum()
     return payload
@@ -145,9 +236,51 @@ def initDatasetMetric(payload, name, alias, columns, types):
     metric.dataset_value.num_of_columns = len(types)
     metric.dataset_value.columns.extend(columns)
     metric.dataset_value.types.extend(types)
+    if instrumentation is not None:
+        instrumentation.metricAdded(MetricDataType.DataSet)
     return metric.dataset_value
 ######################################################################
 
+######################################################################
+# Helper method for adding rows to a dataset created by
+# initDatasetMetric.  Each row is a sequence of values in the order of
+# the dataset columns.  The rows are added all or none: if a value is
+# invalid ValueError or TypeError is raised and the dataset is left as
+# it was.
+######################################################################
+def addDatasetRows(dataset, rows):
+    fields = []
+    for type in dataset.types:
+        if type not in _valueFields or type > DataSetDataType.Text:
+            raise ValueError("Invalid: " + str(type))
+        fields.append((type, _valueFields[type], type in _intRanges))
+
+    # Coerce every value before the first row is added
+    coercedRows = []
+    for row in rows:
+        if len(row) != len(fields):
+            raise ValueError("Expected " + str(len(fields)) + " values in row: " + repr(row))
+        coercedRows.append([coerceValue(type, value) if coerce else value
+                for (type, field, coerce), value in zip(fields, row)])
+
+    start = len(dataset.rows)
+    addRow = dataset.rows.add
+    try:
+        for row in coercedRows:
+            add = addRow().elements.add
+            if _nativeBackend:
+                # Native backends create an element with its value fastest
+                for (type, field, coerce), value in zip(fields, row):
+                    add(**{ field : value })
+            else:
+                for (type, field, coerce), value in zip(fields, row):
+                    setattr(add(), field, value)
+    except (TypeError, ValueError):
+        # Values of the wrong type are only found by protobuf
+        del dataset.rows[start:]
+        raise
+######################################################################
+
 ######################################################################
 # Helper method for adding dataset metrics to a payload
 ######################################################################
@@ -167,6 +300,8 @@ def initTemplateMetric(payload, name, alias, templateRef):
     else:
         metric.template_value.is_definition = True
 
+    if instrumentation is not None:
+        instrumentation.metricAdded(MetricDataType.Template)
     return metric.template_value
 ######################################################################
 
@@ -174,40 +309,42 @@ def initTemplateMetric(payload, name, alias, templateRef):
 # Helper method for adding metrics to a container which can be a
 # payload or a template
 ######################################################################
-def addMetric(container, name, alias, type, value):
+def addMetric(container, name, alias, type, value, timestamp=None):
     metric = container.metrics.add()
     if name is not None:
         metric.name = name
     if alias is not None:
         metric.alias = alias
-    metric.timestamp = int(round(time.time() * 1000))
+    if timestamp is None:
+        timestamp = int(round(time.time() * 1000))
+    metric.timestamp = timestamp
 
     # print( "Type: " + str(type))
 
     if type == MetricDataType.Int8:
         metric.datatype = MetricDataType.Int8
-        metric.int_value = value
+        metric.int_value = coerceValue(type, value)
     elif type == MetricDataType.Int16:
         metric.datatype = MetricDataType.Int16
-        metric.int_value = value
+        metric.int_value = coerceValue(type, value)
     elif type == MetricDataType.Int32:
         metric.datatype = MetricDataType.Int32
-        metric.int_value = value
+        metric.int_value = coerceValue(type, value)
     elif type == MetricDataType.Int64:
         metric.datatype = MetricDataType.Int64
-        metric.long_value = value
+        metric.long_value = coerceValue(type, value)
     elif type == MetricDataType.UInt8:
         metric.datatype = MetricDataType.UInt8
-        metric.int_value = value
+        metric.int_value = coerceValue(type, value)
     elif type == MetricDataType.UInt16:
         metric.datatype = MetricDataType.UInt16
-        metric.int_value = value
+        metric.int_value = coerceValue(type, value)
     elif type == MetricDataType.UInt32:
         metric.datatype = MetricDataType.UInt32
-        metric.int_value = value
+        metric.int_value = coerceValue(type, value)
     elif type == MetricDataType.UInt64:
         metric.datatype = MetricDataType.UInt64
-        metric.long_value = value
+        metric.long_value = coerceValue(type, value)
     elif type == MetricDataType.Float:
         metric.datatype = MetricDataType.Float
         metric.float_value = value
@@ -222,7 +359,7 @@ def addMetric(container, name, alias, type, value):
         metric.string_value = value
     elif type == MetricDataType.DateTime:
         metric.datatype = MetricDataType.DateTime
-        metric.long_value = value
+        metric.long_value = coerceValue(type, value)
     elif type == MetricDataType.Text:
         metric.datatype = MetricDataType.Text
         metric.string_value = value
@@ -241,6 +378,9 @@ def addMetric(container, name, alias, type, value):
     else:
         print( "Invalid: " + str(type))
 
+    if instrumentation is not None:
+        instrumentation.metricAdded(type)
+
     # Return the metric
     return metric
 ######################################################################
@@ -249,14 +389,207 @@ def addMetric(container, name, alias, type, value):
 # Helper method for adding metrics to a container which can be a
 # payload or a template
 ######################################################################
-def addHistoricalMetric(container, name, alias, type, value):
-    metric = addMetric(container, name, alias, type, value)
+def addHistoricalMetric(container, name, alias, type, value, timestamp=None):
+    metric = addMetric(container, name, alias, type, value, timestamp)
     metric.is_historical = True
 
     # Return the metric
     return metric
 ######################################################################
 
+######################################################################
+# Validate a value for a MetricDataType and return the value to write
+# to the Metric value field.  Raises ValueError if the value does not
+# fit the type.
+######################################################################
+def coerceValue(type, value):
+    if type in _intRanges:
+        low, high, mask = _intRanges[type]
+        if isinstance(value, bool) or not isinstance(value, numbers.Integral):
+            raise ValueError("Invalid value for type " + str(type) + ": " + repr(value))
+        if value < low or value > high:
+            raise ValueError("Value out of range for type " + str(type) + ": " + repr(value))
+        return int(value) & mask
+    elif type == MetricDataType.Float or type == MetricDataType.Double:
+        if isinstance(value, bool) or not isinstance(value, numbers.Real):
+            raise ValueError("Invalid value for type " + str(type) + ": " + repr(value))
+        return float(value)
+    elif type == MetricDataType.Boolean:
+        if value not in (True, False):
+            raise ValueError("Invalid value for type " + str(type) + ": " + repr(value))
+        return bool(value)
+    elif type == MetricDataType.String or type == MetricDataType.Text or type == MetricDataType.UUID:
+        if not isinstance(value, _stringTypes):
+            raise ValueError("Invalid value for type " + str(type) + ": " + repr(value))
+        return value
+    elif type == MetricDataType.Bytes or type == MetricDataType.File:
+        if not isinstance(value, (bytes, bytearray)):
+            raise ValueError("Invalid value for type " + str(type) + ": " + repr(value))
+        return bytes(value)
+    raise ValueError("Invalid: " + str(type))
+######################################################################
+
+######################################################################
+# NumPy module if it is installed, None otherwise.  Imported on first
+# use to keep it out of the import time of this module.
+######################################################################
+def _numpy():
+    global numpy
+    if numpy is False:
+        try:
+            import numpy
+        except ImportError:
+            numpy = None
+    return numpy
+######################################################################
+
+######################################################################
+# Validate and coerce a whole column of values for a MetricDataType in
+# one pass.  Returns (values, errors) where values holds the coerced
+# wire values (None where invalid) and errors is a list of
+# (index, message) tuples.  Integer columns are range checked with
+# NumPy when it is available.
+######################################################################
+def coerceValues(type, values):
+    numpy = _numpy()
+    if numpy is not None and type in _intRanges and type != MetricDataType.UInt64 and type != MetricDataType.DateTime:
+        column = numpy.asarray(values)
+        if column.ndim == 1 and column.dtype.kind in "iu":
+            low, high, mask = _intRanges[type]
+            # Check before the cast, uint64 input would wrap to negative
+            if column.dtype.kind == "u":
+                invalid = column > high
+            else:
+                invalid = (column < low) | (column > high)
+            errors = [(index, "Value out of range for type " + str(type) + ": " + repr(int(column[index])))
+                    for index in numpy.flatnonzero(invalid).tolist()]
+            column = column.astype(numpy.int64)
+            coerced = (column & mask).tolist() if mask != 0xFFFFFFFFFFFFFFFF else column.astype(numpy.uint64).tolist()
+            for index, message in errors:
+                coerced[index] = None
+            return coerced, errors
+
+    if hasattr(values, "tolist"):
+        values = values.tolist()
+    coerced = []
+    errors = []
+    for index, value in enumerate(values):
+        try:
+            coerced.append(coerceValue(type, value))
+        except ValueError as e:
+            coerced.append(None)
+            errors.append((index, str(e)))
+    return coerced, errors
+######################################################################
+
+######################################################################
+# Get the value of a metric, undoing the two's complement encoding of
+# signed integer types
+######################################################################
+def getMetricValue(metric):
+    if metric.is_null:
+        return None
+    type = metric.datatype
+    if type == MetricDataType.Template:
+        return metric.template_value
+    elif type == MetricDataType.DataSet:
+        return metric.dataset_value
+    elif type not in _valueFields:
+        return None
+    value = getattr(metric, _valueFields[type])
+    if type in _intRanges:
+        low, high, mask = _intRanges[type]
+        if low < 0 and value > mask >> 1:
+            value -= mask + 1
+    return value
+######################################################################
+
+######################################################################
+# Helper method for adding many historical values of one metric to a
+# container.  'timestamps' (ms since epoch) and 'values' are parallel
+# sequences; lists, arrays and NumPy arrays are all accepted.
+######################################################################
+def addHistoricalMetrics(container, name, alias, type, timestamps, values):
+    if len(timestamps) != len(values):
+        raise ValueError("timestamps and values must have the same length")
+    if type not in _valueFields:
+        raise ValueError("Invalid: " + str(type))
+
+    # NumPy scalars are slow to assign to protobuf fields, convert them in one pass
+    if hasattr(timestamps, "tolist"):
+        timestamps = timestamps.tolist()
+    values, errors = coerceValues(type, values)
+    if len(errors) > 0:
+        raise ValueError("Invalid values at indexes " + str([index for index, message in errors]) + ": " + errors[0][1])
+    _addCoercedHistoricalMetrics(container, name, alias, type, timestamps, values)
+######################################################################
+
+######################################################################
+# addHistoricalMetrics() for a list of values coerceValues() already
+# returned.  Signed values are two's complement by then and must not be
+# coerced a second time.
+######################################################################
+def _addCoercedHistoricalMetrics(container, name, alias, type, timestamps, values):
+    valueField = _valueFields[type]
+    add = container.metrics.add
+    if _nativeBackend:
+        # Native backends set scalar fields fastest one at a time
+        for timestamp, value in zip(timestamps, values):
+            metric = add()
+            if name is not None:
+                metric.name = name
+            if alias is not None:
+                metric.alias = alias
+            metric.timestamp = timestamp
+            metric.datatype = type
+            metric.is_historical = True
+            setattr(metric, valueField, value)
+    else:
+        # The pure Python backend copies the fields shared by every metric
+        # from a prototype faster than it sets them individually
+        prototype = _payloadClass().Metric(datatype=type, is_historical=True)
+        if name is not None:
+            prototype.name = name
+        if alias is not None:
+            prototype.alias = alias
+        for timestamp, value in zip(timestamps, values):
+            metric = add()
+            metric.MergeFrom(prototype)
+            metric.timestamp = timestamp
+            setattr(metric, valueField, value)
+    if instrumentation is not None:
+        instrumentation.metricAdded(type, len(values))
+######################################################################
+
+######################################################################
+# Generator of DDATA payloads carrying historical values of one metric
+# with their original timestamps.  Each payload holds at most
+# 'maxMetrics' metrics so large backfills stay within broker limits.
+# Invalid arguments raise ValueError here rather than once the first
+# payload is taken.
+######################################################################
+def getHistoricalDdataPayloads(name, alias, type, timestamps, values, maxMetrics=1000):
+    if len(timestamps) != len(values):
+        raise ValueError("timestamps and values must have the same length")
+    if type not in _valueFields:
+        raise ValueError("Invalid: " + str(type))
+    if maxMetrics < 1:
+        raise ValueError("maxMetrics must be at least 1")
+    if hasattr(timestamps, "tolist"):
+        timestamps = timestamps.tolist()
+    values, errors = coerceValues(type, values)
+    if len(errors) > 0:
+        raise ValueError("Invalid values at indexes " + str([index for index, message in errors]) + ": " + errors[0][1])
+    return _historicalDdataPayloads(name, alias, type, timestamps, values, maxMetrics)
+
+def _historicalDdataPayloads(name, alias, type, timestamps, values, maxMetrics):
+    for start in range(0, len(values), maxMetrics):
+        payload = getDdataPayload()
+        _addCoercedHistoricalMetrics(payload, name, alias, type,
+                timestamps[start:start + maxMetrics], values[start:start + maxMetrics])
+        yield payload
+######################################################################
+
 ######################################################################
 # Helper method for adding metrics to a container which can be a
 # payload or a template
@@ -311,10 +644,69 @@ def addNullMetric(container, name, alias, type):
     else:
         print( "Invalid: " + str(type))
 
+    if instrumentation is not None:
+        instrumentation.metricAdded(type)
+
     # Return the metric
     return metric
 ######################################################################
 
+######################################################################
+# Serialize a payload and publish it.  The immutable bytes returned by
+# SerializeToString are handed to the client as is, copying them into a
+# bytearray first would only double the peak memory of large payloads.
+######################################################################
+def publishPayload(client, topic, payload, qos=0, retain=False):
+    if instrumentation is not None:
+        instrumentation.payloadPublished(payload)
+    return client.publish(topic, serializePayload(payload), qos, retain)
+######################################################################
+
+######################################################################
+# Serialize a payload, recording its size and latency when
+# instrumentation is enabled
+######################################################################
+def serializePayload(payload):
+    if instrumentation is None:
+        return payload.SerializeToString()
+    started = _timer()
+    data = payload.SerializeToString()
+    instrumentation.payloadSerialized(payload, len(data), _timer() - started)
+    return data
+######################################################################
+
+######################################################################
+# Parse a received payload
+######################################################################
+def parsePayload(data):
+    payload = _payloadClass().FromString(data)
+    if instrumentation is not None:
+        instrumentation.payloadParsed(len(data))
+    return payload
+######################################################################
+
+######################################################################
+# Enable counting of metrics, payloads, serialized and parsed bytes and
+# the build/serialize latency histograms.  Returns the Instrumentation
+# holding the counters, see sparkplug_b_instrumentation.
+######################################################################
+def enableInstrumentation(newInstrumentation=None):
+    global instrumentation
+    if newInstrumentation is None:
+        from sparkplug_b_instrumentation import Instrumentation
+        newInstrumentation = Instrumentation()
+    instrumentation = newInstrumentation
+    return instrumentation
+######################################################################
+
+######################################################################
+# Disable instrumentation
+######################################################################
+def disableInstrumentation():
+    global instrumentation
+    instrumentation = None
+######################################################################
+
 ######################################################################
 # Helper method for getting the next sequence number
 ######################################################################
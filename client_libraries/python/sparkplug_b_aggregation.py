@@ -0,0 +1,191 @@
+#/********************************************************************************
+# * Copyright (c) 2014, 2018 Cirrus Link Solutions and others
+# *
+# * This program and the accompanying materials are made available under the
+# * terms of the Eclipse Public License 2.0 which is available at
+# * http://www.eclipse.org/legal/epl-2.0.
+# *
+# * SPDX-License-Identifier: EPL-2.0
+# *
+# * Contributors:
+# *   Cirrus Link Solutions - initial implementation
+# ********************************************************************************/
+import time
+from array import array
+
+import sparkplug_b as sparkplug
+from sparkplug_b import addMetric, initDatasetMetric, MetricDataType, DataSetDataType
+
+######################################################################
+# How the aggregates of a closed window are written to a payload
+######################################################################
+class AggregateMode:
+    # One metric per aggregate, named "<metric>/Min", "<metric>/Max", ...
+    Siblings = 0
+    # A single DataSet metric with one row per aggregated metric
+    DataSet = 1
+
+# Aggregates computed per metric, in the order they are emitted
+AGGREGATES = ["Min", "Max", "Mean", "Last", "Count"]
+
+# Metric types that can be aggregated and the array typecode used to buffer them
+_typecodes = {
+    MetricDataType.Int8 : 'q',
+    MetricDataType.Int16 : 'q',
+    MetricDataType.Int32 : 'q',
+    MetricDataType.Int64 : 'q',
+    MetricDataType.UInt8 : 'q',
+    MetricDataType.UInt16 : 'q',
+    MetricDataType.UInt32 : 'q',
+    MetricDataType.UInt64 : 'Q',
+    MetricDataType.Float : 'd',
+    MetricDataType.Double : 'd',
+    MetricDataType.DateTime : 'Q',
+}
+######################################################################
+
+######################################################################
+# Buffered samples and metric identity for a single aggregated metric
+######################################################################
+class _AggregatedMetric:
+    def __init__(self, name, type, aliases):
+        self.name = name
+        self.type = type
+        self.aliases = aliases
+        self.samples = array(_typecodes[type])
+######################################################################
+
+######################################################################
+# Windowed aggregation stage which sits between high rate value
+# producers and addMetric.  Samples are buffered per metric and, when
+# the window closes, summarized as min/max/mean/last/count.
+######################################################################
+class MetricAggregator:
+    def __init__(self, windowMs, mode=AggregateMode.Siblings, datasetName="Aggregates", datasetAlias=None):
+        self.windowMs = windowMs
+        self.mode = mode
+        self.datasetName = datasetName
+        self.datasetAlias = datasetAlias
+        self.metrics = {}
+        self.windowStart = int(round(time.time() * 1000))
+
+    ##################################################################
+    # Register a metric to aggregate.  'aliases' optionally maps each
+    # entry of AGGREGATES to the alias of its sibling metric.
+    ##################################################################
+    def register(self, name, type, aliases=None):
+        if type not in _typecodes:
+            raise ValueError("Cannot aggregate metric type: " + str(type))
+        self.metrics[name] = _AggregatedMetric(name, type, aliases or {})
+
+    ##################################################################
+    # Add a single sample for a registered metric
+    ##################################################################
+    def addValue(self, name, value):
+        self.metrics[name].samples.append(value)
+
+    ##################################################################
+    # Add a block of samples for a registered metric.  NumPy arrays are
+    # appended through the buffer protocol without a Python level loop.
+    ##################################################################
+    def addValues(self, name, values):
+        samples = self.metrics[name].samples
+        numpy = sparkplug._numpy()
+        if numpy is not None and isinstance(values, numpy.ndarray):
+            samples.frombytes(numpy.ascontiguousarray(values, dtype=samples.typecode).tobytes())
+        else:
+            samples.extend(values)
+
+    ##################################################################
+    # Whether the current window has elapsed
+    ##################################################################
+    def isWindowClosed(self, now=None):
+        if now is None:
+            now = int(round(time.time() * 1000))
+        return now - self.windowStart >= self.windowMs
+
+    ##################################################################
+    # Compute the aggregates of every metric which received samples in
+    # the current window.  Returns a list of (metric, aggregates) where
+    # aggregates is a dict keyed by the entries of AGGREGATES.
+    ##################################################################
+    def aggregate(self):
+        results = []
+        for metric in self.metrics.values():
+            samples = metric.samples
+            count = len(samples)
+            if count == 0:
+                continue
+            numpy = sparkplug._numpy()
+            if numpy is not None:
+                values = numpy.frombuffer(samples, dtype=samples.typecode)
+                minimum = values.min().item()
+                maximum = values.max().item()
+                mean = float(values.mean())
+            else:
+                minimum = min(samples)
+                maximum = max(samples)
+                mean = float(sum(samples)) / count
+            results.append((metric, {
+                "Min" : minimum,
+                "Max" : maximum,
+                "Mean" : mean,
+                "Last" : samples[-1],
+                "Count" : count
+            }))
+        return results
+
+    ##################################################################
+    # Close the current window: write the aggregates to the payload,
+    # clear the buffered samples and start the next window.  Returns
+    # the number of metrics which were aggregated.  Windows stay on a
+    # fixed windowMs grid; after an idle gap the next window is the one
+    # 'now' falls in.
+    ##################################################################
+    def flush(self, payload, now=None):
+        results = self.aggregate()
+        if self.mode == AggregateMode.DataSet:
+            if len(results) > 0:
+                self._addDataset(payload, results)
+        else:
+            for metric, aggregates in results:
+                self._addSiblings(payload, metric, aggregates)
+
+        for metric in self.metrics.values():
+            del metric.samples[:]
+        if now is None:
+            now = int(round(time.time() * 1000))
+        if now - self.windowStart >= self.windowMs:
+            self.windowStart += (now - self.windowStart) // self.windowMs * self.windowMs
+        return len(results)
+
+    ##################################################################
+    # Flush only if the current window has elapsed
+    ##################################################################
+    def flushIfClosed(self, payload, now=None):
+        if self.isWindowClosed(now):
+            return self.flush(payload, now)
+        return 0
+
+    def _addSiblings(self, payload, metric, aggregates):
+        for aggregate in AGGREGATES:
+            if aggregate == "Mean":
+                type = MetricDataType.Double
+            elif aggregate == "Count":
+                type = MetricDataType.Int64
+            else:
+                type = metric.type
+            addMetric(payload, metric.name + "/" + aggregate, metric.aliases.get(aggregate), type, aggregates[aggregate])
+
+    def _addDataset(self, payload, results):
+        columns = ["Name"] + AGGREGATES
+        types = [DataSetDataType.String, DataSetDataType.Double, DataSetDataType.Double,
+                DataSetDataType.Double, DataSetDataType.Double, DataSetDataType.Int64]
+        dataset = initDatasetMetric(payload, self.datasetName, self.datasetAlias, columns, types)
+        for metric, aggregates in results:
+            row = dataset.rows.add()
+            row.elements.add().string_value = metric.name
+            for aggregate in AGGREGATES[:-1]:
+                row.elements.add().double_value = aggregates[aggregate]
+            row.elements.add().long_value = aggregates["Count"]
+######################################################################
@@ -0,0 +1,187 @@
+#/********************************************************************************
+# * Copyright (c) 2014, 2018 Cirrus Link Solutions and others
+# *
+# * This program and the accompanying materials are made available under the
+# * terms of the Eclipse Public License 2.0 which is available at
+# * http://www.eclipse.org/legal/epl-2.0.
+# *
+# * SPDX-License-Identifier: EPL-2.0
+# *
+# * Contributors:
+# *   Cirrus Link Solutions - initial implementation
+# ********************************************************************************/
+import mmap
+import os
+import struct
+import time
+
+from sparkplug_b_transport import topicMatches
+
+######################################################################
+# Capture file format.  The file starts with MAGIC followed by an
+# append-only sequence of records:
+#   double  receive time (seconds since epoch)
+#   uint16  topic length
+#   uint32  payload length
+#   bytes   topic (UTF-8)
+#   bytes   payload
+# All integers are little endian.
+######################################################################
+MAGIC = b"SPBCAP1\n"
+_header = struct.Struct("<dHI")
+
+######################################################################
+# Offset just past the last complete record of an existing capture
+# file, 0 if the file is missing, empty or holds only part of MAGIC.
+# Raises ValueError if it is not a capture file.
+######################################################################
+def _completeLength(path):
+    try:
+        f = open(path, "rb")
+    except FileNotFoundError:
+        return 0
+    with f:
+        size = os.fstat(f.fileno()).st_size
+        magic = f.read(len(MAGIC))
+        if magic != MAGIC:
+            if len(magic) < len(MAGIC) and MAGIC.startswith(magic):
+                # Created by a writer which crashed right away
+                return 0
+            raise ValueError("Not a Sparkplug capture file: " + path)
+        offset = len(MAGIC)
+        while offset + _header.size <= size:
+            receiveTime, topicLength, payloadLength = _header.unpack(f.read(_header.size))
+            end = offset + _header.size + topicLength + payloadLength
+            if end > size:
+                break
+            f.seek(end)
+            offset = end
+        return offset
+######################################################################
+
+######################################################################
+# Appends received messages to a capture file through a large write
+# buffer.  A record left half written at the end of an existing file,
+# for instance by a crash, is cut off first so the records appended
+# stay readable.
+######################################################################
+class CaptureWriter:
+    def __init__(self, path, bufferSize=1 << 20):
+        length = _completeLength(path)
+        self.file = open(path, "ab", bufferSize)
+        if self.file.tell() != length:
+            self.file.truncate(length)
+        if length == 0:
+            self.file.write(MAGIC)
+        self.count = 0
+
+    def write(self, topic, payload, receiveTime=None):
+        if receiveTime is None:
+            receiveTime = time.time()
+        topic = topic.encode("utf-8")
+        self.file.write(_header.pack(receiveTime, len(topic), len(payload)))
+        self.file.write(topic)
+        self.file.write(payload)
+        self.count += 1
+
+    def flush(self):
+        self.file.flush()
+
+    def close(self):
+        self.file.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *args):
+        self.close()
+######################################################################
+
+######################################################################
+# Reads a capture file through a memory map.  Iterating yields
+# (receiveTime, topic, payload) where payload is a memoryview into the
+# map, copy it with bytes() if it must outlive the reader.
+######################################################################
+class CaptureReader:
+    def __init__(self, path):
+        self.file = open(path, "rb")
+        self.map = mmap.mmap(self.file.fileno(), 0, access=mmap.ACCESS_READ)
+        if self.map[:len(MAGIC)] != MAGIC:
+            self.close()
+            raise ValueError("Not a Sparkplug capture file: " + path)
+        self.view = memoryview(self.map)
+
+    def __iter__(self):
+        unpack = _header.unpack_from
+        headerSize = _header.size
+        view = self.view
+        end = len(self.map)
+        topics = {}
+        offset = len(MAGIC)
+        while offset + headerSize <= end:
+            receiveTime, topicLength, payloadLength = unpack(view, offset)
+            offset += headerSize
+            topicEnd = offset + topicLength
+            payloadEnd = topicEnd + payloadLength
+            if payloadEnd > end:
+                # Truncated last record of a capture which was still being written
+                break
+
+            # Topics repeat, decode each distinct one only once
+            topicBytes = view[offset:topicEnd].tobytes()
+            topic = topics.get(topicBytes)
+            if topic is None:
+                topic = topics[topicBytes] = topicBytes.decode("utf-8")
+            yield receiveTime, topic, view[topicEnd:payloadEnd]
+            offset = payloadEnd
+
+    def close(self):
+        self.file.close()
+        try:
+            if hasattr(self, "view"):
+                self.view.release()
+            self.map.close()
+        except BufferError:
+            # Payload views handed out are still alive, the map is
+            # unmapped once the last of them is garbage collected
+            pass
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *args):
+        self.close()
+######################################################################
+
+######################################################################
+# Republish the messages of a capture through publish(topic, payload).
+# speed 1.0 keeps the original timing, other values scale it and None
+# or 0 replays as fast as possible.  Only topics matching one of
+# topicFilters are replayed if any are given.  Returns the number of
+# messages replayed.
+######################################################################
+def replay(reader, publish, speed=None, topicFilters=None):
+    count = 0
+    firstTime = None
+    started = time.time()
+    matches = {}
+    for receiveTime, topic, payload in reader:
+        if topicFilters:
+            matched = matches.get(topic)
+            if matched is None:
+                matched = matches[topic] = any(topicMatches(topicFilter, topic) for topicFilter in topicFilters)
+            if not matched:
+                continue
+
+        if speed:
+            if firstTime is None:
+                firstTime = receiveTime
+            delay = started + (receiveTime - firstTime) / speed - time.time()
+            # Sleeping for less than a millisecond costs more than it is worth
+            if delay > 0.001:
+                time.sleep(delay)
+
+        publish(topic, payload)
+        count += 1
+    return count
+######################################################################
@@ -0,0 +1,146 @@
+#/********************************************************************************
+# * Copyright (c) 2014, 2018 Cirrus Link Solutions and others
+# *
+# * This program and the accompanying materials are made available under the
+# * terms of the Eclipse Public License 2.0 which is available at
+# * http://www.eclipse.org/legal/epl-2.0.
+# *
+# * SPDX-License-Identifier: EPL-2.0
+# *
+# * Contributors:
+# *   Cirrus Link Solutions - initial implementation
+# ********************************************************************************/
+import collections
+import threading
+import time
+
+import sparkplug_b as sparkplug
+from sparkplug_b import addMetric, coerceValue, MetricDataType
+
+class CoalesceMode:
+    # Every transition becomes a metric with its own timestamp
+    KeepAll = 0
+    # Only the latest value of each metric is published
+    KeepLatest = 1
+
+######################################################################
+# Queue between input change callbacks and a single publisher.
+# Producers call put() from any thread without taking a lock, appends
+# to a deque are atomic.  flush() drains everything queued into one
+# payload and hands it to publish(payload); it can be called from a main
+# loop or every intervalMs by the thread start() runs.
+#
+# 'metrics' maps the key producers use to (name, alias, type) of the
+# metric published for it.
+######################################################################
+class EventCoalescer:
+    def __init__(self, publish, metrics, intervalMs=100, mode=CoalesceMode.KeepLatest,
+            payloadFactory=sparkplug.getDdataPayload):
+        self.publish = publish
+        self.metrics = metrics
+        self.intervalMs = intervalMs
+        self.mode = mode
+        self.payloadFactory = payloadFactory
+        self.events = collections.deque()
+        self.eventCount = 0
+        self.metricCount = 0
+        self.payloadCount = 0
+        self._thread = None
+        self._stopped = threading.Event()
+
+    ##################################################################
+    # Queue a value change, timestamp in ms since epoch (now if None).
+    # Raises KeyError for a key which is not in 'metrics' and ValueError
+    # for a value which does not fit the type of its metric, so a bad
+    # value is reported to its producer rather than failing a flush.
+    ##################################################################
+    def put(self, key, value, timestamp=None):
+        metric = self.metrics.get(key)
+        if metric is None:
+            raise KeyError("Unknown metric key: " + repr(key))
+        type = metric[2]
+        if type != MetricDataType.DataSet and type != MetricDataType.Template:
+            coerceValue(type, value)
+        if timestamp is None:
+            timestamp = int(round(time.time() * 1000))
+        self.events.append((key, value, timestamp))
+
+    ##################################################################
+    # Remove and return the queued (key, value, timestamp) events in
+    # order, only the latest of each key in KeepLatest mode
+    ##################################################################
+    def drain(self):
+        events = []
+        popleft = self.events.popleft
+        try:
+            # Stop at the events queued when draining started so a busy
+            # producer cannot keep the drain going forever
+            for _ in range(len(self.events)):
+                events.append(popleft())
+        except IndexError:
+            pass
+        self.eventCount += len(events)
+        if self.mode == CoalesceMode.KeepLatest and len(events) > 1:
+            latest = collections.OrderedDict()
+            for event in events:
+                latest.pop(event[0], None)
+                latest[event[0]] = event
+            events = list(latest.values())
+        return events
+
+    ##################################################################
+    # Publish the queued events as one payload.  An event which cannot
+    # be added is dropped with a message, the others are still
+    # published.  Returns the payload, None if nothing was published.
+    ##################################################################
+    def flush(self):
+        events = self.drain()
+        if len(events) == 0:
+            return None
+        payload = self.payloadFactory()
+        added = 0
+        for key, value, timestamp in events:
+            metric = self.metrics.get(key)
+            if metric is None:
+                # Removed from 'metrics' after it was queued
+                print("Dropping event of unknown metric key: " + repr(key))
+                continue
+            name, alias, type = metric
+            try:
+                addMetric(payload, name, alias, type, value, timestamp)
+            except (ValueError, TypeError) as e:
+                # The metric was added before its value was rejected
+                del payload.metrics[len(payload.metrics) - 1]
+                print("Dropping event of metric key " + repr(key) + ": " + str(e))
+                continue
+            added += 1
+        if added == 0:
+            return None
+        self.metricCount += added
+        self.payloadCount += 1
+        self.publish(payload)
+        return payload
+
+    ##################################################################
+    # Flush every intervalMs from a background thread
+    ##################################################################
+    def start(self):
+        self._stopped.clear()
+        self._thread = threading.Thread(target=self._run, name="EventCoalescer")
+        self._thread.daemon = True
+        self._thread.start()
+
+    def stop(self):
+        self._stopped.set()
+        if self._thread is not None:
+            self._thread.join()
+            self._thread = None
+        self.flush()
+
+    def _run(self):
+        while not self._stopped.wait(self.intervalMs / 1000.0):
+            try:
+                self.flush()
+            except Exception as e:
+                print("Failed to publish coalesced events: " + str(e))
+######################################################################
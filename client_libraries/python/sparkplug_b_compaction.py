@@ -0,0 +1,84 @@
+#/********************************************************************************
+# * Copyright (c) 2014, 2018 Cirrus Link Solutions and others
+# *
+# * This program and the accompanying materials are made available under the
+# * terms of the Eclipse Public License 2.0 which is available at
+# * http://www.eclipse.org/legal/epl-2.0.
+# *
+# * SPDX-License-Identifier: EPL-2.0
+# *
+# * Contributors:
+# *   Cirrus Link Solutions - initial implementation
+# ********************************************************************************/
+
+######################################################################
+# Opt-in compaction pass for NDATA/DDATA payloads.  The metric
+# definitions of the NBIRTH/DBIRTH are recorded and used to strip
+# fields which a host application can recover from the birth:
+#   - the name of a metric which has an alias
+#   - a datatype which matches the one declared in the birth
+#   - a metric timestamp equal to the payload timestamp
+# BIRTH payloads and historical metric timestamps are never touched.
+######################################################################
+class PayloadCompactor:
+    def __init__(self, stripNames=True, stripDatatypes=True, stripTimestamps=True):
+        self.stripNames = stripNames
+        self.stripDatatypes = stripDatatypes
+        self.stripTimestamps = stripTimestamps
+
+        # Names are only unique within a node or device, aliases across the whole edge node
+        self.aliases = {}
+        self.datatypes = {}
+        self.bytesSaved = 0
+
+    ##################################################################
+    # Record the metric definitions of an NBIRTH (deviceId None) or a
+    # DBIRTH.  An NBIRTH starts a new session and clears what was
+    # recorded before.
+    ##################################################################
+    def recordBirth(self, payload, deviceId=None):
+        if deviceId is None:
+            self.aliases = {}
+            self.datatypes = {}
+        names = {}
+        for metric in payload.metrics:
+            if metric.HasField("alias"):
+                if metric.HasField("name"):
+                    names[metric.name] = metric.alias
+                self.datatypes[metric.alias] = metric.datatype
+        self.aliases[deviceId] = names
+
+    ##################################################################
+    # Compact an NDATA (deviceId None) or DDATA payload in place and
+    # return the number of bytes saved
+    ##################################################################
+    def compact(self, payload, deviceId=None):
+        before = payload.ByteSize()
+        names = self.aliases.get(deviceId, {})
+        datatypes = self.datatypes
+        payloadTimestamp = payload.timestamp if payload.HasField("timestamp") else None
+
+        for metric in payload.metrics:
+            if metric.HasField("alias"):
+                alias = metric.alias
+                if alias not in datatypes:
+                    # Not in the birth, the host could not resolve the name
+                    continue
+            elif metric.name in names:
+                alias = names[metric.name]
+                metric.alias = alias
+            else:
+                # Unknown to the birth, leave it alone so the host can request a rebirth
+                continue
+
+            if self.stripNames:
+                metric.ClearField("name")
+            if self.stripDatatypes and datatypes.get(alias) == metric.datatype:
+                metric.ClearField("datatype")
+            if self.stripTimestamps and not metric.is_historical and metric.timestamp == payloadTimestamp:
+                metric.ClearField("timestamp")
+
+        saved = before - payload.ByteSize()
+        self.bytesSaved += saved
+        return saved
+######################################################################
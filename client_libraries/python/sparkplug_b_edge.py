@@ -0,0 +1,520 @@
+#/********************************************************************************
+# * Copyright (c) 2014, 2018 Cirrus Link Solutions and others
+# *
+# * This program and the accompanying materials are made available under the
+# * terms of the Eclipse Public License 2.0 which is available at
+# * http://www.eclipse.org/legal/epl-2.0.
+# *
+# * SPDX-License-Identifier: EPL-2.0
+# *
+# * Contributors:
+# *   Cirrus Link Solutions - initial implementation
+# ********************************************************************************/
+import asyncio
+import random
+
+from google.protobuf.message import DecodeError
+
+import sparkplug_b as sparkplug
+from sparkplug_b_rebirth import RebirthLimiter
+from sparkplug_b_state import stateTopics
+
+######################################################################
+# Call a handler which may either be a plain function or a coroutine
+# function
+######################################################################
+async def _call(handler, *args):
+    result = handler(*args)
+    if asyncio.iscoroutine(result):
+        result = await result
+    return result
+######################################################################
+
+######################################################################
+# asyncio based Sparkplug B edge node runtime.  Inbound NCMD/DCMD
+# messages are dispatched to command handlers as soon as the transport
+# delivers them and periodic scan tasks run as coroutines on the same
+# event loop.
+#
+# The transport is any sparkplug_b_transport.Transport, such as an
+# AsyncioMqttTransport or a LoopbackTransport.
+#
+# birthHandler(node) is called (and awaited if it is a coroutine) to
+# build and publish the NBIRTH and DBIRTH certificates, both on start
+# and on every rebirth request.
+#
+# With a sparkplug_b_outbound.OutboundQueue as 'outbound', publish()
+# only queues the message and a sender task hands the queued messages
+# to the transport one at a time, so a slow server cannot make memory
+# grow without bound.
+#
+# Rebirth requests go through rebirthLimiter, a
+# sparkplug_b_rebirth.RebirthLimiter, so a burst of requests results in
+# a single birth.  Set it to None to rebirth on every request.
+#
+# With a sparkplug_b_state.PrimaryHostState as 'primaryHost' the node
+# follows the STATE of that host application.  While it is offline
+# NDATA and DDATA are published, dropped or buffered according to its
+# policy; when it comes back the births, through the rebirth limiter,
+# and the buffered data are published again.
+#
+# When the connection is lost or a 'Node Control/Next Server' command
+# arrives the node fails over: it connects again, to the next server if
+# the transport is a sparkplug_b_transport.ServerPoolTransport, with a
+# new bdSeq in its will and births.  Failed attempts are retried with
+# exponential backoff from reconnectBackoffMs up to
+# maxReconnectBackoffMs, each delay shortened by a random fraction of
+# up to reconnectJitter.  'lastFailoverMs' is how long the last failover
+# took until the NBIRTH was published again, through the outbound queue
+# if there is one.  DATA of the previous session still in the outbound
+# queue is discarded and DATA published before the new NBIRTH is
+# dropped, counted in 'dataDropped', so nothing reaches the new server
+# ahead of it.  Spilled DATA is kept and follows the new births.
+######################################################################
+class EdgeNode:
+    def __init__(self, transport, groupId, nodeName, birthHandler=None, outbound=None, primaryHost=None):
+        self.transport = transport
+        self.groupId = groupId
+        self.nodeName = nodeName
+        self.birthHandler = birthHandler
+        self.outbound = outbound
+        self.primaryHost = primaryHost
+        self.rebirthLimiter = RebirthLimiter()
+        self.reconnectBackoffMs = 100
+        self.maxReconnectBackoffMs = 30000
+        self.reconnectJitter = 0.5
+        self.deathPayload = None
+        self._handlersByName = {}
+        self._handlersByAlias = {}
+        self._scanTasks = []
+        self._tasks = []
+        self._commands = set()
+        self._stopped = None
+        self._birthExtensions = []
+        self._lastSeq = None
+        self._outboundReady = None
+        self._rebirthTask = None
+        self._failoverTask = None
+        self._birthPending = False
+        self._birthSent = None
+        self._reconnected = None
+        self._lostDuringFailover = False
+
+        # Counters of the publish path
+        self.messagesPublished = 0
+        self.bytesPublished = 0
+        self.connects = 0
+        self.seqGaps = 0
+        self.failovers = 0
+        self.lastFailoverMs = None
+        self.dataDropped = 0
+
+        self.addCommandHandler("Node Control/Next Server", None, EdgeNode.nextServerCommand)
+        self.addCommandHandler("Node Control/Rebirth", None, EdgeNode.rebirthCommand)
+        self.addCommandHandler("Node Control/Reboot", None, EdgeNode.rebirthCommand)
+
+    def nodeTopic(self, messageType):
+        return "spBv1.0/" + self.groupId + "/" + messageType + "/" + self.nodeName
+
+    def deviceTopic(self, messageType, deviceId):
+        return "spBv1.0/" + self.groupId + "/" + messageType + "/" + self.nodeName + "/" + deviceId
+
+    ##################################################################
+    # Register handler(node, deviceId, metric) for an inbound command
+    # metric, matched by name or alias.  deviceId is None for NCMDs.
+    ##################################################################
+    def addCommandHandler(self, name, alias, handler):
+        if name is not None:
+            self._handlersByName[name] = handler
+        if alias is not None:
+            self._handlersByAlias[alias] = handler
+
+    ##################################################################
+    # Register task(node) to run every periodMs milliseconds once the
+    # node has started
+    ##################################################################
+    def addScanTask(self, task, periodMs):
+        self._scanTasks.append((task, periodMs))
+
+    ##################################################################
+    # Register extension(payload) to add metrics to every NBIRTH just
+    # before it is published
+    ##################################################################
+    def addBirthExtension(self, extension):
+        self._birthExtensions.append(extension)
+
+    ##################################################################
+    # Publish a payload, through the outbound queue if there is one.
+    # The build latency is recorded here, before the queue.
+    ##################################################################
+    async def publish(self, topic, payload, qos=0, retain=False):
+        if sparkplug.instrumentation is not None:
+            sparkplug.instrumentation.payloadPublished(payload)
+        if self.outbound is None:
+            await self._send(topic, payload, qos, retain)
+            return
+        self.outbound.put(topic, payload, qos, retain)
+        if self._outboundReady is not None:
+            self._outboundReady.set()
+
+    ##################################################################
+    # Messages waiting to be published, in the outbound queue and in
+    # the transport
+    ##################################################################
+    def queueDepth(self):
+        depth = self.transport.queueDepth()
+        if self.outbound is not None:
+            depth += self.outbound.depth()
+        return depth
+
+    ##################################################################
+    # Serialize and publish a payload
+    ##################################################################
+    async def _send(self, topic, payload, qos=0, retain=False):
+        data = sparkplug.serializePayload(payload)
+        await self.transport.publish(topic, data, qos, retain)
+        self.messagesPublished += 1
+        self.bytesPublished += len(data)
+
+        # A gap means a payload took a seq number but was never published
+        if topic == self.nodeTopic("NBIRTH"):
+            self._lastSeq = None
+            if self._birthSent is not None and not self._birthSent.done():
+                self._birthSent.set_result(None)
+        if payload.HasField("seq"):
+            if self._lastSeq is not None and payload.seq != (self._lastSeq + 1) % 256:
+                self.seqGaps += 1
+            self._lastSeq = payload.seq
+
+    async def publishNodeBirth(self, payload):
+        for extension in self._birthExtensions:
+            extension(payload)
+        await self.publish(self.nodeTopic("NBIRTH"), payload)
+
+    async def publishDeviceBirth(self, deviceId, payload):
+        await self.publish(self.deviceTopic("DBIRTH", deviceId), payload)
+
+    async def publishNodeData(self, payload):
+        await self._publishData(self.nodeTopic("NDATA"), payload)
+
+    async def publishDeviceData(self, deviceId, payload):
+        await self._publishData(self.deviceTopic("DDATA", deviceId), payload)
+
+    async def _publishData(self, topic, payload):
+        if sparkplug.instrumentation is not None:
+            # Built, even if it is dropped or buffered below
+            sparkplug.instrumentation.payloadPublished(payload)
+        if self._birthPending:
+            # Failing over, the new server has not seen the births yet
+            self.dataDropped += 1
+            return
+        if self.primaryHost is None or self.primaryHost.shouldPublish(topic, payload):
+            await self.publish(topic, payload)
+
+    async def publishDeviceDeath(self, deviceId, payload):
+        await self.publish(self.deviceTopic("DDEATH", deviceId), payload)
+
+    ##################################################################
+    # Publish the birth certificates
+    ##################################################################
+    async def rebirth(self):
+        if self.birthHandler is not None:
+            await _call(self.birthHandler, self)
+
+    ##################################################################
+    # Connect with the NDEATH as last will, subscribe to commands,
+    # publish the births and start the scan tasks
+    ##################################################################
+    async def start(self):
+        loop = asyncio.get_event_loop()
+        self._stopped = loop.create_future()
+        if self.outbound is not None:
+            self._outboundReady = asyncio.Event()
+            self._reconnected = asyncio.Event()
+            self._tasks.append(loop.create_task(self._sendQueued()))
+        self.transport.onMessage = self._onMessage
+        self.transport.onDisconnect = self._onDisconnect
+        await self._connect()
+        await self.rebirth()
+        if self.rebirthLimiter is not None:
+            self.rebirthLimiter.recordBirth()
+        for task, periodMs in self._scanTasks:
+            self._tasks.append(loop.create_task(self._scan(task, periodMs)))
+
+    ##################################################################
+    # Connect with a new NDEATH as last will and subscribe to commands
+    ##################################################################
+    async def _connect(self):
+        self.deathPayload = sparkplug.getNodeDeathPayload()
+        await self.transport.connect(self.nodeTopic("NDEATH"), sparkplug.serializePayload(self.deathPayload))
+        self.connects += 1
+        if self._reconnected is not None:
+            self._reconnected.set()
+        self.transport.subscribe(self.nodeTopic("NCMD") + "/#")
+        self.transport.subscribe("spBv1.0/" + self.groupId + "/DCMD/" + self.nodeName + "/#")
+        if self.primaryHost is not None:
+            for topic in stateTopics(self.primaryHost.hostId):
+                self.transport.subscribe(topic)
+
+    ##################################################################
+    # Connect again and publish the births.  With nextServer the NDEATH
+    # is published and the connection closed first, and a server pool
+    # moves on to its next server.  When the births cannot be published
+    # the node connects again and publishes new ones.
+    ##################################################################
+    async def failover(self, nextServer=False):
+        loop = asyncio.get_event_loop()
+        started = loop.time()
+        self._birthPending = True
+        try:
+            if nextServer:
+                try:
+                    await self._send(self.nodeTopic("NDEATH"), self.deathPayload)
+                except ConnectionError:
+                    pass
+                if hasattr(self.transport, "nextServer"):
+                    self.transport.nextServer()
+                await self.transport.disconnect()
+
+            while True:
+                self._lostDuringFailover = False
+                self._birthSent = None
+                if self.outbound is not None:
+                    # Births queued for the lost connection carry its bdSeq, and
+                    # nothing else may reach the new server ahead of them
+                    self.outbound.discardData(session=True)
+                await self._reconnect()
+                try:
+                    await self._failoverBirth()
+                except ConnectionError as e:
+                    print("Failed to publish the births, reconnecting: " + str(e))
+                    continue
+                if not self._lostDuringFailover:
+                    break
+        finally:
+            self._birthPending = False
+            self._birthSent = None
+        if self.rebirthLimiter is not None:
+            self.rebirthLimiter.recordBirth()
+        self.failovers += 1
+        self.lastFailoverMs = (loop.time() - started) * 1000
+
+    ##################################################################
+    # Connect, retrying with exponential backoff
+    ##################################################################
+    async def _reconnect(self):
+        backoffMs = self.reconnectBackoffMs
+        while True:
+            try:
+                await self._connect()
+                return
+            except (ConnectionError, OSError) as e:
+                delayMs = backoffMs * (1 - self.reconnectJitter * random.random())
+                print("Failed to connect, retrying in " + str(int(delayMs)) + " ms: " + str(e))
+                await asyncio.sleep(delayMs / 1000.0)
+                backoffMs = min(backoffMs * 2, self.maxReconnectBackoffMs)
+
+    ##################################################################
+    # Publish the births of a failover and wait until the NBIRTH is on
+    # its way to the server, which takes until the sender got to it if
+    # there is an outbound queue
+    ##################################################################
+    async def _failoverBirth(self):
+        if self.outbound is None:
+            await self.rebirth()
+            return
+        self._birthSent = asyncio.get_event_loop().create_future()
+        await self.rebirth()
+        await self._birthSent
+
+    def _startFailover(self, nextServer):
+        if self._failoverTask is None or self._failoverTask.done():
+            self._failoverTask = self._startCommand(self.failover(nextServer))
+
+    def _onDisconnect(self, rc):
+        # A clean disconnect is either stop() or a failover in progress
+        if rc != 0 and self._stopped is not None and not self._stopped.done():
+            if self._birthPending:
+                self._lostDuringFailover = True
+            self._startFailover(False)
+
+    ##################################################################
+    # Stop the scan tasks, publish the NDEATH and disconnect.  A clean
+    # disconnect does not trigger the will so the death is sent here,
+    # ahead of anything still queued.
+    ##################################################################
+    async def stop(self):
+        for task in self._tasks + list(self._commands):
+            task.cancel()
+        self._tasks = []
+        self._commands = set()
+        self._outboundReady = None
+        if self.deathPayload is not None:
+            await self._send(self.nodeTopic("NDEATH"), self.deathPayload)
+        await self.transport.disconnect()
+        if self._stopped is not None and not self._stopped.done():
+            self._stopped.set_result(None)
+
+    ##################################################################
+    # Start the node and run until stop() is called
+    ##################################################################
+    async def run(self):
+        await self.start()
+        await self._stopped
+
+    ##################################################################
+    # Hand the queued messages to the transport.  A message which fails
+    # to publish goes back to the front of the queue and is retried once
+    # the node connected again, or after a second.  During a failover
+    # only the new births are published until the NBIRTH is out,
+    # anything else belongs to the session which ended and is dropped,
+    # as are births which fail; the failover publishes new ones once it
+    # connected again.
+    ##################################################################
+    async def _sendQueued(self):
+        ready = self._outboundReady
+        reconnected = self._reconnected
+        while True:
+            message = self.outbound.get()
+            if message is None:
+                ready.clear()
+                await ready.wait()
+                continue
+            messageType = message[0].split("/")[2]
+            birthSent = self._birthSent is not None and self._birthSent.done()
+            if self._birthPending and not birthSent and messageType not in ("NBIRTH", "DBIRTH"):
+                if messageType in ("NDATA", "DDATA"):
+                    self.dataDropped += 1
+                continue
+            connects = self.connects
+            try:
+                await self._send(*message)
+            except ConnectionError as e:
+                if self._birthPending and not birthSent:
+                    if self._birthSent is not None and not self._birthSent.done():
+                        self._birthSent.set_exception(e)
+                        self._birthSent = None
+                    continue
+                self.outbound.unget(*message)
+                print("Failed to publish, retrying: " + str(e))
+                reconnected.clear()
+                if self.connects == connects:
+                    try:
+                        await asyncio.wait_for(reconnected.wait(), 1)
+                    except asyncio.TimeoutError:
+                        pass
+
+    async def _scan(self, task, periodMs):
+        loop = asyncio.get_event_loop()
+        period = periodMs / 1000.0
+        while True:
+            started = loop.time()
+            try:
+                await _call(task, self)
+            except ConnectionError as e:
+                # Nothing to do until the failover connected again
+                print("Scan task failed to publish: " + str(e))
+            await asyncio.sleep(max(0, period - (loop.time() - started)))
+
+    def _onMessage(self, topic, payload):
+        if self.primaryHost is not None:
+            wasOnline = self.primaryHost.online
+            if self.primaryHost.onMessage(topic, payload):
+                if self.primaryHost.online and not wasOnline:
+                    self._startCommand(self._primaryHostReturned())
+                return
+
+        tokens = topic.split("/")
+        if len(tokens) < 4 or tokens[0] != "spBv1.0" or tokens[1] != self.groupId or tokens[3] != self.nodeName:
+            print("Unknown command: " + topic)
+            return
+        if tokens[2] == "NCMD":
+            deviceId = None
+        elif tokens[2] == "DCMD" and len(tokens) > 4:
+            deviceId = tokens[4]
+        else:
+            print("Unknown command: " + topic)
+            return
+
+        try:
+            inboundPayload = sparkplug.parsePayload(payload)
+        except DecodeError as e:
+            print("Dropping unreadable command on " + topic + ": " + str(e))
+            return
+        self._startCommand(self._handleCommand(deviceId, inboundPayload))
+
+    def _startCommand(self, coroutine):
+        task = asyncio.get_event_loop().create_task(coroutine)
+        self._commands.add(task)
+        task.add_done_callback(self._commands.discard)
+        return task
+
+    async def _handleCommand(self, deviceId, payload):
+        for metric in payload.metrics:
+            handler = None
+            if metric.HasField("name"):
+                handler = self._handlersByName.get(metric.name)
+            if handler is None and metric.HasField("alias"):
+                handler = self._handlersByAlias.get(metric.alias)
+            if handler is None:
+                print("Unknown command: " + metric.name)
+                continue
+            await _call(handler, self, deviceId, metric)
+
+    ##################################################################
+    # Ask for the births to be published again, as soon as the rebirth
+    # limiter allows
+    ##################################################################
+    async def requestRebirth(self):
+        limiter = self.rebirthLimiter
+        if limiter is None:
+            await self.rebirth()
+            return
+        limiter.request()
+        if self._rebirthTask is None or self._rebirthTask.done():
+            self._rebirthTask = self._startCommand(self._rebirthWhenDue())
+
+    async def _rebirthWhenDue(self):
+        limiter = self.rebirthLimiter
+        while limiter.pending:
+            await asyncio.sleep(limiter.delay())
+            if limiter.due():
+                await self.rebirth()
+
+    ##################################################################
+    # Publish the births and the data buffered while the primary host
+    # was offline.  DATA which was suspended or dropped took seq numbers
+    # the host never sees, so the births go out again through the
+    # rebirth limiter before the buffered data is replayed.  Otherwise
+    # the replayed data takes the seq numbers following the last message
+    # published, the outbound queue numbers it in order by itself.
+    ##################################################################
+    async def _primaryHostReturned(self):
+        messages = self.primaryHost.drain()
+        rebirth = self.primaryHost.rebirthOnReturn or self.primaryHost.lostInOutage > 0
+        if rebirth:
+            await self.requestRebirth()
+            if self.rebirthLimiter is not None:
+                await self._rebirthTask
+        for topic, payload, qos, retain in messages:
+            if payload.HasField("seq"):
+                if rebirth:
+                    payload.seq = sparkplug.getSeqNum()
+                elif self.outbound is None and self._lastSeq is not None:
+                    payload.seq = (self._lastSeq + 1) % 256
+            await self.publish(topic, payload, qos, retain)
+
+    ##################################################################
+    # Command handler for 'Node Control/Next Server', register it again
+    # with the alias used in the NBIRTH
+    ##################################################################
+    async def nextServerCommand(self, deviceId, metric):
+        self._startFailover(True)
+
+    ##################################################################
+    # Command handler for 'Node Control/Rebirth' and 'Reboot', register
+    # it again with the aliases used in the NBIRTH
+    ##################################################################
+    async def rebirthCommand(self, deviceId, metric):
+        await self.requestRebirth()
+######################################################################
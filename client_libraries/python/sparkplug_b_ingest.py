@@ -0,0 +1,415 @@
+#/********************************************************************************
+# * Copyright (c) 2014, 2018 Cirrus Link Solutions and others
+# *
+# * This program and the accompanying materials are made available under the
+# * terms of the Eclipse Public License 2.0 which is available at
+# * http://www.eclipse.org/legal/epl-2.0.
+# *
+# * SPDX-License-Identifier: EPL-2.0
+# *
+# * Contributors:
+# *   Cirrus Link Solutions - initial implementation
+# ********************************************************************************/
+import multiprocessing
+import os
+import pickle
+import struct
+import time
+import zlib
+from multiprocessing import shared_memory
+
+import sparkplug_b as sparkplug
+
+######################################################################
+# Single producer, single consumer ring buffer of variable length
+# records in shared memory.  The header holds two monotonically
+# increasing byte counters, head (written by the producer) and tail
+# (written by the consumer).  Each record is a uint32 length followed by
+# the data, padded to 8 bytes; a length of WRAP marks that the record
+# continues at the start of the buffer.  'items' counts the records
+# which can be read so the consumer can block instead of polling.
+#
+# A record never takes more than half the capacity, so it still fits
+# together with the padding skipped at the end of the buffer when it
+# wraps; records larger than maxRecord bytes are rejected.
+######################################################################
+class ShmRing:
+    HEADER = 16
+    WRAP = 0xFFFFFFFF
+    _counter = struct.Struct("<Q")
+    _length = struct.Struct("<I")
+
+    def __init__(self, capacity=4 << 20, name=None, items=None):
+        if name is None:
+            capacity = (capacity + 7) & ~7
+            self.shm = shared_memory.SharedMemory(create=True, size=self.HEADER + capacity)
+            self.shm.buf[:self.HEADER] = bytes(self.HEADER)
+            self.owner = True
+        else:
+            self.shm = shared_memory.SharedMemory(name=name)
+            self.owner = False
+        self.capacity = capacity
+        self.maxRecord = ((capacity // 2) & ~7) - 4
+        self.items = items if items is not None else multiprocessing.Semaphore(0)
+        self.buf = self.shm.buf
+
+    ##################################################################
+    # What a child process needs to attach to the ring
+    ##################################################################
+    def handle(self):
+        return (self.shm.name, self.capacity, self.items)
+
+    @classmethod
+    def attach(cls, handle):
+        name, capacity, items = handle
+        return cls(capacity, name, items)
+
+    def _head(self):
+        return self._counter.unpack_from(self.buf, 0)[0]
+
+    def _tail(self):
+        return self._counter.unpack_from(self.buf, 8)[0]
+
+    ##################################################################
+    # Append one record made of the concatenated parts, waiting up to
+    # timeout seconds (forever if None) while the ring is full.  Returns
+    # False if the record could not be written in time.
+    ##################################################################
+    def write(self, *parts, timeout=None):
+        size = 0
+        for part in parts:
+            size += len(part)
+        if size > self.maxRecord:
+            raise ValueError("Record of %d bytes does not fit a ring of %d bytes" % (size, self.capacity))
+        needed = (4 + size + 7) & ~7
+
+        head = self._head()
+        position = head % self.capacity
+        remaining = self.capacity - position
+        # The padding is shorter than the record, so needed + wrap fits
+        wrap = remaining if needed > remaining else 0
+        deadline = time.time() + timeout if timeout is not None else None
+        while self.capacity - (head - self._tail()) < needed + wrap:
+            if deadline is not None and time.time() >= deadline:
+                return False
+            time.sleep(0.0005)
+
+        buf = self.buf
+        if wrap:
+            self._length.pack_into(buf, self.HEADER + position, self.WRAP)
+            head += wrap
+            position = 0
+        offset = self.HEADER + position
+        self._length.pack_into(buf, offset, size)
+        offset += 4
+        for part in parts:
+            buf[offset:offset + len(part)] = part
+            offset += len(part)
+        self._counter.pack_into(buf, 0, head + needed)
+        self.items.release()
+        return True
+
+    ##################################################################
+    # Remove and return the next record, waiting up to timeout seconds
+    # (forever if None).  Returns None if nothing arrived in time.
+    ##################################################################
+    def read(self, timeout=None):
+        if not self.items.acquire(True, timeout):
+            return None
+        return self._take()
+
+    def readNowait(self):
+        if not self.items.acquire(False):
+            return None
+        return self._take()
+
+    def _take(self):
+        buf = self.buf
+        tail = self._tail()
+        position = tail % self.capacity
+        size = self._length.unpack_from(buf, self.HEADER + position)[0]
+        if size == self.WRAP:
+            tail += self.capacity - position
+            position = 0
+            size = self._length.unpack_from(buf, self.HEADER)[0]
+        offset = self.HEADER + position + 4
+        data = bytes(buf[offset:offset + size])
+        self._counter.pack_into(buf, 8, tail + ((4 + size + 7) & ~7))
+        return data
+
+    def close(self):
+        self.buf = None
+        self.shm.close()
+        if self.owner:
+            self.shm.unlink()
+######################################################################
+
+######################################################################
+# One decoded message.  metrics is a list of (name, alias, timestamp,
+# datatype, value) with names resolved from the births of the node
+# for metrics which only carry an alias.
+######################################################################
+class IngestResult:
+    __slots__ = ("topic", "messageType", "groupId", "edgeNodeId", "deviceId", "seq", "timestamp", "metrics")
+
+    def __init__(self, topic, messageType, groupId, edgeNodeId, deviceId, seq, timestamp, metrics):
+        self.topic = topic
+        self.messageType = messageType
+        self.groupId = groupId
+        self.edgeNodeId = edgeNodeId
+        self.deviceId = deviceId
+        self.seq = seq
+        self.timestamp = timestamp
+        self.metrics = metrics
+
+    def __getstate__(self):
+        return (self.topic, self.messageType, self.groupId, self.edgeNodeId, self.deviceId, self.seq, self.timestamp, self.metrics)
+
+    def __setstate__(self, state):
+        (self.topic, self.messageType, self.groupId, self.edgeNodeId, self.deviceId, self.seq, self.timestamp, self.metrics) = state
+######################################################################
+
+_record = struct.Struct("<H")
+_STOP = b"\xff\xff"
+
+######################################################################
+# Decode one message, keeping the alias tables of every edge node this
+# worker owns in 'aliases'
+######################################################################
+def decodeMessage(topic, data, aliases):
+    tokens = topic.split("/")
+    if len(tokens) < 4 or tokens[0] != "spBv1.0":
+        return None
+    groupId, messageType, edgeNodeId = tokens[1], tokens[2], tokens[3]
+    deviceId = tokens[4] if len(tokens) > 4 else None
+    if messageType not in ("NBIRTH", "DBIRTH", "NDATA", "DDATA", "NDEATH", "DDEATH", "NCMD", "DCMD"):
+        return None
+
+    payload = sparkplug.parsePayload(data)
+    key = (groupId, edgeNodeId)
+    if messageType == "NBIRTH":
+        names = aliases[key] = {}
+    else:
+        names = aliases.setdefault(key, {})
+
+    metrics = []
+    birth = messageType == "NBIRTH" or messageType == "DBIRTH"
+    for metric in payload.metrics:
+        name = metric.name if metric.HasField("name") else None
+        alias = metric.alias if metric.HasField("alias") else None
+        datatype = metric.datatype if metric.HasField("datatype") else None
+        if alias is not None:
+            if birth:
+                names[alias] = (name, datatype)
+            else:
+                known = names.get(alias)
+                if known is not None:
+                    if name is None:
+                        name = known[0]
+                    if datatype is None:
+                        datatype = known[1]
+                        metric.datatype = datatype
+        metrics.append((name, alias, metric.timestamp if metric.HasField("timestamp") else None,
+                datatype, sparkplug.getMetricValue(metric)))
+
+    return IngestResult(topic, messageType, groupId, edgeNodeId, deviceId,
+            payload.seq if payload.HasField("seq") else None,
+            payload.timestamp if payload.HasField("timestamp") else None, metrics)
+######################################################################
+
+######################################################################
+# Hand a batch of results back through the output ring.  Batches which
+# pickle to more than the ring takes are split, a single result which
+# still does not fit is dropped and reported.
+######################################################################
+def _writeBatch(outputRing, ready, batch):
+    data = pickle.dumps(batch, pickle.HIGHEST_PROTOCOL)
+    if len(data) > outputRing.maxRecord and len(batch) > 1:
+        half = len(batch) // 2
+        _writeBatch(outputRing, ready, batch[:half])
+        _writeBatch(outputRing, ready, batch[half:])
+        return
+    try:
+        outputRing.write(data)
+    except ValueError as e:
+        print("Dropped the decoded message on " + batch[0].topic + ": " + str(e))
+        return
+    ready.release()
+######################################################################
+
+######################################################################
+# Worker process: decode the messages of its shard and hand them back
+# in pickled batches of at most batchSize results.  A batch is also
+# handed back once the raw messages in it add up to a quarter of the
+# largest output record, decoded results pickle to a few times their
+# protobuf size.
+######################################################################
+def _worker(inputHandle, outputHandle, ready, batchSize):
+    inputRing = ShmRing.attach(inputHandle)
+    outputRing = ShmRing.attach(outputHandle)
+    maxBatchBytes = outputRing.maxRecord // 4
+    aliases = {}
+    batch = []
+    batchBytes = 0
+    stopping = False
+    while not stopping:
+        record = inputRing.read() if len(batch) == 0 else inputRing.readNowait()
+        if record is None or len(batch) >= batchSize or batchBytes >= maxBatchBytes:
+            _writeBatch(outputRing, ready, batch)
+            batch = []
+            batchBytes = 0
+            if record is None:
+                continue
+        if record[:2] == _STOP:
+            stopping = True
+            continue
+        topicLength = _record.unpack_from(record, 0)[0]
+        topic = record[2:2 + topicLength].decode("utf-8")
+        try:
+            result = decodeMessage(topic, record[2 + topicLength:], aliases)
+        except Exception as e:
+            print("Failed to decode message on " + topic + ": " + str(e))
+            continue
+        if result is not None:
+            batch.append(result)
+            batchBytes += len(record)
+    if len(batch) > 0:
+        _writeBatch(outputRing, ready, batch)
+    outputRing.write(_STOP)
+    ready.release()
+    inputRing.close()
+    outputRing.close()
+######################################################################
+
+######################################################################
+# Host ingestion pipeline sharding messages across worker processes by
+# (group, edge node) so the messages of a node are always decoded in
+# order by the same worker.  Raw messages travel to the workers through
+# shared memory rings instead of being pickled; decoded results come
+# back in batches and are merged into a single stream by results().
+######################################################################
+class ShardedIngestor:
+    def __init__(self, workers=None, ringSize=4 << 20, batchSize=256):
+        self.workerCount = workers or os.cpu_count() or 1
+        self.ringSize = ringSize
+        self.batchSize = batchSize
+        self.inputs = []
+        self.outputs = []
+        self.processes = []
+        self.ready = None
+        self._shards = {}
+        self._running = 0
+        self._stopped = set()
+
+    def start(self):
+        self.ready = multiprocessing.Semaphore(0)
+        for index in range(self.workerCount):
+            inputRing = ShmRing(self.ringSize)
+            outputRing = ShmRing(self.ringSize)
+            process = multiprocessing.Process(target=_worker, name="sparkplug-ingest-%d" % index,
+                    args=(inputRing.handle(), outputRing.handle(), self.ready, self.batchSize))
+            process.daemon = True
+            process.start()
+            self.inputs.append(inputRing)
+            self.outputs.append(outputRing)
+            self.processes.append(process)
+        self._running = self.workerCount
+        self._stopped = set()
+
+    ##################################################################
+    # Index of the worker owning the edge node of a topic
+    ##################################################################
+    def shard(self, topic):
+        tokens = topic.split("/", 4)
+        key = "/".join(tokens[1:4:2]) if len(tokens) >= 4 else topic
+        shard = self._shards.get(key)
+        if shard is None:
+            shard = self._shards[key] = zlib.crc32(key.encode("utf-8")) % self.workerCount
+        return shard
+
+    ##################################################################
+    # Queue one received message for decoding
+    ##################################################################
+    def submit(self, topic, payload):
+        topicBytes = topic.encode("utf-8")
+        self.inputs[self.shard(topic)].write(_record.pack(len(topicBytes)), topicBytes, payload)
+
+    ##################################################################
+    # Decoded results which became available within timeout seconds
+    # (forever if None), an empty list if none did
+    ##################################################################
+    def poll(self, timeout=None):
+        results = []
+        if self.ready.acquire(True, timeout):
+            # The rings are drained below, a permit left over from a
+            # record read here makes the next poll return early at most
+            while self.ready.acquire(False):
+                pass
+        for index in range(len(self.outputs)):
+            self._drain(index, results)
+        self._reap(results)
+        return results
+
+    def _drain(self, index, results):
+        outputRing = self.outputs[index]
+        while True:
+            data = outputRing.readNowait()
+            if data is None:
+                return
+            if data == _STOP:
+                self._stopped.add(index)
+                self._running -= 1
+            else:
+                results.extend(pickle.loads(data))
+
+    ##################################################################
+    # Collect what workers which died without stopping left behind and
+    # stop waiting for them
+    ##################################################################
+    def _reap(self, results):
+        for index, process in enumerate(self.processes):
+            if index in self._stopped or process.exitcode is None:
+                continue
+            self._drain(index, results)
+            if index not in self._stopped:
+                print("Ingest worker %d exited with code %d" % (index, process.exitcode))
+                self._stopped.add(index)
+                self._running -= 1
+
+    ##################################################################
+    # Generator of decoded results until stop() finished
+    ##################################################################
+    def results(self):
+        while self._running > 0:
+            for result in self.poll(0.1):
+                yield result
+
+    ##################################################################
+    # Let the workers finish the queued messages and exit, giving up
+    # after timeout seconds.  The results still pending are returned.
+    ##################################################################
+    def stop(self, timeout=10.0):
+        deadline = time.time() + timeout
+        stopping = set()
+        pending = []
+        while self._running > 0 and time.time() < deadline:
+            # Keep draining while the stop records queue behind the
+            # messages, a worker may be waiting for room in its output
+            for index, inputRing in enumerate(self.inputs):
+                if index not in stopping and index not in self._stopped and inputRing.write(_STOP, timeout=0):
+                    stopping.add(index)
+            pending.extend(self.poll(0.05))
+        for process in self.processes:
+            process.join(max(deadline - time.time(), 0))
+            if process.is_alive():
+                print("Ingest worker " + process.name + " did not stop in time")
+                process.terminate()
+                process.join()
+        for ring in self.inputs + self.outputs:
+            ring.close()
+        self.inputs = []
+        self.outputs = []
+        self.processes = []
+        self._running = 0
+        return pending
+######################################################################
@@ -0,0 +1,183 @@
+#/********************************************************************************
+# * Copyright (c) 2014, 2018 Cirrus Link Solutions and others
+# *
+# * This program and the accompanying materials are made available under the
+# * terms of the Eclipse Public License 2.0 which is available at
+# * http://www.eclipse.org/legal/epl-2.0.
+# *
+# * SPDX-License-Identifier: EPL-2.0
+# *
+# * Contributors:
+# *   Cirrus Link Solutions - initial implementation
+# ********************************************************************************/
+import bisect
+import collections
+import threading
+import time
+
+# Upper bounds of the latency histogram buckets in seconds, the last bucket is unbounded
+LATENCY_BUCKETS = [0.00001, 0.00002, 0.00005, 0.0001, 0.0002, 0.0005, 0.001, 0.002, 0.005, 0.01, 0.02, 0.05, 0.1]
+
+# Payloads waiting to be published whose creation time is kept, the
+# oldest are forgotten beyond this
+MAX_PENDING_BUILDS = 10000
+
+######################################################################
+# Latency histogram with fixed buckets
+######################################################################
+class Histogram:
+    def __init__(self, bounds=LATENCY_BUCKETS):
+        self.bounds = bounds
+        self.counts = [0] * (len(bounds) + 1)
+        self.count = 0
+        self.sum = 0.0
+
+    def record(self, value):
+        self.counts[bisect.bisect_left(self.bounds, value)] += 1
+        self.count += 1
+        self.sum += value
+
+    ##################################################################
+    # Estimate a percentile (0-100) as the upper bound of its bucket
+    ##################################################################
+    def percentile(self, percent):
+        if self.count == 0:
+            return None
+        target = self.count * percent / 100.0
+        seen = 0
+        for index, count in enumerate(self.counts):
+            seen += count
+            if seen >= target and count > 0:
+                return self.bounds[index] if index < len(self.bounds) else float("inf")
+        return float("inf")
+
+    def snapshot(self):
+        return { "bounds" : list(self.bounds), "counts" : list(self.counts), "count" : self.count, "sum" : self.sum }
+######################################################################
+
+######################################################################
+# Counters and latency histograms of the sparkplug_b hot paths.  Enable
+# with sparkplug_b.enableInstrumentation(), while it is disabled the
+# library only pays for a None check per call.
+#
+# Hooks are called as hook(event, value) for every recorded event so
+# the data can be exported to an external metrics system:
+#   "metric"            value is the MetricDataType of an added metric
+#   "payload"           value is 1 for every payload created
+#   "serialize"         value is the number of bytes serialized
+#   "parse"             value is the number of bytes parsed
+#   "build_latency"     seconds from payload creation until it is handed
+#                       to publish, or serialized if that comes first
+#   "serialize_latency" seconds spent in SerializeToString
+######################################################################
+class Instrumentation:
+    def __init__(self):
+        self.lock = threading.Lock()
+        self.hooks = []
+        self.reset()
+
+    def reset(self):
+        with self.lock:
+            self.metricsAdded = {}
+            self.payloadsBuilt = 0
+            self.bytesSerialized = 0
+            self.serializeCalls = 0
+            self.parseCalls = 0
+            self.bytesParsed = 0
+            self.buildLatency = Histogram()
+            self.serializeLatency = Histogram()
+            self._buildStarts = collections.OrderedDict()
+
+    def addHook(self, hook):
+        self.hooks.append(hook)
+
+    def removeHook(self, hook):
+        self.hooks.remove(hook)
+
+    def metricAdded(self, type, count=1):
+        with self.lock:
+            self.metricsAdded[type] = self.metricsAdded.get(type, 0) + count
+        for hook in self.hooks:
+            hook("metric", type)
+
+    ##################################################################
+    # Record a new payload and remember when it was created so the
+    # build latency can be recorded when it is published.  The upb and
+    # cpp messages cannot be weakly referenced, so creation times are
+    # kept by id() and bounded by MAX_PENDING_BUILDS for payloads which
+    # are never published.
+    ##################################################################
+    def payloadCreated(self, payload):
+        key = id(payload)
+        now = time.perf_counter()
+        with self.lock:
+            self.payloadsBuilt += 1
+            starts = self._buildStarts
+            # The id of a payload which was dropped unserialized can be reused
+            starts.pop(key, None)
+            starts[key] = now
+            if len(starts) > MAX_PENDING_BUILDS:
+                starts.popitem(last=False)
+        for hook in self.hooks:
+            hook("payload", 1)
+
+    ##################################################################
+    # Record the build latency of a payload handed to publish, before
+    # it waits in a queue.  Only the first call for a payload counts.
+    ##################################################################
+    def payloadPublished(self, payload):
+        now = time.perf_counter()
+        with self.lock:
+            buildSeconds = self._buildDone(payload, now)
+        if buildSeconds is not None:
+            for hook in self.hooks:
+                hook("build_latency", buildSeconds)
+
+    ##################################################################
+    # Record a serialized payload.  Its build latency is recorded here
+    # if it was serialized without being handed to publish first.
+    ##################################################################
+    def payloadSerialized(self, payload, size, seconds):
+        now = time.perf_counter()
+        with self.lock:
+            self.serializeCalls += 1
+            self.bytesSerialized += size
+            self.serializeLatency.record(seconds)
+            buildSeconds = self._buildDone(payload, now - seconds)
+        for hook in self.hooks:
+            hook("serialize", size)
+            hook("serialize_latency", seconds)
+            if buildSeconds is not None:
+                hook("build_latency", buildSeconds)
+
+    def _buildDone(self, payload, now):
+        start = self._buildStarts.pop(id(payload), None)
+        if start is None:
+            return None
+        buildSeconds = now - start
+        self.buildLatency.record(buildSeconds)
+        return buildSeconds
+
+    def payloadParsed(self, size):
+        with self.lock:
+            self.parseCalls += 1
+            self.bytesParsed += size
+        for hook in self.hooks:
+            hook("parse", size)
+
+    ##################################################################
+    # Copy of all counters and histograms as plain data
+    ##################################################################
+    def snapshot(self):
+        with self.lock:
+            return {
+                "metrics_added" : dict(self.metricsAdded),
+                "payloads_built" : self.payloadsBuilt,
+                "bytes_serialized" : self.bytesSerialized,
+                "serialize_calls" : self.serializeCalls,
+                "parse_calls" : self.parseCalls,
+                "bytes_parsed" : self.bytesParsed,
+                "build_latency" : self.buildLatency.snapshot(),
+                "serialize_latency" : self.serializeLatency.snapshot(),
+            }
+######################################################################
@@ -0,0 +1,412 @@
+#/********************************************************************************
+# * Copyright (c) 2014, 2018 Cirrus Link Solutions and others
+# *
+# * This program and the accompanying materials are made available under the
+# * terms of the Eclipse Public License 2.0 which is available at
+# * http://www.eclipse.org/legal/epl-2.0.
+# *
+# * SPDX-License-Identifier: EPL-2.0
+# *
+# * Contributors:
+# *   Cirrus Link Solutions - initial implementation
+# ********************************************************************************/
+import base64
+import json
+import math
+from json.encoder import encode_basestring_ascii as _quote
+
+import sparkplug_b_pb2
+from sparkplug_b import MetricDataType
+
+######################################################################
+# Converter between Payload and JSON documents conforming to
+# sparkplug_b/sparkplug_b.json.  Encoding writes JSON text directly
+# through per-datatype writers without building intermediate dicts and
+# can stream into any object with a write(str) method.  Bytes, File and
+# body values are base64 encoded.
+######################################################################
+
+# Datatype names used by the JSON schema, PropertySet and PropertySetList
+# only appear as property types
+_typeNames = dict((value, name) for name, value in vars(MetricDataType).items() if not name.startswith("_"))
+_typeNames[20] = "PropertySet"
+_typeNames[21] = "PropertySetList"
+_typeValues = dict((name, value) for value, name in _typeNames.items())
+
+# Datatypes whose values are carried as two's complement in unsigned fields
+_signed32 = (MetricDataType.Int8, MetricDataType.Int16, MetricDataType.Int32)
+
+######################################################################
+# Encoding helpers shared by metrics, dataset elements, parameters and
+# property values which all carry their value in a oneof with the same
+# field names
+######################################################################
+def _typeName(type):
+    return _quote(_typeNames.get(type, "Unknown"))
+
+def _float(value):
+    if math.isinf(value) or math.isnan(value):
+        return _quote(repr(value).replace("inf", "Infinity").replace("nan", "NaN"))
+    return repr(value)
+
+def _int32(value):
+    return str(value - 0x100000000 if value > 0x7FFFFFFF else value)
+
+def _int64(value):
+    return str(value - 0x10000000000000000 if value > 0x7FFFFFFFFFFFFFFF else value)
+
+def _bytes(value):
+    return _quote(base64.b64encode(value).decode("ascii"))
+
+def _bool(value):
+    return "true" if value else "false"
+
+# Writers of plain values keyed by datatype, each takes the message and returns JSON text
+_valueWriters = {
+    MetricDataType.Int8 : lambda m: _int32(m.int_value),
+    MetricDataType.Int16 : lambda m: _int32(m.int_value),
+    MetricDataType.Int32 : lambda m: _int32(m.int_value),
+    MetricDataType.Int64 : lambda m: _int64(m.long_value),
+    MetricDataType.UInt8 : lambda m: str(m.int_value),
+    MetricDataType.UInt16 : lambda m: str(m.int_value),
+    MetricDataType.UInt32 : lambda m: str(m.int_value),
+    MetricDataType.UInt64 : lambda m: str(m.long_value),
+    MetricDataType.Float : lambda m: _float(m.float_value),
+    MetricDataType.Double : lambda m: _float(m.double_value),
+    MetricDataType.Boolean : lambda m: _bool(m.boolean_value),
+    MetricDataType.String : lambda m: _quote(m.string_value),
+    MetricDataType.DateTime : lambda m: str(m.long_value),
+    MetricDataType.Text : lambda m: _quote(m.string_value),
+    MetricDataType.UUID : lambda m: _quote(m.string_value),
+    MetricDataType.Bytes : lambda m: _bytes(m.bytes_value),
+    MetricDataType.File : lambda m: _bytes(m.bytes_value),
+}
+######################################################################
+
+######################################################################
+# Writers of the structured parts of a payload
+######################################################################
+def _writeMetadata(metadata, write):
+    separator = "{"
+    for field, key, writer in _metadataFields:
+        if metadata.HasField(field):
+            write(separator + key + writer(getattr(metadata, field)))
+            separator = ","
+    write("}" if separator == "," else "{}")
+
+_metadataFields = [
+    ("content_type", '"contentType":', _quote),
+    ("is_multi_part", '"isMultiPart":', _bool),
+    ("seq", '"seq":', str),
+    ("size", '"size":', str),
+    ("file_name", '"fileName":', _quote),
+    ("file_type", '"fileType":', _quote),
+    ("md5", '"md5":', _quote),
+    ("description", '"description":', _quote),
+]
+
+def _writePropertyValue(value, write):
+    write('{"type":' + _typeName(value.type) + ',"value":')
+    if value.is_null:
+        write("null")
+    elif value.type == 20:
+        _writePropertySet(value.propertyset_value, write)
+    elif value.type == 21:
+        separator = "["
+        for propertySet in value.propertysets_value.propertyset:
+            write(separator)
+            _writePropertySet(propertySet, write)
+            separator = ","
+        write("]" if separator == "," else "[]")
+    else:
+        writer = _valueWriters.get(value.type)
+        write(writer(value) if writer is not None else "null")
+    write("}")
+
+def _writePropertySet(propertySet, write):
+    separator = "{"
+    for key, value in zip(propertySet.keys, propertySet.values):
+        write(separator + _quote(key) + ":")
+        _writePropertyValue(value, write)
+        separator = ","
+    write("}" if separator == "," else "{}")
+
+# The schema has no null dataset elements, an unset element is written
+# as the default value of its column type which is also what reading it
+# from the protobuf message returns.  Only elements of a column without
+# a known type are null.
+def _writeDataset(dataset, write):
+    types = list(dataset.types)
+    write('{"numberOfColumns":' + str(dataset.num_of_columns))
+    write(',"columnNames":[' + ",".join(_quote(column) for column in dataset.columns) + "]")
+    write(',"types":[' + ",".join(_typeName(type) for type in types) + "]")
+    write(',"rows":[')
+    writers = [_valueWriters.get(type) for type in types]
+    rowSeparator = ""
+    for row in dataset.rows:
+        write(rowSeparator + "[" + ",".join(
+                writers[index](element) if index < len(writers) and writers[index] is not None else "null"
+                for index, element in enumerate(row.elements)) + "]")
+        rowSeparator = ","
+    write("]}")
+
+def _writeTemplate(template, write):
+    separator = "{"
+    if template.HasField("version"):
+        write(separator + '"version":' + _quote(template.version))
+        separator = ","
+    if template.HasField("template_ref"):
+        write(separator + '"reference":' + _quote(template.template_ref))
+        separator = ","
+    if template.HasField("is_definition"):
+        write(separator + '"isDefinition":' + _bool(template.is_definition))
+        separator = ","
+    if len(template.parameters) > 0:
+        write(separator + '"parameters":[')
+        parameterSeparator = ""
+        for parameter in template.parameters:
+            # A parameter without a value has no "value" key, the schema has no null parameter value
+            writer = _valueWriters.get(parameter.type)
+            value = ""
+            if writer is not None and parameter.WhichOneof("value") is not None:
+                value = ',"value":' + writer(parameter)
+            write(parameterSeparator + '{"name":' + _quote(parameter.name) + ',"type":' + _typeName(parameter.type)
+                    + value + "}")
+            parameterSeparator = ","
+        write("]")
+        separator = ","
+    if len(template.metrics) > 0:
+        write(separator + '"metrics":')
+        _writeMetrics(template.metrics, write)
+        separator = ","
+    write("}" if separator == "," else "{}")
+
+def _writeMetrics(metrics, write):
+    separator = "["
+    for metric in metrics:
+        write(separator)
+        _writeMetric(metric, write)
+        separator = ","
+    write("]" if separator == "," else "[]")
+
+def _writeMetric(metric, write):
+    parts = []
+    if metric.HasField("name"):
+        parts.append('"name":' + _quote(metric.name))
+    if metric.HasField("alias"):
+        parts.append('"alias":' + str(metric.alias))
+    if metric.HasField("timestamp"):
+        parts.append('"timestamp":' + str(metric.timestamp))
+    if metric.HasField("datatype"):
+        parts.append('"datatype":' + _typeName(metric.datatype))
+    if metric.HasField("is_historical"):
+        parts.append('"isHistorical":' + _bool(metric.is_historical))
+    if metric.HasField("is_transient"):
+        parts.append('"isTransient":' + _bool(metric.is_transient))
+    write("{" + ",".join(parts))
+    separator = "," if len(parts) > 0 else ""
+
+    if metric.HasField("metadata"):
+        write(separator + '"metadata":')
+        _writeMetadata(metric.metadata, write)
+        separator = ","
+    if metric.HasField("properties"):
+        write(separator + '"properties":')
+        _writePropertySet(metric.properties, write)
+        separator = ","
+
+    field = metric.WhichOneof("value")
+    if metric.is_null:
+        write(separator + '"value":null')
+    elif field == "dataset_value":
+        write(separator + '"value":')
+        _writeDataset(metric.dataset_value, write)
+    elif field == "template_value":
+        write(separator + '"value":')
+        _writeTemplate(metric.template_value, write)
+    elif field is not None:
+        writer = _valueWriters.get(metric.datatype)
+        if writer is None:
+            # Unknown datatype, write the raw field
+            value = getattr(metric, field)
+            writer = lambda m: _bytes(value) if isinstance(value, bytes) else json.dumps(value)
+        write(separator + '"value":' + writer(metric))
+    write("}")
+######################################################################
+
+######################################################################
+# Write a payload as JSON text to stream.write
+######################################################################
+def writePayloadJson(payload, stream):
+    write = stream.write
+    parts = []
+    if payload.HasField("timestamp"):
+        parts.append('"timestamp":' + str(payload.timestamp))
+    if payload.HasField("seq"):
+        parts.append('"seq":' + str(payload.seq))
+    if payload.HasField("uuid"):
+        parts.append('"uuid":' + _quote(payload.uuid))
+    if payload.HasField("body"):
+        parts.append('"body":' + _bytes(payload.body))
+    write("{" + ",".join(parts))
+    write(',"metrics":' if len(parts) > 0 else '"metrics":')
+    _writeMetrics(payload.metrics, write)
+    write("}")
+######################################################################
+
+######################################################################
+# Convert a payload to JSON text
+######################################################################
+def payloadToJson(payload):
+    chunks = []
+    writePayloadJson(payload, _ListWriter(chunks))
+    return "".join(chunks)
+
+class _ListWriter:
+    def __init__(self, chunks):
+        self.write = chunks.append
+######################################################################
+
+######################################################################
+# Decoding helpers.  Values are written to the oneof field matching
+# their datatype, signed integers as two's complement.
+######################################################################
+def _toType(type):
+    if isinstance(type, int):
+        return type
+    if type not in _typeValues:
+        raise ValueError("Unknown datatype: " + str(type))
+    return _typeValues[type]
+
+def _setValue(message, type, value):
+    if type in _signed32:
+        message.int_value = int(value) & 0xFFFFFFFF
+    elif type in (MetricDataType.UInt8, MetricDataType.UInt16, MetricDataType.UInt32):
+        message.int_value = int(value)
+    elif type == MetricDataType.Int64:
+        message.long_value = int(value) & 0xFFFFFFFFFFFFFFFF
+    elif type in (MetricDataType.UInt64, MetricDataType.DateTime):
+        message.long_value = int(value)
+    elif type == MetricDataType.Float:
+        message.float_value = float(value)
+    elif type == MetricDataType.Double:
+        message.double_value = float(value)
+    elif type == MetricDataType.Boolean:
+        message.boolean_value = bool(value)
+    elif type in (MetricDataType.String, MetricDataType.Text, MetricDataType.UUID):
+        message.string_value = value
+    elif type in (MetricDataType.Bytes, MetricDataType.File):
+        message.bytes_value = base64.b64decode(value)
+    else:
+        raise ValueError("Cannot set a value of datatype " + str(type))
+
+def _readPropertySet(obj, propertySet):
+    for key, property in obj.items():
+        propertySet.keys.append(key)
+        _readPropertyValue(property, propertySet.values.add())
+
+def _readPropertyValue(obj, value):
+    if "type" in obj:
+        value.type = _toType(obj["type"])
+    propertyValue = obj.get("value")
+    if propertyValue is None:
+        value.is_null = True
+    elif value.type == 20:
+        _readPropertySet(propertyValue, value.propertyset_value)
+    elif value.type == 21:
+        value.propertysets_value.SetInParent()
+        for propertySet in propertyValue:
+            _readPropertySet(propertySet, value.propertysets_value.propertyset.add())
+    else:
+        _setValue(value, value.type, propertyValue)
+
+def _readDataset(obj, dataset):
+    types = [_toType(type) for type in obj.get("types", [])]
+    dataset.num_of_columns = obj.get("numberOfColumns", len(types))
+    dataset.columns.extend(obj.get("columnNames", []))
+    dataset.types.extend(types)
+    for values in obj.get("rows", []):
+        row = dataset.rows.add()
+        for index, value in enumerate(values):
+            element = row.elements.add()
+            if value is not None:
+                _setValue(element, types[index], value)
+
+def _readTemplate(obj, template):
+    if "version" in obj:
+        template.version = obj["version"]
+    if "reference" in obj:
+        template.template_ref = obj["reference"]
+    if "isDefinition" in obj:
+        template.is_definition = obj["isDefinition"]
+    for parameterObj in obj.get("parameters", []):
+        parameter = template.parameters.add()
+        if "name" in parameterObj:
+            parameter.name = parameterObj["name"]
+        if "type" in parameterObj:
+            parameter.type = _toType(parameterObj["type"])
+        if parameterObj.get("value") is not None:
+            _setValue(parameter, parameter.type, parameterObj["value"])
+    for metricObj in obj.get("metrics", []):
+        _readMetric(metricObj, template.metrics.add())
+
+def _readMetric(obj, metric):
+    if "name" in obj:
+        metric.name = obj["name"]
+    if "alias" in obj:
+        metric.alias = obj["alias"]
+    if "timestamp" in obj:
+        metric.timestamp = obj["timestamp"]
+    if "datatype" in obj:
+        metric.datatype = _toType(obj["datatype"])
+    if "isHistorical" in obj:
+        metric.is_historical = obj["isHistorical"]
+    if "isTransient" in obj:
+        metric.is_transient = obj["isTransient"]
+    if "metadata" in obj:
+        metadata = obj["metadata"]
+        metric.metadata.SetInParent()
+        for field, key, writer in _metadataFields:
+            name = key[1:-2]
+            if name in metadata:
+                setattr(metric.metadata, field, metadata[name])
+    if "properties" in obj:
+        metric.properties.SetInParent()
+        _readPropertySet(obj["properties"], metric.properties)
+    if "value" in obj:
+        value = obj["value"]
+        if value is None:
+            metric.is_null = True
+        elif metric.datatype == MetricDataType.DataSet:
+            _readDataset(value, metric.dataset_value)
+        elif metric.datatype == MetricDataType.Template:
+            _readTemplate(value, metric.template_value)
+        else:
+            _setValue(metric, metric.datatype, value)
+######################################################################
+
+######################################################################
+# Convert an already parsed JSON document (dicts and lists) to a
+# payload
+######################################################################
+def payloadFromObject(obj):
+    payload = sparkplug_b_pb2.Payload()
+    if "timestamp" in obj:
+        payload.timestamp = obj["timestamp"]
+    if "seq" in obj:
+        payload.seq = obj["seq"]
+    if "uuid" in obj:
+        payload.uuid = obj["uuid"]
+    if "body" in obj:
+        payload.body = base64.b64decode(obj["body"])
+    for metricObj in obj.get("metrics", []):
+        _readMetric(metricObj, payload.metrics.add())
+    return payload
+######################################################################
+
+######################################################################
+# Convert JSON text to a payload
+######################################################################
+def payloadFromJson(text):
+    return payloadFromObject(json.loads(text))
+######################################################################
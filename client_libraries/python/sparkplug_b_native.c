@@ -0,0 +1,1217 @@
+/********************************************************************************
+ * Copyright (c) 2014-2019 Cirrus Link Solutions and others
+ *
+ * This program and the accompanying materials are made available under the
+ * terms of the Eclipse Public License 2.0 which is available at
+ * http://www.eclipse.org/legal/epl-2.0.
+ *
+ * SPDX-License-Identifier: EPL-2.0
+ *
+ * Contributors:
+ *   Cirrus Link Solutions - initial implementation
+ ********************************************************************************/
+
+/*
+ * Native Sparkplug B payload codec for Python built on the nanopb code of
+ * client_libraries/c.  Payloads are exchanged with Python as plain dicts
+ * keyed by the protobuf field names holding only the fields which are set,
+ * see sparkplug_b_native.py which also provides the pure Python fallback.
+ *
+ * tahu.c is not used as its encode/decode helpers print debug output, the
+ * nanopb functions are called directly instead.
+ */
+
+#define PY_SSIZE_T_CLEAN
+#include <Python.h>
+
+#include <stddef.h>
+#include <stdlib.h>
+#include <string.h>
+#include <pb_decode.h>
+#include <pb_encode.h>
+#include <tahu.pb.h>
+
+typedef org_eclipse_tahu_protobuf_Payload Payload;
+typedef org_eclipse_tahu_protobuf_Payload_Metric Metric;
+typedef org_eclipse_tahu_protobuf_Payload_MetaData MetaData;
+typedef org_eclipse_tahu_protobuf_Payload_PropertySet PropertySet;
+typedef org_eclipse_tahu_protobuf_Payload_PropertySetList PropertySetList;
+typedef org_eclipse_tahu_protobuf_Payload_PropertyValue PropertyValue;
+typedef org_eclipse_tahu_protobuf_Payload_DataSet DataSet;
+typedef org_eclipse_tahu_protobuf_Payload_DataSet_Row Row;
+typedef org_eclipse_tahu_protobuf_Payload_DataSet_DataSetValue DataSetValue;
+typedef org_eclipse_tahu_protobuf_Payload_Template Template;
+typedef org_eclipse_tahu_protobuf_Payload_Template_Parameter Parameter;
+
+/*
+ * Interned dict keys, one per protobuf field name
+ */
+enum {
+    K_timestamp, K_metrics, K_seq, K_uuid, K_body,
+    K_name, K_alias, K_datatype, K_is_historical, K_is_transient, K_is_null, K_metadata, K_properties,
+    K_int_value, K_long_value, K_float_value, K_double_value, K_boolean_value, K_string_value, K_bytes_value,
+    K_dataset_value, K_template_value, K_extension_value,
+    K_is_multi_part, K_content_type, K_size, K_file_name, K_file_type, K_md5, K_description,
+    K_keys, K_values, K_type, K_propertyset_value, K_propertysets_value, K_propertyset,
+    K_num_of_columns, K_columns, K_types, K_rows, K_elements,
+    K_version, K_parameters, K_template_ref, K_is_definition,
+    K_COUNT
+};
+
+static const char *key_names[K_COUNT] = {
+    "timestamp", "metrics", "seq", "uuid", "body",
+    "name", "alias", "datatype", "is_historical", "is_transient", "is_null", "metadata", "properties",
+    "int_value", "long_value", "float_value", "double_value", "boolean_value", "string_value", "bytes_value",
+    "dataset_value", "template_value", "extension_value",
+    "is_multi_part", "content_type", "size", "file_name", "file_type", "md5", "description",
+    "keys", "values", "type", "propertyset_value", "propertysets_value", "propertyset",
+    "num_of_columns", "columns", "types", "rows", "elements",
+    "version", "parameters", "template_ref", "is_definition",
+};
+
+static PyObject *keys[K_COUNT];
+
+/********************************************************************************
+ * Decoding: nanopb structures to dicts
+ ********************************************************************************/
+
+/* Store value under key, stealing the reference.  A NULL value is an error
+ * already raised by the function which created it. */
+static int put(PyObject *dict, int key, PyObject *value) {
+    if (value == NULL) {
+        return -1;
+    }
+    int result = PyDict_SetItem(dict, keys[key], value);
+    Py_DECREF(value);
+    return result;
+}
+
+static PyObject *to_string(const char *value) {
+    return PyUnicode_DecodeUTF8(value, strlen(value), NULL);
+}
+
+static PyObject *to_bytes(const pb_bytes_array_t *value) {
+    return PyBytes_FromStringAndSize((const char *)value->bytes, value->size);
+}
+
+static PyObject *to_string_list(char **values, pb_size_t count) {
+    PyObject *list = PyList_New(count);
+    if (list == NULL) {
+        return NULL;
+    }
+    for (pb_size_t i = 0; i < count; i++) {
+        PyObject *item = to_string(values[i]);
+        if (item == NULL) {
+            Py_DECREF(list);
+            return NULL;
+        }
+        PyList_SET_ITEM(list, i, item);
+    }
+    return list;
+}
+
+static PyObject *from_metric(const Metric *metric);
+static PyObject *from_propertyset(const PropertySet *propertyset);
+
+static PyObject *from_metadata(const MetaData *metadata) {
+    PyObject *dict = PyDict_New();
+    if (dict == NULL) {
+        return NULL;
+    }
+    if ((metadata->has_is_multi_part && put(dict, K_is_multi_part, PyBool_FromLong(metadata->is_multi_part)) < 0)
+            || (metadata->content_type != NULL && put(dict, K_content_type, to_string(metadata->content_type)) < 0)
+            || (metadata->has_size && put(dict, K_size, PyLong_FromUnsignedLongLong(metadata->size)) < 0)
+            || (metadata->has_seq && put(dict, K_seq, PyLong_FromUnsignedLongLong(metadata->seq)) < 0)
+            || (metadata->file_name != NULL && put(dict, K_file_name, to_string(metadata->file_name)) < 0)
+            || (metadata->file_type != NULL && put(dict, K_file_type, to_string(metadata->file_type)) < 0)
+            || (metadata->md5 != NULL && put(dict, K_md5, to_string(metadata->md5)) < 0)
+            || (metadata->description != NULL && put(dict, K_description, to_string(metadata->description)) < 0)) {
+        Py_DECREF(dict);
+        return NULL;
+    }
+    return dict;
+}
+
+static PyObject *from_propertysetlist(const PropertySetList *propertysets) {
+    PyObject *dict = PyDict_New();
+    if (dict == NULL) {
+        return NULL;
+    }
+    if (propertysets->propertyset_count > 0) {
+        PyObject *list = PyList_New(propertysets->propertyset_count);
+        if (put(dict, K_propertyset, list) < 0) {
+            Py_DECREF(dict);
+            return NULL;
+        }
+        for (pb_size_t i = 0; i < propertysets->propertyset_count; i++) {
+            PyObject *item = from_propertyset(&propertysets->propertyset[i]);
+            if (item == NULL) {
+                Py_DECREF(dict);
+                return NULL;
+            }
+            PyList_SET_ITEM(list, i, item);
+        }
+    }
+    return dict;
+}
+
+static PyObject *from_propertyvalue(const PropertyValue *value) {
+    PyObject *dict = PyDict_New();
+    if (dict == NULL) {
+        return NULL;
+    }
+    int result = 0;
+    if (value->has_type) {
+        result = put(dict, K_type, PyLong_FromUnsignedLong(value->type));
+    }
+    if (result == 0 && value->has_is_null) {
+        result = put(dict, K_is_null, PyBool_FromLong(value->is_null));
+    }
+    if (result == 0) {
+        switch (value->which_value) {
+        case org_eclipse_tahu_protobuf_Payload_PropertyValue_int_value_tag:
+            result = put(dict, K_int_value, PyLong_FromUnsignedLong(value->value.int_value));
+            break;
+        case org_eclipse_tahu_protobuf_Payload_PropertyValue_long_value_tag:
+            result = put(dict, K_long_value, PyLong_FromUnsignedLongLong(value->value.long_value));
+            break;
+        case org_eclipse_tahu_protobuf_Payload_PropertyValue_float_value_tag:
+            result = put(dict, K_float_value, PyFloat_FromDouble(value->value.float_value));
+            break;
+        case org_eclipse_tahu_protobuf_Payload_PropertyValue_double_value_tag:
+            result = put(dict, K_double_value, PyFloat_FromDouble(value->value.double_value));
+            break;
+        case org_eclipse_tahu_protobuf_Payload_PropertyValue_boolean_value_tag:
+            result = put(dict, K_boolean_value, PyBool_FromLong(value->value.boolean_value));
+            break;
+        case org_eclipse_tahu_protobuf_Payload_PropertyValue_string_value_tag:
+            result = put(dict, K_string_value, to_string(value->value.string_value));
+            break;
+        case org_eclipse_tahu_protobuf_Payload_PropertyValue_propertyset_value_tag:
+            result = put(dict, K_propertyset_value, from_propertyset(&value->value.propertyset_value));
+            break;
+        case org_eclipse_tahu_protobuf_Payload_PropertyValue_propertysets_value_tag:
+            result = put(dict, K_propertysets_value, from_propertysetlist(&value->value.propertysets_value));
+            break;
+        case org_eclipse_tahu_protobuf_Payload_PropertyValue_extension_value_tag:
+            result = put(dict, K_extension_value, PyDict_New());
+            break;
+        }
+    }
+    if (result < 0) {
+        Py_DECREF(dict);
+        return NULL;
+    }
+    return dict;
+}
+
+static PyObject *from_propertyset(const PropertySet *propertyset) {
+    PyObject *dict = PyDict_New();
+    if (dict == NULL) {
+        return NULL;
+    }
+    if (propertyset->keys_count > 0 && put(dict, K_keys, to_string_list(propertyset->keys, propertyset->keys_count)) < 0) {
+        Py_DECREF(dict);
+        return NULL;
+    }
+    if (propertyset->values_count > 0) {
+        PyObject *list = PyList_New(propertyset->values_count);
+        if (put(dict, K_values, list) < 0) {
+            Py_DECREF(dict);
+            return NULL;
+        }
+        for (pb_size_t i = 0; i < propertyset->values_count; i++) {
+            PyObject *item = from_propertyvalue(&propertyset->values[i]);
+            if (item == NULL) {
+                Py_DECREF(dict);
+                return NULL;
+            }
+            PyList_SET_ITEM(list, i, item);
+        }
+    }
+    return dict;
+}
+
+static PyObject *from_datasetvalue(const DataSetValue *value) {
+    PyObject *dict = PyDict_New();
+    if (dict == NULL) {
+        return NULL;
+    }
+    int result = 0;
+    switch (value->which_value) {
+    case org_eclipse_tahu_protobuf_Payload_DataSet_DataSetValue_int_value_tag:
+        result = put(dict, K_int_value, PyLong_FromUnsignedLong(value->value.int_value));
+        break;
+    case org_eclipse_tahu_protobuf_Payload_DataSet_DataSetValue_long_value_tag:
+        result = put(dict, K_long_value, PyLong_FromUnsignedLongLong(value->value.long_value));
+        break;
+    case org_eclipse_tahu_protobuf_Payload_DataSet_DataSetValue_float_value_tag:
+        result = put(dict, K_float_value, PyFloat_FromDouble(value->value.float_value));
+        break;
+    case org_eclipse_tahu_protobuf_Payload_DataSet_DataSetValue_double_value_tag:
+        result = put(dict, K_double_value, PyFloat_FromDouble(value->value.double_value));
+        break;
+    case org_eclipse_tahu_protobuf_Payload_DataSet_DataSetValue_boolean_value_tag:
+        result = put(dict, K_boolean_value, PyBool_FromLong(value->value.boolean_value));
+        break;
+    case org_eclipse_tahu_protobuf_Payload_DataSet_DataSetValue_string_value_tag:
+        result = put(dict, K_string_value, to_string(value->value.string_value));
+        break;
+    case org_eclipse_tahu_protobuf_Payload_DataSet_DataSetValue_extension_value_tag:
+        result = put(dict, K_extension_value, PyDict_New());
+        break;
+    }
+    if (result < 0) {
+        Py_DECREF(dict);
+        return NULL;
+    }
+    return dict;
+}
+
+static PyObject *from_dataset(const DataSet *dataset) {
+    PyObject *dict = PyDict_New();
+    if (dict == NULL) {
+        return NULL;
+    }
+    if ((dataset->has_num_of_columns && put(dict, K_num_of_columns, PyLong_FromUnsignedLongLong(dataset->num_of_columns)) < 0)
+            || (dataset->columns_count > 0 && put(dict, K_columns, to_string_list(dataset->columns, dataset->columns_count)) < 0)) {
+        Py_DECREF(dict);
+        return NULL;
+    }
+    if (dataset->types_count > 0) {
+        PyObject *list = PyList_New(dataset->types_count);
+        if (put(dict, K_types, list) < 0) {
+            Py_DECREF(dict);
+            return NULL;
+        }
+        for (pb_size_t i = 0; i < dataset->types_count; i++) {
+            PyObject *item = PyLong_FromUnsignedLong(dataset->types[i]);
+            if (item == NULL) {
+                Py_DECREF(dict);
+                return NULL;
+            }
+            PyList_SET_ITEM(list, i, item);
+        }
+    }
+    if (dataset->rows_count > 0) {
+        PyObject *rows = PyList_New(dataset->rows_count);
+        if (put(dict, K_rows, rows) < 0) {
+            Py_DECREF(dict);
+            return NULL;
+        }
+        for (pb_size_t i = 0; i < dataset->rows_count; i++) {
+            const Row *row = &dataset->rows[i];
+            PyObject *rowDict = PyDict_New();
+            if (rowDict == NULL) {
+                Py_DECREF(dict);
+                return NULL;
+            }
+            PyList_SET_ITEM(rows, i, rowDict);
+            if (row->elements_count > 0) {
+                PyObject *elements = PyList_New(row->elements_count);
+                if (put(rowDict, K_elements, elements) < 0) {
+                    Py_DECREF(dict);
+                    return NULL;
+                }
+                for (pb_size_t j = 0; j < row->elements_count; j++) {
+                    PyObject *item = from_datasetvalue(&row->elements[j]);
+                    if (item == NULL) {
+                        Py_DECREF(dict);
+                        return NULL;
+                    }
+                    PyList_SET_ITEM(elements, j, item);
+                }
+            }
+        }
+    }
+    return dict;
+}
+
+static PyObject *from_parameter(const Parameter *parameter) {
+    PyObject *dict = PyDict_New();
+    if (dict == NULL) {
+        return NULL;
+    }
+    int result = 0;
+    if (parameter->name != NULL) {
+        result = put(dict, K_name, to_string(parameter->name));
+    }
+    if (result == 0 && parameter->has_type) {
+        result = put(dict, K_type, PyLong_FromUnsignedLong(parameter->type));
+    }
+    if (result == 0) {
+        switch (parameter->which_value) {
+        case org_eclipse_tahu_protobuf_Payload_Template_Parameter_int_value_tag:
+            result = put(dict, K_int_value, PyLong_FromUnsignedLong(parameter->value.int_value));
+            break;
+        case org_eclipse_tahu_protobuf_Payload_Template_Parameter_long_value_tag:
+            result = put(dict, K_long_value, PyLong_FromUnsignedLongLong(parameter->value.long_value));
+            break;
+        case org_eclipse_tahu_protobuf_Payload_Template_Parameter_float_value_tag:
+            result = put(dict, K_float_value, PyFloat_FromDouble(parameter->value.float_value));
+            break;
+        case org_eclipse_tahu_protobuf_Payload_Template_Parameter_double_value_tag:
+            result = put(dict, K_double_value, PyFloat_FromDouble(parameter->value.double_value));
+            break;
+        case org_eclipse_tahu_protobuf_Payload_Template_Parameter_boolean_value_tag:
+            result = put(dict, K_boolean_value, PyBool_FromLong(parameter->value.boolean_value));
+            break;
+        case org_eclipse_tahu_protobuf_Payload_Template_Parameter_string_value_tag:
+            result = put(dict, K_string_value, to_string(parameter->value.string_value));
+            break;
+        case org_eclipse_tahu_protobuf_Payload_Template_Parameter_extension_value_tag:
+            result = put(dict, K_extension_value, PyDict_New());
+            break;
+        }
+    }
+    if (result < 0) {
+        Py_DECREF(dict);
+        return NULL;
+    }
+    return dict;
+}
+
+static PyObject *from_metrics(const Metric *metrics, pb_size_t count) {
+    PyObject *list = PyList_New(count);
+    if (list == NULL) {
+        return NULL;
+    }
+    for (pb_size_t i = 0; i < count; i++) {
+        PyObject *item = from_metric(&metrics[i]);
+        if (item == NULL) {
+            Py_DECREF(list);
+            return NULL;
+        }
+        PyList_SET_ITEM(list, i, item);
+    }
+    return list;
+}
+
+static PyObject *from_template(const Template *template) {
+    PyObject *dict = PyDict_New();
+    if (dict == NULL) {
+        return NULL;
+    }
+    if ((template->version != NULL && put(dict, K_version, to_string(template->version)) < 0)
+            || (template->metrics_count > 0 && put(dict, K_metrics, from_metrics(template->metrics, template->metrics_count)) < 0)) {
+        Py_DECREF(dict);
+        return NULL;
+    }
+    if (template->parameters_count > 0) {
+        PyObject *list = PyList_New(template->parameters_count);
+        if (put(dict, K_parameters, list) < 0) {
+            Py_DECREF(dict);
+            return NULL;
+        }
+        for (pb_size_t i = 0; i < template->parameters_count; i++) {
+            PyObject *item = from_parameter(&template->parameters[i]);
+            if (item == NULL) {
+                Py_DECREF(dict);
+                return NULL;
+            }
+            PyList_SET_ITEM(list, i, item);
+        }
+    }
+    if ((template->template_ref != NULL && put(dict, K_template_ref, to_string(template->template_ref)) < 0)
+            || (template->has_is_definition && put(dict, K_is_definition, PyBool_FromLong(template->is_definition)) < 0)) {
+        Py_DECREF(dict);
+        return NULL;
+    }
+    return dict;
+}
+
+static PyObject *from_metric(const Metric *metric) {
+    PyObject *dict = PyDict_New();
+    if (dict == NULL) {
+        return NULL;
+    }
+    if ((metric->name != NULL && put(dict, K_name, to_string(metric->name)) < 0)
+            || (metric->has_alias && put(dict, K_alias, PyLong_FromUnsignedLongLong(metric->alias)) < 0)
+            || (metric->has_timestamp && put(dict, K_timestamp, PyLong_FromUnsignedLongLong(metric->timestamp)) < 0)
+            || (metric->has_datatype && put(dict, K_datatype, PyLong_FromUnsignedLong(metric->datatype)) < 0)
+            || (metric->has_is_historical && put(dict, K_is_historical, PyBool_FromLong(metric->is_historical)) < 0)
+            || (metric->has_is_transient && put(dict, K_is_transient, PyBool_FromLong(metric->is_transient)) < 0)
+            || (metric->has_is_null && put(dict, K_is_null, PyBool_FromLong(metric->is_null)) < 0)
+            || (metric->has_metadata && put(dict, K_metadata, from_metadata(&metric->metadata)) < 0)
+            || (metric->has_properties && put(dict, K_properties, from_propertyset(&metric->properties)) < 0)) {
+        Py_DECREF(dict);
+        return NULL;
+    }
+    int result = 0;
+    switch (metric->which_value) {
+    case org_eclipse_tahu_protobuf_Payload_Metric_int_value_tag:
+        result = put(dict, K_int_value, PyLong_FromUnsignedLong(metric->value.int_value));
+        break;
+    case org_eclipse_tahu_protobuf_Payload_Metric_long_value_tag:
+        result = put(dict, K_long_value, PyLong_FromUnsignedLongLong(metric->value.long_value));
+        break;
+    case org_eclipse_tahu_protobuf_Payload_Metric_float_value_tag:
+        result = put(dict, K_float_value, PyFloat_FromDouble(metric->value.float_value));
+        break;
+    case org_eclipse_tahu_protobuf_Payload_Metric_double_value_tag:
+        result = put(dict, K_double_value, PyFloat_FromDouble(metric->value.double_value));
+        break;
+    case org_eclipse_tahu_protobuf_Payload_Metric_boolean_value_tag:
+        result = put(dict, K_boolean_value, PyBool_FromLong(metric->value.boolean_value));
+        break;
+    case org_eclipse_tahu_protobuf_Payload_Metric_string_value_tag:
+        result = put(dict, K_string_value, to_string(metric->value.string_value));
+        break;
+    case org_eclipse_tahu_protobuf_Payload_Metric_bytes_value_tag:
+        result = put(dict, K_bytes_value, to_bytes(metric->value.bytes_value));
+        break;
+    case org_eclipse_tahu_protobuf_Payload_Metric_dataset_value_tag:
+        result = put(dict, K_dataset_value, from_dataset(&metric->value.dataset_value));
+        break;
+    case org_eclipse_tahu_protobuf_Payload_Metric_template_value_tag:
+        result = put(dict, K_template_value, from_template(&metric->value.template_value));
+        break;
+    case org_eclipse_tahu_protobuf_Payload_Metric_extension_value_tag:
+        result = put(dict, K_extension_value, PyDict_New());
+        break;
+    }
+    if (result < 0) {
+        Py_DECREF(dict);
+        return NULL;
+    }
+    return dict;
+}
+
+static PyObject *from_payload(const Payload *payload) {
+    PyObject *dict = PyDict_New();
+    if (dict == NULL) {
+        return NULL;
+    }
+    if ((payload->has_timestamp && put(dict, K_timestamp, PyLong_FromUnsignedLongLong(payload->timestamp)) < 0)
+            || (payload->metrics_count > 0 && put(dict, K_metrics, from_metrics(payload->metrics, payload->metrics_count)) < 0)
+            || (payload->has_seq && put(dict, K_seq, PyLong_FromUnsignedLongLong(payload->seq)) < 0)
+            || (payload->uuid != NULL && put(dict, K_uuid, to_string(payload->uuid)) < 0)
+            || (payload->body != NULL && put(dict, K_body, to_bytes(payload->body)) < 0)) {
+        Py_DECREF(dict);
+        return NULL;
+    }
+    return dict;
+}
+
+/********************************************************************************
+ * Encoding: dicts to nanopb structures
+ *
+ * Strings point into the str objects of the dict.  The sequences made from
+ * repeated fields are kept by the arena, so the items of a generator or other
+ * iterable stay alive for the whole encode as well.  Arrays and bytes are
+ * allocated from the arena too, which is released in one go once the payload
+ * is encoded.
+ ********************************************************************************/
+
+typedef union block {
+    union block *next;
+    max_align_t align;
+} block;
+
+typedef struct {
+    block *head;
+    PyObject *keep;
+} arena;
+
+static void *arena_alloc(arena *a, size_t size) {
+    block *b = calloc(1, sizeof(block) + size);
+    if (b == NULL) {
+        PyErr_NoMemory();
+        return NULL;
+    }
+    b->next = a->head;
+    a->head = b;
+    return b + 1;
+}
+
+/* Keep a new reference alive until arena_free(), stealing it */
+static int arena_keep(arena *a, PyObject *object) {
+    if (a->keep == NULL && (a->keep = PyList_New(0)) == NULL) {
+        Py_DECREF(object);
+        return -1;
+    }
+    int result = PyList_Append(a->keep, object);
+    Py_DECREF(object);
+    return result;
+}
+
+static void arena_free(arena *a) {
+    while (a->head != NULL) {
+        block *next = a->head->next;
+        free(a->head);
+        a->head = next;
+    }
+    Py_CLEAR(a->keep);
+}
+
+/* Dict lookup counting the known fields found so unknown ones can be
+ * reported afterwards */
+typedef struct {
+    PyObject *dict;
+    Py_ssize_t found;
+    const char *message;
+} fields;
+
+static int open_fields(fields *f, PyObject *dict, const char *message) {
+    if (!PyDict_Check(dict)) {
+        PyErr_Format(PyExc_TypeError, "%s must be a dict, not %.100s", message, Py_TYPE(dict)->tp_name);
+        return -1;
+    }
+    f->dict = dict;
+    f->found = 0;
+    f->message = message;
+    return 0;
+}
+
+static PyObject *field(fields *f, int key) {
+    PyObject *value = PyDict_GetItemWithError(f->dict, keys[key]);
+    if (value != NULL) {
+        f->found++;
+    }
+    return value;
+}
+
+static int close_fields(fields *f) {
+    if (PyErr_Occurred()) {
+        return -1;
+    }
+    if (f->found != PyDict_GET_SIZE(f->dict)) {
+        PyErr_Format(PyExc_ValueError, "Unknown field in %s: %R", f->message, f->dict);
+        return -1;
+    }
+    return 0;
+}
+
+static int get_u64(PyObject *value, uint64_t *out) {
+    *out = PyLong_AsUnsignedLongLong(value);
+    return (*out == (uint64_t)-1 && PyErr_Occurred()) ? -1 : 0;
+}
+
+static int get_u32(PyObject *value, uint32_t *out) {
+    uint64_t wide;
+    if (get_u64(value, &wide) < 0) {
+        return -1;
+    }
+    if (wide > 0xFFFFFFFFu) {
+        PyErr_SetString(PyExc_ValueError, "Value out of range for a uint32 field");
+        return -1;
+    }
+    *out = (uint32_t)wide;
+    return 0;
+}
+
+static int get_bool(PyObject *value, bool *out) {
+    int truth = PyObject_IsTrue(value);
+    if (truth < 0) {
+        return -1;
+    }
+    *out = truth;
+    return 0;
+}
+
+static int get_double(PyObject *value, double *out) {
+    *out = PyFloat_AsDouble(value);
+    return (*out == -1.0 && PyErr_Occurred()) ? -1 : 0;
+}
+
+static int get_float(PyObject *value, float *out) {
+    double wide;
+    if (get_double(value, &wide) < 0) {
+        return -1;
+    }
+    *out = (float)wide;
+    return 0;
+}
+
+static int get_string(PyObject *value, char **out) {
+    const char *data;
+    Py_ssize_t size;
+    if (PyUnicode_Check(value)) {
+        data = PyUnicode_AsUTF8AndSize(value, &size);
+        if (data == NULL) {
+            return -1;
+        }
+    } else if (PyBytes_Check(value)) {
+        data = PyBytes_AS_STRING(value);
+        size = PyBytes_GET_SIZE(value);
+    } else {
+        PyErr_Format(PyExc_TypeError, "expected str, not %.100s", Py_TYPE(value)->tp_name);
+        return -1;
+    }
+    if ((size_t)size != strlen(data)) {
+        PyErr_SetString(PyExc_ValueError, "Strings with embedded null characters are not supported");
+        return -1;
+    }
+    *out = (char *)data;
+    return 0;
+}
+
+static int get_bytes(arena *a, PyObject *value, pb_bytes_array_t **out) {
+    Py_buffer view;
+    if (PyObject_GetBuffer(value, &view, PyBUF_SIMPLE) < 0) {
+        return -1;
+    }
+    pb_bytes_array_t *bytes = arena_alloc(a, PB_BYTES_ARRAY_T_ALLOCSIZE(view.len));
+    if (bytes != NULL) {
+        bytes->size = (pb_size_t)view.len;
+        memcpy(bytes->bytes, view.buf, view.len);
+    }
+    PyBuffer_Release(&view);
+    *out = bytes;
+    return bytes == NULL ? -1 : 0;
+}
+
+/* Turn a sequence into a PySequence_Fast kept by the arena and allocate an
+ * array for its items.  Returns a borrowed reference to the sequence or
+ * NULL. */
+static PyObject *get_array(arena *a, PyObject *value, size_t itemSize, void **array, pb_size_t *count) {
+    PyObject *sequence = PySequence_Fast(value, "repeated fields must be sequences");
+    if (sequence == NULL || arena_keep(a, sequence) < 0) {
+        return NULL;
+    }
+    *count = (pb_size_t)PySequence_Fast_GET_SIZE(sequence);
+    *array = arena_alloc(a, itemSize * (*count > 0 ? *count : 1));
+    if (*array == NULL) {
+        return NULL;
+    }
+    return sequence;
+}
+
+static int get_strings(arena *a, PyObject *value, char ***array, pb_size_t *count) {
+    PyObject *sequence = get_array(a, value, sizeof(char *), (void **)array, count);
+    if (sequence == NULL) {
+        return -1;
+    }
+    for (pb_size_t i = 0; i < *count; i++) {
+        if (get_string(PySequence_Fast_GET_ITEM(sequence, i), &(*array)[i]) < 0) {
+            return -1;
+        }
+    }
+    return 0;
+}
+
+/* At most one of the fields of a oneof may be given */
+static int only_one(const char *message, int count) {
+    if (count > 1) {
+        PyErr_Format(PyExc_ValueError, "More than one value field in %s", message);
+        return -1;
+    }
+    return 0;
+}
+
+static int to_metric(arena *a, PyObject *dict, Metric *metric);
+static int to_propertyset(arena *a, PyObject *dict, PropertySet *propertyset);
+
+static int to_metadata(PyObject *dict, MetaData *metadata) {
+    fields f;
+    PyObject *value;
+    if (open_fields(&f, dict, "MetaData") < 0) {
+        return -1;
+    }
+    if ((value = field(&f, K_is_multi_part)) != NULL) {
+        metadata->has_is_multi_part = true;
+        if (get_bool(value, &metadata->is_multi_part) < 0) return -1;
+    }
+    if ((value = field(&f, K_content_type)) != NULL && get_string(value, &metadata->content_type) < 0) return -1;
+    if ((value = field(&f, K_size)) != NULL) {
+        metadata->has_size = true;
+        if (get_u64(value, &metadata->size) < 0) return -1;
+    }
+    if ((value = field(&f, K_seq)) != NULL) {
+        metadata->has_seq = true;
+        if (get_u64(value, &metadata->seq) < 0) return -1;
+    }
+    if ((value = field(&f, K_file_name)) != NULL && get_string(value, &metadata->file_name) < 0) return -1;
+    if ((value = field(&f, K_file_type)) != NULL && get_string(value, &metadata->file_type) < 0) return -1;
+    if ((value = field(&f, K_md5)) != NULL && get_string(value, &metadata->md5) < 0) return -1;
+    if ((value = field(&f, K_description)) != NULL && get_string(value, &metadata->description) < 0) return -1;
+    return close_fields(&f);
+}
+
+static int to_propertysetlist(arena *a, PyObject *dict, PropertySetList *propertysets) {
+    fields f;
+    PyObject *value;
+    if (open_fields(&f, dict, "PropertySetList") < 0) {
+        return -1;
+    }
+    if ((value = field(&f, K_propertyset)) != NULL) {
+        PyObject *sequence = get_array(a, value, sizeof(PropertySet), (void **)&propertysets->propertyset, &propertysets->propertyset_count);
+        if (sequence == NULL) {
+            return -1;
+        }
+        for (pb_size_t i = 0; i < propertysets->propertyset_count; i++) {
+            if (to_propertyset(a, PySequence_Fast_GET_ITEM(sequence, i), &propertysets->propertyset[i]) < 0) {
+                return -1;
+            }
+        }
+    }
+    return close_fields(&f);
+}
+
+static int to_propertyvalue(arena *a, PyObject *dict, PropertyValue *propertyvalue) {
+    fields f;
+    PyObject *value;
+    int values = 0;
+    if (open_fields(&f, dict, "PropertyValue") < 0) {
+        return -1;
+    }
+    if ((value = field(&f, K_type)) != NULL) {
+        propertyvalue->has_type = true;
+        if (get_u32(value, &propertyvalue->type) < 0) return -1;
+    }
+    if ((value = field(&f, K_is_null)) != NULL) {
+        propertyvalue->has_is_null = true;
+        if (get_bool(value, &propertyvalue->is_null) < 0) return -1;
+    }
+    if ((value = field(&f, K_int_value)) != NULL) {
+        values++;
+        propertyvalue->which_value = org_eclipse_tahu_protobuf_Payload_PropertyValue_int_value_tag;
+        if (get_u32(value, &propertyvalue->value.int_value) < 0) return -1;
+    }
+    if ((value = field(&f, K_long_value)) != NULL) {
+        values++;
+        propertyvalue->which_value = org_eclipse_tahu_protobuf_Payload_PropertyValue_long_value_tag;
+        if (get_u64(value, &propertyvalue->value.long_value) < 0) return -1;
+    }
+    if ((value = field(&f, K_float_value)) != NULL) {
+        values++;
+        propertyvalue->which_value = org_eclipse_tahu_protobuf_Payload_PropertyValue_float_value_tag;
+        if (get_float(value, &propertyvalue->value.float_value) < 0) return -1;
+    }
+    if ((value = field(&f, K_double_value)) != NULL) {
+        values++;
+        propertyvalue->which_value = org_eclipse_tahu_protobuf_Payload_PropertyValue_double_value_tag;
+        if (get_double(value, &propertyvalue->value.double_value) < 0) return -1;
+    }
+    if ((value = field(&f, K_boolean_value)) != NULL) {
+        values++;
+        propertyvalue->which_value = org_eclipse_tahu_protobuf_Payload_PropertyValue_boolean_value_tag;
+        if (get_bool(value, &propertyvalue->value.boolean_value) < 0) return -1;
+    }
+    if ((value = field(&f, K_string_value)) != NULL) {
+        values++;
+        propertyvalue->which_value = org_eclipse_tahu_protobuf_Payload_PropertyValue_string_value_tag;
+        if (get_string(value, &propertyvalue->value.string_value) < 0) return -1;
+    }
+    if ((value = field(&f, K_propertyset_value)) != NULL) {
+        values++;
+        propertyvalue->which_value = org_eclipse_tahu_protobuf_Payload_PropertyValue_propertyset_value_tag;
+        if (to_propertyset(a, value, &propertyvalue->value.propertyset_value) < 0) return -1;
+    }
+    if ((value = field(&f, K_propertysets_value)) != NULL) {
+        values++;
+        propertyvalue->which_value = org_eclipse_tahu_protobuf_Payload_PropertyValue_propertysets_value_tag;
+        if (to_propertysetlist(a, value, &propertyvalue->value.propertysets_value) < 0) return -1;
+    }
+    if (only_one("PropertyValue", values) < 0) {
+        return -1;
+    }
+    return close_fields(&f);
+}
+
+static int to_propertyset(arena *a, PyObject *dict, PropertySet *propertyset) {
+    fields f;
+    PyObject *value;
+    if (open_fields(&f, dict, "PropertySet") < 0) {
+        return -1;
+    }
+    if ((value = field(&f, K_keys)) != NULL && get_strings(a, value, &propertyset->keys, &propertyset->keys_count) < 0) {
+        return -1;
+    }
+    if ((value = field(&f, K_values)) != NULL) {
+        PyObject *sequence = get_array(a, value, sizeof(PropertyValue), (void **)&propertyset->values, &propertyset->values_count);
+        if (sequence == NULL) {
+            return -1;
+        }
+        for (pb_size_t i = 0; i < propertyset->values_count; i++) {
+            if (to_propertyvalue(a, PySequence_Fast_GET_ITEM(sequence, i), &propertyset->values[i]) < 0) {
+                return -1;
+            }
+        }
+    }
+    return close_fields(&f);
+}
+
+static int to_datasetvalue(PyObject *dict, DataSetValue *element) {
+    fields f;
+    PyObject *value;
+    int values = 0;
+    if (open_fields(&f, dict, "DataSetValue") < 0) {
+        return -1;
+    }
+    if ((value = field(&f, K_int_value)) != NULL) {
+        values++;
+        element->which_value = org_eclipse_tahu_protobuf_Payload_DataSet_DataSetValue_int_value_tag;
+        if (get_u32(value, &element->value.int_value) < 0) return -1;
+    }
+    if ((value = field(&f, K_long_value)) != NULL) {
+        values++;
+        element->which_value = org_eclipse_tahu_protobuf_Payload_DataSet_DataSetValue_long_value_tag;
+        if (get_u64(value, &element->value.long_value) < 0) return -1;
+    }
+    if ((value = field(&f, K_float_value)) != NULL) {
+        values++;
+        element->which_value = org_eclipse_tahu_protobuf_Payload_DataSet_DataSetValue_float_value_tag;
+        if (get_float(value, &element->value.float_value) < 0) return -1;
+    }
+    if ((value = field(&f, K_double_value)) != NULL) {
+        values++;
+        element->which_value = org_eclipse_tahu_protobuf_Payload_DataSet_DataSetValue_double_value_tag;
+        if (get_double(value, &element->value.double_value) < 0) return -1;
+    }
+    if ((value = field(&f, K_boolean_value)) != NULL) {
+        values++;
+        element->which_value = org_eclipse_tahu_protobuf_Payload_DataSet_DataSetValue_boolean_value_tag;
+        if (get_bool(value, &element->value.boolean_value) < 0) return -1;
+    }
+    if ((value = field(&f, K_string_value)) != NULL) {
+        values++;
+        element->which_value = org_eclipse_tahu_protobuf_Payload_DataSet_DataSetValue_string_value_tag;
+        if (get_string(value, &element->value.string_value) < 0) return -1;
+    }
+    if (only_one("DataSetValue", values) < 0) {
+        return -1;
+    }
+    return close_fields(&f);
+}
+
+static int to_row(arena *a, PyObject *dict, Row *row) {
+    fields f;
+    PyObject *value;
+    if (open_fields(&f, dict, "Row") < 0) {
+        return -1;
+    }
+    if ((value = field(&f, K_elements)) != NULL) {
+        PyObject *sequence = get_array(a, value, sizeof(DataSetValue), (void **)&row->elements, &row->elements_count);
+        if (sequence == NULL) {
+            return -1;
+        }
+        for (pb_size_t i = 0; i < row->elements_count; i++) {
+            if (to_datasetvalue(PySequence_Fast_GET_ITEM(sequence, i), &row->elements[i]) < 0) {
+                return -1;
+            }
+        }
+    }
+    return close_fields(&f);
+}
+
+static int to_dataset(arena *a, PyObject *dict, DataSet *dataset) {
+    fields f;
+    PyObject *value;
+    if (open_fields(&f, dict, "DataSet") < 0) {
+        return -1;
+    }
+    if ((value = field(&f, K_num_of_columns)) != NULL) {
+        dataset->has_num_of_columns = true;
+        if (get_u64(value, &dataset->num_of_columns) < 0) return -1;
+    }
+    if ((value = field(&f, K_columns)) != NULL && get_strings(a, value, &dataset->columns, &dataset->columns_count) < 0) {
+        return -1;
+    }
+    if ((value = field(&f, K_types)) != NULL) {
+        PyObject *sequence = get_array(a, value, sizeof(uint32_t), (void **)&dataset->types, &dataset->types_count);
+        if (sequence == NULL) {
+            return -1;
+        }
+        for (pb_size_t i = 0; i < dataset->types_count; i++) {
+            if (get_u32(PySequence_Fast_GET_ITEM(sequence, i), &dataset->types[i]) < 0) {
+                return -1;
+            }
+        }
+    }
+    if ((value = field(&f, K_rows)) != NULL) {
+        PyObject *sequence = get_array(a, value, sizeof(Row), (void **)&dataset->rows, &dataset->rows_count);
+        if (sequence == NULL) {
+            return -1;
+        }
+        for (pb_size_t i = 0; i < dataset->rows_count; i++) {
+            if (to_row(a, PySequence_Fast_GET_ITEM(sequence, i), &dataset->rows[i]) < 0) {
+                return -1;
+            }
+        }
+    }
+    return close_fields(&f);
+}
+
+static int to_parameter(PyObject *dict, Parameter *parameter) {
+    fields f;
+    PyObject *value;
+    int values = 0;
+    if (open_fields(&f, dict, "Parameter") < 0) {
+        return -1;
+    }
+    if ((value = field(&f, K_name)) != NULL && get_string(value, &parameter->name) < 0) return -1;
+    if ((value = field(&f, K_type)) != NULL) {
+        parameter->has_type = true;
+        if (get_u32(value, &parameter->type) < 0) return -1;
+    }
+    if ((value = field(&f, K_int_value)) != NULL) {
+        values++;
+        parameter->which_value = org_eclipse_tahu_protobuf_Payload_Template_Parameter_int_value_tag;
+        if (get_u32(value, &parameter->value.int_value) < 0) return -1;
+    }
+    if ((value = field(&f, K_long_value)) != NULL) {
+        values++;
+        parameter->which_value = org_eclipse_tahu_protobuf_Payload_Template_Parameter_long_value_tag;
+        if (get_u64(value, &parameter->value.long_value) < 0) return -1;
+    }
+    if ((value = field(&f, K_float_value)) != NULL) {
+        values++;
+        parameter->which_value = org_eclipse_tahu_protobuf_Payload_Template_Parameter_float_value_tag;
+        if (get_float(value, &parameter->value.float_value) < 0) return -1;
+    }
+    if ((value = field(&f, K_double_value)) != NULL) {
+        values++;
+        parameter->which_value = org_eclipse_tahu_protobuf_Payload_Template_Parameter_double_value_tag;
+        if (get_double(value, &parameter->value.double_value) < 0) return -1;
+    }
+    if ((value = field(&f, K_boolean_value)) != NULL) {
+        values++;
+        parameter->which_value = org_eclipse_tahu_protobuf_Payload_Template_Parameter_boolean_value_tag;
+        if (get_bool(value, &parameter->value.boolean_value) < 0) return -1;
+    }
+    if ((value = field(&f, K_string_value)) != NULL) {
+        values++;
+        parameter->which_value = org_eclipse_tahu_protobuf_Payload_Template_Parameter_string_value_tag;
+        if (get_string(value, &parameter->value.string_value) < 0) return -1;
+    }
+    if (only_one("Parameter", values) < 0) {
+        return -1;
+    }
+    return close_fields(&f);
+}
+
+static int to_metrics(arena *a, PyObject *value, Metric **metrics, pb_size_t *count) {
+    PyObject *sequence = get_array(a, value, sizeof(Metric), (void **)metrics, count);
+    if (sequence == NULL) {
+        return -1;
+    }
+    for (pb_size_t i = 0; i < *count; i++) {
+        if (to_metric(a, PySequence_Fast_GET_ITEM(sequence, i), &(*metrics)[i]) < 0) {
+            return -1;
+        }
+    }
+    return 0;
+}
+
+static int to_template(arena *a, PyObject *dict, Template *template) {
+    fields f;
+    PyObject *value;
+    if (open_fields(&f, dict, "Template") < 0) {
+        return -1;
+    }
+    if ((value = field(&f, K_version)) != NULL && get_string(value, &template->version) < 0) return -1;
+    if ((value = field(&f, K_metrics)) != NULL && to_metrics(a, value, &template->metrics, &template->metrics_count) < 0) return -1;
+    if ((value = field(&f, K_parameters)) != NULL) {
+        PyObject *sequence = get_array(a, value, sizeof(Parameter), (void **)&template->parameters, &template->parameters_count);
+        if (sequence == NULL) {
+            return -1;
+        }
+        for (pb_size_t i = 0; i < template->parameters_count; i++) {
+            if (to_parameter(PySequence_Fast_GET_ITEM(sequence, i), &template->parameters[i]) < 0) {
+                return -1;
+            }
+        }
+    }
+    if ((value = field(&f, K_template_ref)) != NULL && get_string(value, &template->template_ref) < 0) return -1;
+    if ((value = field(&f, K_is_definition)) != NULL) {
+        template->has_is_definition = true;
+        if (get_bool(value, &template->is_definition) < 0) return -1;
+    }
+    return close_fields(&f);
+}
+
+static int to_metric(arena *a, PyObject *dict, Metric *metric) {
+    fields f;
+    PyObject *value;
+    int values = 0;
+    if (open_fields(&f, dict, "Metric") < 0) {
+        return -1;
+    }
+    if ((value = field(&f, K_name)) != NULL && get_string(value, &metric->name) < 0) return -1;
+    if ((value = field(&f, K_alias)) != NULL) {
+        metric->has_alias = true;
+        if (get_u64(value, &metric->alias) < 0) return -1;
+    }
+    if ((value = field(&f, K_timestamp)) != NULL) {
+        metric->has_timestamp = true;
+        if (get_u64(value, &metric->timestamp) < 0) return -1;
+    }
+    if ((value = field(&f, K_datatype)) != NULL) {
+        metric->has_datatype = true;
+        if (get_u32(value, &metric->datatype) < 0) return -1;
+    }
+    if ((value = field(&f, K_is_historical)) != NULL) {
+        metric->has_is_historical = true;
+        if (get_bool(value, &metric->is_historical) < 0) return -1;
+    }
+    if ((value = field(&f, K_is_transient)) != NULL) {
+        metric->has_is_transient = true;
+        if (get_bool(value, &metric->is_transient) < 0) return -1;
+    }
+    if ((value = field(&f, K_is_null)) != NULL) {
+        metric->has_is_null = true;
+        if (get_bool(value, &metric->is_null) < 0) return -1;
+    }
+    if ((value = field(&f, K_metadata)) != NULL) {
+        metric->has_metadata = true;
+        if (to_metadata(value, &metric->metadata) < 0) return -1;
+    }
+    if ((value = field(&f, K_properties)) != NULL) {
+        metric->has_properties = true;
+        if (to_propertyset(a, value, &metric->properties) < 0) return -1;
+    }
+    if ((value = field(&f, K_int_value)) != NULL) {
+        values++;
+        metric->which_value = org_eclipse_tahu_protobuf_Payload_Metric_int_value_tag;
+        if (get_u32(value, &metric->value.int_value) < 0) return -1;
+    }
+    if ((value = field(&f, K_long_value)) != NULL) {
+        values++;
+        metric->which_value = org_eclipse_tahu_protobuf_Payload_Metric_long_value_tag;
+        if (get_u64(value, &metric->value.long_value) < 0) return -1;
+    }
+    if ((value = field(&f, K_float_value)) != NULL) {
+        values++;
+        metric->which_value = org_eclipse_tahu_protobuf_Payload_Metric_float_value_tag;
+        if (get_float(value, &metric->value.float_value) < 0) return -1;
+    }
+    if ((value = field(&f, K_double_value)) != NULL) {
+        values++;
+        metric->which_value = org_eclipse_tahu_protobuf_Payload_Metric_double_value_tag;
+        if (get_double(value, &metric->value.double_value) < 0) return -1;
+    }
+    if ((value = field(&f, K_boolean_value)) != NULL) {
+        values++;
+        metric->which_value = org_eclipse_tahu_protobuf_Payload_Metric_boolean_value_tag;
+        if (get_bool(value, &metric->value.boolean_value) < 0) return -1;
+    }
+    if ((value = field(&f, K_string_value)) != NULL) {
+        values++;
+        metric->which_value = org_eclipse_tahu_protobuf_Payload_Metric_string_value_tag;
+        if (get_string(value, &metric->value.string_value) < 0) return -1;
+    }
+    if ((value = field(&f, K_bytes_value)) != NULL) {
+        values++;
+        metric->which_value = org_eclipse_tahu_protobuf_Payload_Metric_bytes_value_tag;
+        if (get_bytes(a, value, &metric->value.bytes_value) < 0) return -1;
+    }
+    if ((value = field(&f, K_dataset_value)) != NULL) {
+        values++;
+        metric->which_value = org_eclipse_tahu_protobuf_Payload_Metric_dataset_value_tag;
+        if (to_dataset(a, value, &metric->value.dataset_value) < 0) return -1;
+    }
+    if ((value = field(&f, K_template_value)) != NULL) {
+        values++;
+        metric->which_value = org_eclipse_tahu_protobuf_Payload_Metric_template_value_tag;
+        if (to_template(a, value, &metric->value.template_value) < 0) return -1;
+    }
+    if (only_one("Metric", values) < 0) {
+        return -1;
+    }
+    return close_fields(&f);
+}
+
+static int to_payload(arena *a, PyObject *dict, Payload *payload) {
+    fields f;
+    PyObject *value;
+    if (open_fields(&f, dict, "Payload") < 0) {
+        return -1;
+    }
+    if ((value = field(&f, K_timestamp)) != NULL) {
+        payload->has_timestamp = true;
+        if (get_u64(value, &payload->timestamp) < 0) return -1;
+    }
+    if ((value = field(&f, K_metrics)) != NULL && to_metrics(a, value, &payload->metrics, &payload->metrics_count) < 0) return -1;
+    if ((value = field(&f, K_seq)) != NULL) {
+        payload->has_seq = true;
+        if (get_u64(value, &payload->seq) < 0) return -1;
+    }
+    if ((value = field(&f, K_uuid)) != NULL && get_string(value, &payload->uuid) < 0) return -1;
+    if ((value = field(&f, K_body)) != NULL && get_bytes(a, value, &payload->body) < 0) return -1;
+    return close_fields(&f);
+}
+
+/********************************************************************************
+ * Module functions
+ ********************************************************************************/
+
+PyDoc_STRVAR(encode_payload_doc,
+"encode_payload(payload) -> bytes\n\n"
+"Encode a payload dict into the Sparkplug B protobuf wire format.");
+
+static PyObject *encode_payload(PyObject *module, PyObject *object) {
+    Payload payload = org_eclipse_tahu_protobuf_Payload_init_zero;
+    arena a = { NULL, NULL };
+    PyObject *result = NULL;
+    size_t size;
+
+    if (to_payload(&a, object, &payload) < 0) {
+        goto done;
+    }
+    if (!pb_get_encoded_size(&size, org_eclipse_tahu_protobuf_Payload_fields, &payload)) {
+        PyErr_SetString(PyExc_ValueError, "Encoding failed");
+        goto done;
+    }
+    result = PyBytes_FromStringAndSize(NULL, size);
+    if (result == NULL) {
+        goto done;
+    }
+    pb_ostream_t stream = pb_ostream_from_buffer((pb_byte_t *)PyBytes_AS_STRING(result), size);
+    if (!pb_encode(&stream, org_eclipse_tahu_protobuf_Payload_fields, &payload)) {
+        PyErr_Format(PyExc_ValueError, "Encoding failed: %s", PB_GET_ERROR(&stream));
+        Py_CLEAR(result);
+    }
+
+done:
+    arena_free(&a);
+    return result;
+}
+
+PyDoc_STRVAR(decode_payload_doc,
+"decode_payload(data) -> dict\n\n"
+"Decode a Sparkplug B payload from any bytes-like object into a payload dict.");
+
+static PyObject *decode_payload(PyObject *module, PyObject *object) {
+    Payload payload = org_eclipse_tahu_protobuf_Payload_init_zero;
+    Py_buffer view;
+    bool decoded;
+
+    if (PyObject_GetBuffer(object, &view, PyBUF_SIMPLE) < 0) {
+        return NULL;
+    }
+    pb_istream_t stream = pb_istream_from_buffer(view.buf, view.len);
+    Py_BEGIN_ALLOW_THREADS
+    decoded = pb_decode(&stream, org_eclipse_tahu_protobuf_Payload_fields, &payload);
+    Py_END_ALLOW_THREADS
+    PyBuffer_Release(&view);
+
+    PyObject *result = NULL;
+    if (decoded) {
+        result = from_payload(&payload);
+    } else {
+        PyErr_Format(PyExc_ValueError, "Decoding failed: %s", PB_GET_ERROR(&stream));
+    }
+    pb_release(org_eclipse_tahu_protobuf_Payload_fields, &payload);
+    return result;
+}
+
+static PyMethodDef methods[] = {
+    { "encode_payload", encode_payload, METH_O, encode_payload_doc },
+    { "decode_payload", decode_payload, METH_O, decode_payload_doc },
+    { NULL, NULL, 0, NULL }
+};
+
+static struct PyModuleDef module = {
+    PyModuleDef_HEAD_INIT, "_sparkplug_b_native", "Native Sparkplug B payload codec built on nanopb", -1, methods
+};
+
+PyMODINIT_FUNC PyInit__sparkplug_b_native(void) {
+    for (int i = 0; i < K_COUNT; i++) {
+        keys[i] = PyUnicode_InternFromString(key_names[i]);
+        if (keys[i] == NULL) {
+            return NULL;
+        }
+    }
+    return PyModule_Create(&module);
+}
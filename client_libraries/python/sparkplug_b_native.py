@@ -0,0 +1,113 @@
+#/********************************************************************************
+# * Copyright (c) 2014, 2018 Cirrus Link Solutions and others
+# *
+# * This program and the accompanying materials are made available under the
+# * terms of the Eclipse Public License 2.0 which is available at
+# * http://www.eclipse.org/legal/epl-2.0.
+# *
+# * SPDX-License-Identifier: EPL-2.0
+# *
+# * Contributors:
+# *   Cirrus Link Solutions - initial implementation
+# ********************************************************************************/
+import sparkplug_b_pb2
+
+######################################################################
+# Payload codec working on plain dicts keyed by the protobuf field names
+# which hold only the fields that are set, repeated fields as lists and
+# nested messages as dicts.  Values are the raw wire values: signed
+# integers stay in two's complement and bytes are bytes.
+#
+# encode_payload/decode_payload use the optional native accelerator
+# built from the nanopb code in client_libraries/c (see setup_native.py)
+# when it is available and fall back to sparkplug_b_pb2 otherwise.
+# 'native' tells which one is in use.
+#
+# The codec only handles dicts.  serializePayload, parsePayload and the
+# payload helpers of sparkplug_b keep using the sparkplug_b_pb2 messages
+# and do not go through it.  Compared with SerializeToString/FromString
+# on those messages the native codec only pays off with the pure Python
+# protobuf runtime, the upb and cpp runtimes are faster still; see the
+# codec benchmarks in sparkplug_b/tools/python_benchmarks.
+######################################################################
+
+######################################################################
+# Whether a field is repeated.  FieldDescriptor.label is deprecated in
+# protobuf 6 and gone in 7, is_repeated replaces it.
+######################################################################
+def _isRepeated(field):
+    isRepeated = getattr(field, "is_repeated", None)
+    if isRepeated is not None:
+        return isRepeated
+    return field.label == field.LABEL_REPEATED
+######################################################################
+
+######################################################################
+# Convert a protobuf message to its dict form
+######################################################################
+def messageToDict(message):
+    result = {}
+    for field, value in message.ListFields():
+        if field.type == field.TYPE_MESSAGE:
+            if _isRepeated(field):
+                value = [messageToDict(item) for item in value]
+            else:
+                value = messageToDict(value)
+        elif _isRepeated(field):
+            value = list(value)
+        result[field.name] = value
+    return result
+######################################################################
+
+######################################################################
+# Fill a protobuf message from its dict form.  Unknown fields and more
+# than one field of a oneof raise ValueError.
+######################################################################
+def messageFromDict(obj, message):
+    if not isinstance(obj, dict):
+        raise TypeError(message.DESCRIPTOR.name + " must be a dict, not " + type(obj).__name__)
+    fields = message.DESCRIPTOR.fields_by_name
+    for name, value in obj.items():
+        field = fields.get(name)
+        if field is None:
+            raise ValueError("Unknown field in " + message.DESCRIPTOR.name + ": " + name)
+        if field.containing_oneof is not None and message.WhichOneof(field.containing_oneof.name) is not None:
+            raise ValueError("More than one value field in " + message.DESCRIPTOR.name)
+        if field.type == field.TYPE_MESSAGE:
+            if _isRepeated(field):
+                repeated = getattr(message, name)
+                for item in value:
+                    messageFromDict(item, repeated.add())
+            else:
+                submessage = getattr(message, name)
+                submessage.SetInParent()
+                messageFromDict(value, submessage)
+        elif _isRepeated(field):
+            getattr(message, name).extend(value)
+        elif field.type == field.TYPE_BYTES:
+            setattr(message, name, bytes(value))
+        else:
+            setattr(message, name, value)
+    return message
+######################################################################
+
+######################################################################
+# Pure Python implementation through sparkplug_b_pb2
+######################################################################
+def _encodePayload(payload):
+    return messageFromDict(payload, sparkplug_b_pb2.Payload()).SerializeToString()
+
+def _decodePayload(data):
+    try:
+        return messageToDict(sparkplug_b_pb2.Payload.FromString(bytes(data)))
+    except Exception as e:
+        raise ValueError("Decoding failed: " + str(e))
+######################################################################
+
+try:
+    from _sparkplug_b_native import encode_payload, decode_payload
+    native = True
+except ImportError:
+    encode_payload = _encodePayload
+    decode_payload = _decodePayload
+    native = False
@@ -0,0 +1,353 @@
+#/********************************************************************************
+# * Copyright (c) 2014, 2018 Cirrus Link Solutions and others
+# *
+# * This program and the accompanying materials are made available under the
+# * terms of the Eclipse Public License 2.0 which is available at
+# * http://www.eclipse.org/legal/epl-2.0.
+# *
+# * SPDX-License-Identifier: EPL-2.0
+# *
+# * Contributors:
+# *   Cirrus Link Solutions - initial implementation
+# ********************************************************************************/
+import collections
+import os
+import struct
+
+import sparkplug_b as sparkplug
+
+class OutboundPolicy:
+    # Merge DATA into the pending message for the same topic, the
+    # latest value of each alias (or name) wins
+    Conflate = 0
+    # Write DATA to the store-and-forward file and replay it as
+    # historical values once the queue drained
+    Spill = 1
+    # Drop the oldest pending DATA message
+    DropOldest = 2
+
+DATA_TYPES = ("NDATA", "DDATA")
+
+# Store-and-forward record header: topic length, flags, payload length
+_RECORD = struct.Struct(">HBI")
+_RETAIN = 0x04
+
+def _messageType(topic):
+    tokens = topic.split("/", 3)
+    return tokens[2] if len(tokens) > 2 else None
+
+def _metricKey(metric):
+    if metric.HasField("alias"):
+        return metric.alias
+    return metric.name
+
+######################################################################
+# Append only file of serialized messages waiting to be published.  It
+# is read from the front and truncated once everything was read back.
+# Records left over by a previous run are read back like any other.
+######################################################################
+class _SpillFile:
+    def __init__(self, path):
+        self.path = path
+        self.file = open(path, "a+b")
+        self.readOffset = 0
+        self.writeOffset = self.file.seek(0, os.SEEK_END)
+        self.count = 0
+        end = 0
+        while self.read() is not None:
+            self.count += 1
+            end = self.readOffset
+        # Drop a record left half written by a crash
+        if end < self.writeOffset:
+            self.file.truncate(end)
+            self.writeOffset = end
+        self.readOffset = 0
+
+    def append(self, topic, qos, retain, data):
+        topic = topic.encode("utf-8")
+        self.file.seek(self.writeOffset)
+        self.file.write(_RECORD.pack(len(topic), qos | (_RETAIN if retain else 0), len(data)) + topic + data)
+        self.writeOffset = self.file.tell()
+        self.count += 1
+
+    def read(self):
+        if self.readOffset >= self.writeOffset:
+            return None
+        self.file.seek(self.readOffset)
+        header = self.file.read(_RECORD.size)
+        if len(header) < _RECORD.size:
+            # Truncated by a crash while writing
+            self.readOffset = self.writeOffset
+            return None
+        topicLength, flags, dataLength = _RECORD.unpack(header)
+        topic = self.file.read(topicLength)
+        data = self.file.read(dataLength)
+        if len(topic) < topicLength or len(data) < dataLength:
+            self.readOffset = self.writeOffset
+            return None
+        self.readOffset = self.file.tell()
+        return topic.decode("utf-8"), flags & 0x03, bool(flags & _RETAIN), data
+
+    ##################################################################
+    # Next record in order, the file is emptied once it is drained
+    ##################################################################
+    def pop(self):
+        record = self.read()
+        if record is not None:
+            self.count -= 1
+        if self.readOffset >= self.writeOffset:
+            self.file.truncate(0)
+            self.readOffset = self.writeOffset = 0
+            self.count = 0
+        return record
+
+    def size(self):
+        return self.writeOffset - self.readOffset
+
+    def close(self):
+        self.file.close()
+######################################################################
+
+######################################################################
+# Bounded queue of outbound messages between the code producing
+# payloads and a single sender.  put() never blocks.  With the Conflate
+# policy DATA is merged into a message for the same topic which is
+# still pending, so only a slow sender causes merging.  Once maxDepth
+# messages are pending DATA is spilled to the store-and-forward file at
+# spillPath or the oldest DATA message is dropped, depending on the
+# policy.  BIRTH, DEATH and any other non-DATA message is never
+# conflated or dropped and keeps its order.  A conflated message keeps
+# at most maxHistorical historical metrics, DATA which would go beyond
+# that is queued as a message of its own.
+#
+# Spilled DATA is only read back once the queue drained, so it follows
+# any birth queued after it and is kept across a rebirth; its metrics
+# are marked historical when it is read back.
+#
+# get() returns the next (topic, payload, qos, retain) to publish.
+# Because messages may be merged or dropped, the seq numbers are
+# assigned again in the order messages leave the queue, starting over
+# after every NBIRTH, so the host never sees a gap.
+#
+# The counters tell how the queue copes: 'dropped' and 'conflated'
+# messages, messages 'spilled' to the file and the high water mark
+# 'maxDepthSeen'.
+######################################################################
+class OutboundQueue:
+    def __init__(self, maxDepth=1000, policy=OutboundPolicy.Conflate, spillPath=None, maxSpillBytes=None,
+            maxHistorical=1000):
+        if policy == OutboundPolicy.Spill and spillPath is None:
+            raise ValueError("The spill policy needs a spillPath")
+        self.maxDepth = maxDepth
+        self.policy = policy
+        self.maxSpillBytes = maxSpillBytes
+        self.maxHistorical = maxHistorical
+        self.spillFile = _SpillFile(spillPath) if spillPath is not None else None
+        self._queue = collections.deque()
+        # Pending DATA message per topic which new DATA can be merged into
+        self._conflateTargets = {}
+        self._seq = None
+        # Spilled DATA waits for the births of a new session
+        self._spillHeld = False
+        # Spilled messages put back with unget(), read before the file
+        self._unspilled = collections.deque()
+        self._lastSpilled = None
+
+        self.enqueued = 0
+        self.dropped = 0
+        self.conflated = 0
+        self.spilled = 0
+        self.maxDepthSeen = 0
+
+    ##################################################################
+    # Number of messages waiting, including the spilled ones
+    ##################################################################
+    def depth(self):
+        spilled = self.spillFile.count if self.spillFile is not None else 0
+        return len(self._queue) + len(self._unspilled) + spilled
+
+    def __len__(self):
+        return self.depth()
+
+    ##################################################################
+    # Queue a message.  Returns False if it was dropped.
+    ##################################################################
+    def put(self, topic, payload, qos=0, retain=False):
+        self.enqueued += 1
+        messageType = _messageType(topic)
+        if messageType not in DATA_TYPES:
+            # Data queued before a birth or death must not be merged
+            # with data queued after it
+            self._conflateTargets.clear()
+            self._queue.append([topic, payload, qos, retain, None, 0])
+            self._updateDepth()
+            return True
+
+        if self.policy == OutboundPolicy.Conflate:
+            target = self._conflateTargets.get(topic)
+            if target is not None and self._merge(target, payload):
+                self.conflated += 1
+                return True
+        elif self.policy == OutboundPolicy.Spill and (self.spillFile.count > 0 or len(self._unspilled) > 0):
+            # Keep the data in order once spilling started
+            return self._spill(topic, payload, qos, retain)
+
+        if len(self._queue) >= self.maxDepth:
+            if self.policy == OutboundPolicy.Spill:
+                return self._spill(topic, payload, qos, retain)
+            if not self._dropOldest():
+                self.dropped += 1
+                return False
+
+        entry = [topic, payload, qos, retain, None, 0]
+        self._queue.append(entry)
+        if self.policy == OutboundPolicy.Conflate:
+            self._conflateTargets[topic] = entry
+        self._updateDepth()
+        return True
+
+    ##################################################################
+    # Drop the DATA pending in memory, for instance because the session
+    # it belongs to ended.  With session the births and deaths pending
+    # go as well, only DATA is counted as dropped, and the spilled DATA
+    # is held back until an NBIRTH was taken from the queue.  Returns
+    # how many DATA messages were dropped.
+    ##################################################################
+    def discardData(self, session=False):
+        kept = collections.deque()
+        discarded = 0
+        for entry in self._queue:
+            if _messageType(entry[0]) in DATA_TYPES:
+                discarded += 1
+            elif not session:
+                kept.append(entry)
+        self._queue = kept
+        self._conflateTargets.clear()
+        if session:
+            self._spillHeld = True
+        self.dropped += discarded
+        return discarded
+
+    ##################################################################
+    # Put a message taken with get() back at the front of the queue,
+    # for instance because publishing it failed
+    ##################################################################
+    def unget(self, topic, payload, qos=0, retain=False):
+        if payload is self._lastSpilled:
+            # Still late, it stays with the spilled data
+            self._unspilled.appendleft((topic, payload, qos, retain))
+        else:
+            self._queue.appendleft([topic, payload, qos, retain, None, 0])
+        if payload.HasField("seq") and self._seq is not None and _messageType(topic) != "NBIRTH":
+            self._seq = payload.seq
+
+    ##################################################################
+    # Next (topic, payload, qos, retain) to publish, None if the queue
+    # is empty
+    ##################################################################
+    def get(self):
+        if len(self._queue) > 0:
+            entry = self._queue.popleft()
+            topic, payload, qos, retain = entry[:4]
+            if self._conflateTargets.get(topic) is entry:
+                del self._conflateTargets[topic]
+        elif len(self._unspilled) > 0 and not self._spillHeld:
+            topic, payload, qos, retain = self._unspilled.popleft()
+            self._lastSpilled = payload
+        elif self.spillFile is not None and self.spillFile.count > 0 and not self._spillHeld:
+            record = self.spillFile.pop()
+            if record is None:
+                # The rest of the file was unreadable and is gone now
+                return None
+            topic, qos, retain, data = record
+            try:
+                payload = sparkplug.parsePayload(data)
+            except Exception as e:
+                print("Dropping unreadable spilled message: " + str(e))
+                self.dropped += 1
+                return self.get()
+            # The values are late now, publish them as history
+            for metric in payload.metrics:
+                metric.is_historical = True
+            self._lastSpilled = payload
+        else:
+            return None
+
+        if _messageType(topic) == "NBIRTH":
+            payload.seq = 0
+            self._seq = 1
+            self._spillHeld = False
+        elif self._seq is not None and payload.HasField("seq"):
+            payload.seq = self._seq
+            self._seq = (self._seq + 1) % 256
+        return topic, payload, qos, retain
+
+    def close(self):
+        if self.spillFile is not None:
+            self.spillFile.close()
+
+    def _updateDepth(self):
+        depth = self.depth()
+        if depth > self.maxDepthSeen:
+            self.maxDepthSeen = depth
+
+    ##################################################################
+    # Merge the metrics of payload into a pending entry.  Historical
+    # metrics are all kept, current ones replace the pending value of
+    # the same alias or name.  Returns False, leaving the entry alone,
+    # if that would take it beyond maxHistorical historical metrics.
+    ##################################################################
+    def _merge(self, entry, payload):
+        target = entry[1]
+        index = entry[4]
+        if index is None:
+            index = entry[4] = {}
+            for position, metric in enumerate(target.metrics):
+                if metric.is_historical:
+                    entry[5] += 1
+                else:
+                    index[_metricKey(metric)] = position
+        historical = 0
+        for metric in payload.metrics:
+            if metric.is_historical:
+                historical += 1
+        if historical > 0 and entry[5] + historical > self.maxHistorical:
+            return False
+        entry[5] += historical
+        for metric in payload.metrics:
+            if metric.is_historical:
+                target.metrics.add().CopyFrom(metric)
+                continue
+            key = _metricKey(metric)
+            position = index.get(key)
+            if position is None:
+                index[key] = len(target.metrics)
+                target.metrics.add().CopyFrom(metric)
+            else:
+                target.metrics[position].CopyFrom(metric)
+        if payload.HasField("timestamp"):
+            target.timestamp = payload.timestamp
+        return True
+
+    ##################################################################
+    # Drop the oldest pending DATA message, False if there is none
+    ##################################################################
+    def _dropOldest(self):
+        for position, entry in enumerate(self._queue):
+            if _messageType(entry[0]) in DATA_TYPES:
+                del self._queue[position]
+                if self._conflateTargets.get(entry[0]) is entry:
+                    del self._conflateTargets[entry[0]]
+                self.dropped += 1
+                return True
+        return False
+
+    def _spill(self, topic, payload, qos, retain):
+        if self.maxSpillBytes is not None and self.spillFile.size() >= self.maxSpillBytes:
+            self.dropped += 1
+            return False
+        self.spillFile.append(topic, qos, retain, sparkplug.serializePayload(payload))
+        self.spilled += 1
+        self._updateDepth()
+        return True
+######################################################################
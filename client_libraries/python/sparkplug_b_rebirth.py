@@ -0,0 +1,86 @@
+#/********************************************************************************
+# * Copyright (c) 2014, 2018 Cirrus Link Solutions and others
+# *
+# * This program and the accompanying materials are made available under the
+# * terms of the Eclipse Public License 2.0 which is available at
+# * http://www.eclipse.org/legal/epl-2.0.
+# *
+# * SPDX-License-Identifier: EPL-2.0
+# *
+# * Contributors:
+# *   Cirrus Link Solutions - initial implementation
+# ********************************************************************************/
+import time
+
+_clock = getattr(time, "monotonic", time.time)
+
+######################################################################
+# Decides when 'Node Control/Rebirth' and 'Reboot' requests are acted
+# on.  All requests which arrive before the birth is published are
+# answered by a single birth, births are at least windowMs apart and a
+# token bucket of 'burst' births refilled at 'rate' per second caps how
+# often a node rebirths when hosts keep asking.
+#
+# The command handler calls request(), the main loop publishes the
+# births whenever due() returns True.  delay() tells how many seconds
+# until then.  'requested' counts the requests and 'performed' the
+# births published for them.
+######################################################################
+class RebirthLimiter:
+    def __init__(self, windowMs=1000, rate=0.2, burst=3, clock=_clock):
+        self.window = windowMs / 1000.0
+        self.rate = rate
+        self.burst = burst
+        self.clock = clock
+        self.pending = False
+        self.requested = 0
+        self.performed = 0
+        self._tokens = float(burst)
+        self._updated = clock()
+        self._lastBirth = None
+
+    def request(self):
+        self.requested += 1
+        self.pending = True
+
+    ##################################################################
+    # Seconds until the pending rebirth is due, None if there is none
+    ##################################################################
+    def delay(self):
+        if not self.pending:
+            return None
+        now = self.clock()
+        self._refill(now)
+        due = now
+        if self._lastBirth is not None:
+            due = max(due, self._lastBirth + self.window)
+        if self._tokens < 1:
+            due = max(due, now + (1 - self._tokens) / self.rate)
+        return due - now
+
+    ##################################################################
+    # Whether the births should be published now.  Returning True
+    # counts the rebirth as performed.
+    ##################################################################
+    def due(self):
+        if not self.pending or self.delay() > 0:
+            return False
+        self.pending = False
+        self.performed += 1
+        self.recordBirth()
+        return True
+
+    ##################################################################
+    # Account for births published without a request, such as the ones
+    # after connecting
+    ##################################################################
+    def recordBirth(self):
+        now = self.clock()
+        self._refill(now)
+        self._tokens = max(self._tokens - 1, 0.0)
+        self._lastBirth = now
+
+    def _refill(self, now):
+        self._tokens = min(self.burst, self._tokens + (now - self._updated) * self.rate)
+        self._updated = now
+######################################################################
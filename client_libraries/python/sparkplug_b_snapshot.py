@@ -0,0 +1,413 @@
+#/********************************************************************************
+# * Copyright (c) 2014, 2018 Cirrus Link Solutions and others
+# *
+# * This program and the accompanying materials are made available under the
+# * terms of the Eclipse Public License 2.0 which is available at
+# * http://www.eclipse.org/legal/epl-2.0.
+# *
+# * SPDX-License-Identifier: EPL-2.0
+# *
+# * Contributors:
+# *   Cirrus Link Solutions - initial implementation
+# ********************************************************************************/
+import mmap
+import os
+import struct
+
+import sparkplug_b as sparkplug
+from sparkplug_b_pb2 import Payload
+
+######################################################################
+# Snapshot file format.  A 16 byte header of
+#   bytes[8] MAGIC
+#   uint64   length of the file in use, records past it are ignored
+# is followed by a log with one record per received message:
+#   uint8    record type
+#   uint32   node number, in the order the NODE records appear
+#   uint32   body length
+#   bytes    body
+# The bodies are
+#   NODE     uint16 + bytes group ID, uint16 + bytes edge node ID
+#   BIRTH    int64 bdSeq, int16 seq, metrics; forgets the aliases and
+#            values the node had
+#   DATA     int16 seq, metrics
+#   DEATH    (empty), the node went offline
+#   STATE    int64 bdSeq, int16 seq, uint8 online, metrics; the whole
+#            state of a node, written when the log is compacted
+# where metrics is a sequence of
+#   ALIAS    uint8 type, uint64 alias, uint32 datatype, uint16 + bytes name
+#   VALUE    uint8 type, uint16 + bytes device ID, uint8 key kind,
+#            key (uint64 alias or uint16 + bytes name), uint32 + bytes
+#            serialized protobuf Metric
+# All integers are little endian, strings are UTF-8, a missing bdSeq or
+# seq is -1.  Loading only reads the record headers, the metrics of a
+# node are read when it is first used.  The log is rewritten from memory
+# once it grew to more than twice the size the current state needs.
+######################################################################
+MAGIC = b"SPBSNAP2"
+_header = struct.Struct("<8sQ")
+_record = struct.Struct("<BII")
+_length16 = struct.Struct("<H")
+_length32 = struct.Struct("<I")
+_birth = struct.Struct("<qh")
+_data = struct.Struct("<h")
+_state = struct.Struct("<qhB")
+_alias = struct.Struct("<BQI")
+_uint64 = struct.Struct("<Q")
+
+_NODE = 1
+_BIRTH = 2
+_DATA = 3
+_DEATH = 4
+_STATE = 5
+
+_ALIAS = 1
+_VALUE = 2
+
+_KEY_ALIAS = 0
+_KEY_NAME = 1
+
+def _string(value):
+    value = value.encode("utf-8")
+    return _length16.pack(len(value)) + value
+
+def _readString(view, offset):
+    length = _length16.unpack_from(view, offset)[0]
+    offset += _length16.size
+    return bytes(view[offset:offset + length]).decode("utf-8"), offset + length
+
+def _optional(value):
+    return value if value is not None else -1
+
+######################################################################
+# What a host knows about one edge node.  'aliases' maps alias to
+# (name, datatype) and lastValue() returns the last Metric received for
+# an alias or name, deviceId is None for node metrics.
+######################################################################
+class NodeState:
+    __slots__ = ("groupId", "edgeNodeId", "number", "bdSeq", "seq", "online", "_aliases", "_values", "_pending", "_snapshot")
+
+    def __init__(self, snapshot, groupId, edgeNodeId, number):
+        self.groupId = groupId
+        self.edgeNodeId = edgeNodeId
+        self.number = number
+        self.bdSeq = None
+        self.seq = None
+        self.online = False
+        self._aliases = {}
+        # Values stay serialized until they are asked for
+        self._values = {}
+        # Regions of the log with metrics not read yet
+        self._pending = []
+        self._snapshot = snapshot
+
+    @property
+    def aliases(self):
+        self._read()
+        return self._aliases
+
+    def lastValue(self, deviceId, key):
+        self._read()
+        data = self._values.get((deviceId, key))
+        if data is None:
+            return None
+        return Payload.Metric.FromString(data)
+
+    ##################################################################
+    # (deviceId, alias or name) of every metric with a value
+    ##################################################################
+    def keys(self):
+        self._read()
+        return list(self._values.keys())
+
+    def _forget(self):
+        self._aliases = {}
+        self._values = {}
+        self._pending = []
+
+    def _read(self):
+        if len(self._pending) == 0:
+            return
+        view = memoryview(self._snapshot.map)
+        try:
+            for offset, end in self._pending:
+                while offset < end:
+                    if view[offset] == _ALIAS:
+                        kind, alias, datatype = _alias.unpack_from(view, offset)
+                        name, offset = _readString(view, offset + _alias.size)
+                        self._aliases[alias] = (name, datatype)
+                        continue
+                    deviceId, offset = _readString(view, offset + 1)
+                    kind = view[offset]
+                    if kind == _KEY_ALIAS:
+                        key = _uint64.unpack_from(view, offset + 1)[0]
+                        offset += 1 + _uint64.size
+                    else:
+                        key, offset = _readString(view, offset + 1)
+                    length = _length32.unpack_from(view, offset)[0]
+                    offset += _length32.size
+                    self._values[(deviceId or None, key)] = bytes(view[offset:offset + length])
+                    offset += length
+        finally:
+            view.release()
+        self._pending = []
+######################################################################
+
+######################################################################
+# Host side state of every edge node (alias tables, last values, bdSeq
+# and seq) kept in a memory-mapped snapshot file.  update() applies each
+# received message and appends it to the log at the same time, so the
+# snapshot is always current; opening an existing file only reads the
+# record headers and leaves the metrics for when a node is used.
+#
+# After a restart nodes are trusted as long as their messages fit the
+# snapshot: update() returns True when a rebirth should be requested,
+# which is the case for DATA from a node which is unknown, offline or
+# skipped a seq number.  A death certificate whose bdSeq does not match
+# the birth the snapshot knows is ignored.  rebirthNeeded() tells
+# whether a node must rebirth for a bdSeq learned some other way.
+######################################################################
+class HostStateSnapshot:
+    def __init__(self, path, initialSize=1 << 20):
+        self.path = path
+        self.nodes = {}
+        self.map = None
+        self._byNumber = []
+        self._liveSize = 0
+        self._open(initialSize)
+        self.load()
+
+    def _open(self, initialSize):
+        self.file = open(self.path, "r+b" if os.path.exists(self.path) else "w+b")
+        size = os.fstat(self.file.fileno()).st_size
+        if size < _header.size:
+            size = max(initialSize, _header.size)
+            self.file.truncate(size)
+            self.map = mmap.mmap(self.file.fileno(), size)
+            _header.pack_into(self.map, 0, MAGIC, _header.size)
+        else:
+            self.map = mmap.mmap(self.file.fileno(), size)
+            if self.map[:len(MAGIC)] != MAGIC:
+                self.close()
+                raise ValueError("Not a Sparkplug state snapshot: " + self.path)
+        self.used = _header.unpack_from(self.map, 0)[1]
+
+    ##################################################################
+    # Rebuild the node states from the record headers of the log
+    ##################################################################
+    def load(self):
+        self.nodes = {}
+        self._byNumber = []
+        view = memoryview(self.map)
+        offset = _header.size
+        try:
+            while offset < self.used:
+                recordType, number, length = _record.unpack_from(view, offset)
+                offset += _record.size
+                end = offset + length
+                if recordType == _NODE:
+                    groupId, position = _readString(view, offset)
+                    edgeNodeId, position = _readString(view, position)
+                    self._addNode(groupId, edgeNodeId, False)
+                    offset = end
+                    continue
+                node = self._byNumber[number]
+                if recordType == _DATA:
+                    seq = _data.unpack_from(view, offset)[0]
+                    if seq >= 0:
+                        node.seq = seq
+                    if end > offset + _data.size:
+                        node._pending.append((offset + _data.size, end))
+                elif recordType == _BIRTH:
+                    bdSeq, seq = _birth.unpack_from(view, offset)
+                    node._forget()
+                    node.bdSeq = bdSeq if bdSeq >= 0 else None
+                    node.seq = seq if seq >= 0 else None
+                    node.online = True
+                    node._pending.append((offset + _birth.size, end))
+                elif recordType == _DEATH:
+                    node.online = False
+                elif recordType == _STATE:
+                    bdSeq, seq, online = _state.unpack_from(view, offset)
+                    node._forget()
+                    node.bdSeq = bdSeq if bdSeq >= 0 else None
+                    node.seq = seq if seq >= 0 else None
+                    node.online = bool(online)
+                    node._pending.append((offset + _state.size, end))
+                else:
+                    raise ValueError("Unknown record type " + str(recordType))
+                offset = end
+        finally:
+            view.release()
+        self._liveSize = self.used - _header.size
+
+    ##################################################################
+    # Apply a received message, payload is the parsed Payload.  Returns
+    # True if a rebirth of the edge node should be requested.
+    ##################################################################
+    def update(self, topic, payload):
+        tokens = topic.split("/")
+        if len(tokens) < 4 or tokens[0] != "spBv1.0":
+            return False
+        groupId, messageType, edgeNodeId = tokens[1], tokens[2], tokens[3]
+        deviceId = tokens[4] if len(tokens) > 4 else None
+        node = self.nodes.get((groupId, edgeNodeId))
+        seq = payload.seq if payload.HasField("seq") else None
+
+        if messageType == "NBIRTH":
+            if node is None:
+                node = self._addNode(groupId, edgeNodeId, True)
+            node._forget()
+            node.bdSeq = self._bdSeq(payload)
+            node.seq = seq
+            node.online = True
+            self._append(_BIRTH, node, _birth.pack(_optional(node.bdSeq), _optional(seq)) + self._metrics(node, None, payload, True))
+        elif messageType == "NDEATH":
+            if node is None:
+                return False
+            bdSeq = self._bdSeq(payload)
+            # The will of an older session
+            if bdSeq is not None and node.bdSeq is not None and bdSeq != node.bdSeq:
+                return False
+            node.online = False
+            self._append(_DEATH, node, b"")
+        elif messageType in ("DBIRTH", "NDATA", "DDATA", "DDEATH"):
+            if node is None or not node.online:
+                return True
+            gap = seq is not None and node.seq is not None and seq != (node.seq + 1) % 256
+            if seq is not None:
+                node.seq = seq
+            metrics = b""
+            if messageType != "DDEATH":
+                metrics = self._metrics(node, deviceId, payload, messageType == "DBIRTH")
+            self._append(_DATA, node, _data.pack(_optional(seq)) + metrics)
+            if gap:
+                return True
+        else:
+            return False
+        self._compactIfNeeded()
+        return False
+
+    ##################################################################
+    # Whether a node must rebirth to be trusted, given its current
+    # bdSeq
+    ##################################################################
+    def rebirthNeeded(self, groupId, edgeNodeId, bdSeq):
+        node = self.nodes.get((groupId, edgeNodeId))
+        return node is None or not node.online or node.bdSeq != bdSeq
+
+    def flush(self):
+        self.map.flush()
+
+    def close(self):
+        if self.map is not None:
+            self.map.close()
+            self.map = None
+        self.file.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *args):
+        self.close()
+
+    def _addNode(self, groupId, edgeNodeId, write):
+        node = NodeState(self, groupId, edgeNodeId, len(self._byNumber))
+        self._byNumber.append(node)
+        self.nodes[(groupId, edgeNodeId)] = node
+        if write:
+            self._append(_NODE, node, _string(groupId) + _string(edgeNodeId))
+        return node
+
+    def _bdSeq(self, payload):
+        for metric in payload.metrics:
+            if metric.name == "bdSeq":
+                return sparkplug.getMetricValue(metric)
+        return None
+
+    ##################################################################
+    # Record the metrics of a message in the node state and return them
+    # encoded for the log
+    ##################################################################
+    def _metrics(self, node, deviceId, payload, birth):
+        # Metrics still in the log have to be read first to stay in order
+        node._read()
+        records = []
+        for metric in payload.metrics:
+            if metric.HasField("alias"):
+                key = metric.alias
+                if birth:
+                    node._aliases[key] = (metric.name, metric.datatype)
+                    records.append(self._aliasRecord(key, metric.name, metric.datatype))
+            elif metric.HasField("name"):
+                key = metric.name
+            else:
+                continue
+            data = metric.SerializeToString()
+            node._values[(deviceId, key)] = data
+            records.append(self._valueRecord(deviceId, key, data))
+        return b"".join(records)
+
+    def _aliasRecord(self, alias, name, datatype):
+        return _alias.pack(_ALIAS, alias, datatype) + _string(name)
+
+    def _valueRecord(self, deviceId, key, data):
+        if isinstance(key, str):
+            encodedKey = bytes((_KEY_NAME,)) + _string(key)
+        else:
+            encodedKey = bytes((_KEY_ALIAS,)) + _uint64.pack(key)
+        return bytes((_VALUE,)) + _string(deviceId or "") + encodedKey + _length32.pack(len(data)) + data
+
+    ##################################################################
+    # Records which rebuild the current state
+    ##################################################################
+    def _stateRecords(self):
+        for node in self._byNumber:
+            body = _string(node.groupId) + _string(node.edgeNodeId)
+            yield _record.pack(_NODE, node.number, len(body)) + body
+            node._read()
+            records = [self._aliasRecord(alias, name, datatype) for alias, (name, datatype) in node._aliases.items()]
+            records.extend(self._valueRecord(deviceId, key, data) for (deviceId, key), data in node._values.items())
+            body = _state.pack(_optional(node.bdSeq), _optional(node.seq), node.online) + b"".join(records)
+            yield _record.pack(_STATE, node.number, len(body)) + body
+
+    ##################################################################
+    # Append a record to the log, growing the file as needed, and only
+    # then move the length in use past it
+    ##################################################################
+    def _append(self, recordType, node, body):
+        start = self.used + _record.size
+        end = start + len(body)
+        if end > len(self.map):
+            size = len(self.map)
+            while size < end:
+                size *= 2
+            self.map.close()
+            self.file.truncate(size)
+            self.map = mmap.mmap(self.file.fileno(), size)
+        self.map[self.used:end] = _record.pack(recordType, node.number, len(body)) + body
+        self.used = end
+        _uint64.pack_into(self.map, 8, end)
+
+    ##################################################################
+    # Rewrite the log from memory once it is more than twice the size
+    # of the state, into a new file which replaces the old one
+    ##################################################################
+    def _compactIfNeeded(self):
+        if self.used - _header.size < 2 * max(self._liveSize, 1 << 16):
+            return
+        temporaryPath = self.path + ".tmp"
+        with open(temporaryPath, "wb") as f:
+            f.write(_header.pack(MAGIC, 0))
+            for record in self._stateRecords():
+                f.write(record)
+            used = f.tell()
+            f.seek(8)
+            f.write(_uint64.pack(used))
+            f.flush()
+            os.fsync(f.fileno())
+        self.close()
+        os.replace(temporaryPath, self.path)
+        self._open(_header.size)
+        self.load()
+######################################################################
@@ -0,0 +1,126 @@
+#/********************************************************************************
+# * Copyright (c) 2014, 2018 Cirrus Link Solutions and others
+# *
+# * This program and the accompanying materials are made available under the
+# * terms of the Eclipse Public License 2.0 which is available at
+# * http://www.eclipse.org/legal/epl-2.0.
+# *
+# * SPDX-License-Identifier: EPL-2.0
+# *
+# * Contributors:
+# *   Cirrus Link Solutions - initial implementation
+# ********************************************************************************/
+import collections
+import json
+
+class HostOfflinePolicy:
+    # Keep publishing DATA as if the host was online
+    Publish = 0
+    # Drop DATA while the host is offline
+    Suspend = 1
+    # Keep DATA while the host is offline and publish it as historical
+    # values once it is back
+    Buffer = 2
+
+######################################################################
+# Topics a primary host application publishes its STATE on, the
+# Sparkplug 2.2 one with an ONLINE/OFFLINE string and the 3.0 one with
+# a JSON {"online": ..., "timestamp": ...} object
+######################################################################
+def stateTopics(hostId):
+    return ["STATE/" + hostId, "spBv1.0/STATE/" + hostId]
+
+######################################################################
+# (hostId, online) of a STATE message, None if the topic is not a STATE
+# topic or the payload cannot be read
+######################################################################
+def parseStateMessage(topic, payload):
+    tokens = topic.split("/")
+    if len(tokens) == 2 and tokens[0] == "STATE":
+        text = bytes(payload).strip()
+        if text == b"ONLINE":
+            return tokens[1], True
+        if text == b"OFFLINE":
+            return tokens[1], False
+        return None
+    if len(tokens) == 3 and tokens[0] == "spBv1.0" and tokens[1] == "STATE":
+        try:
+            state = json.loads(bytes(payload).decode("utf-8"))
+            return tokens[2], bool(state["online"])
+        except (ValueError, KeyError, TypeError):
+            return None
+    return None
+######################################################################
+
+######################################################################
+# Tracks the STATE of the primary host application.  Until a STATE
+# message was received the host is taken to be online, a retained
+# OFFLINE state arrives right after subscribing.
+#
+# While the host is offline DATA messages are published, dropped or
+# kept according to the policy.  At most maxBuffered messages are kept,
+# the oldest ones are dropped beyond that.  When the host comes back the
+# node publishes its births again if rebirthOnReturn is set, or if DATA
+# of the outage was suspended or dropped ('lostInOutage'), and then the
+# buffered messages with every metric marked historical.
+######################################################################
+class PrimaryHostState:
+    def __init__(self, hostId, policy=HostOfflinePolicy.Buffer, maxBuffered=10000, rebirthOnReturn=True):
+        self.hostId = hostId
+        self.policy = policy
+        self.rebirthOnReturn = rebirthOnReturn
+        self.online = True
+        self._buffered = collections.deque(maxlen=maxBuffered)
+
+        self.outages = 0
+        self.suspended = 0
+        self.buffered = 0
+        self.dropped = 0
+        self.lostInOutage = 0
+
+    ##################################################################
+    # Handle an inbound message.  Returns True if it was a STATE message
+    # of the primary host.
+    ##################################################################
+    def onMessage(self, topic, payload):
+        state = parseStateMessage(topic, payload)
+        if state is None or state[0] != self.hostId:
+            return False
+        if self.online and not state[1]:
+            self.outages += 1
+            self.lostInOutage = 0
+        self.online = state[1]
+        return True
+
+    ##################################################################
+    # Whether a DATA message should be published now.  If not it is
+    # dropped or buffered here.
+    ##################################################################
+    def shouldPublish(self, topic, payload, qos=0, retain=False):
+        if self.online or self.policy == HostOfflinePolicy.Publish:
+            return True
+        if self.policy == HostOfflinePolicy.Suspend:
+            self.suspended += 1
+            self.lostInOutage += 1
+            return False
+        if len(self._buffered) == self._buffered.maxlen:
+            self.dropped += 1
+            self.lostInOutage += 1
+        self._buffered.append((topic, payload, qos, retain))
+        self.buffered += 1
+        return False
+
+    ##################################################################
+    # Remove and return the buffered (topic, payload, qos, retain)
+    # messages in order, with their metrics marked historical
+    ##################################################################
+    def drain(self):
+        messages = list(self._buffered)
+        self._buffered.clear()
+        for topic, payload, qos, retain in messages:
+            for metric in payload.metrics:
+                if not metric.HasField("timestamp") and payload.HasField("timestamp"):
+                    metric.timestamp = payload.timestamp
+                metric.is_historical = True
+        return messages
+######################################################################
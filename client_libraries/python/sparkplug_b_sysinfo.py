@@ -0,0 +1,191 @@
+#/********************************************************************************
+# * Copyright (c) 2014, 2018 Cirrus Link Solutions and others
+# *
+# * This program and the accompanying materials are made available under the
+# * terms of the Eclipse Public License 2.0 which is available at
+# * http://www.eclipse.org/legal/epl-2.0.
+# *
+# * SPDX-License-Identifier: EPL-2.0
+# *
+# * Contributors:
+# *   Cirrus Link Solutions - initial implementation
+# ********************************************************************************/
+import multiprocessing
+import os
+import socket
+import time
+
+import sparkplug_b as sparkplug
+from sparkplug_b import addMetric, MetricDataType
+
+# Metrics which do not change while the process runs, in alias order
+STATIC_METRICS = [
+    ("Parameters/sw_version", MetricDataType.String),
+    ("Parameters/hw_version", MetricDataType.String),
+    ("Parameters/hw_revision", MetricDataType.String),
+    ("Parameters/hw_serial", MetricDataType.String),
+    ("Node Info/Hostname", MetricDataType.String),
+    ("Node Info/CPU Model", MetricDataType.String),
+    ("Node Info/CPU Count", MetricDataType.Int32),
+    ("Node Info/Memory Total", MetricDataType.UInt64),
+    ("Node Info/Boot Time", MetricDataType.DateTime),
+]
+
+# Metrics refreshed every refreshMs, aliases follow the static ones
+DYNAMIC_METRICS = [
+    ("Node Info/CPU Usage", MetricDataType.Float),
+    ("Node Info/Memory Available", MetricDataType.UInt64),
+]
+
+######################################################################
+# Parse 'key : value' lines such as those of /proc/cpuinfo and
+# /proc/meminfo.  The first occurrence of a key wins.
+######################################################################
+def _readKeyValues(path):
+    values = {}
+    try:
+        with open(path) as f:
+            for line in f:
+                key, separator, value = line.partition(":")
+                key = key.strip()
+                if separator and key not in values:
+                    values[key] = value.strip()
+    except (IOError, OSError):
+        pass
+    return values
+######################################################################
+
+######################################################################
+# Node information read straight from /proc and os.uname() instead of
+# spawning uname and grep.  Static values are read once and cached for
+# the life of the process; CPU usage and available memory are read at
+# most once every refreshMs milliseconds.  Values which are not
+# available on the platform (for instance the Raspberry Pi hardware
+# fields on a PC) are published as null metrics.
+#
+# With an EdgeNode register addBirthMetrics as a birth extension and a
+# scan task publishing getChangedPayload() through publishNodeData.
+######################################################################
+class NodeInfoProvider:
+    def __init__(self, refreshMs=10000, aliasBase=None, procPath="/proc"):
+        self.refreshMs = refreshMs
+        self.aliasBase = aliasBase
+        self.procPath = procPath
+        self._static = None
+        self._dynamic = None
+        self._refreshed = None
+        self._cpuTimes = None
+        self._lastValues = {}
+
+    def _alias(self, index):
+        if self.aliasBase is None:
+            return None
+        return self.aliasBase + index
+
+    ##################################################################
+    # Values of STATIC_METRICS, read on first use
+    ##################################################################
+    def staticValues(self):
+        if self._static is None:
+            cpuinfo = _readKeyValues(os.path.join(self.procPath, "cpuinfo"))
+            meminfo = _readKeyValues(os.path.join(self.procPath, "meminfo"))
+            uname = os.uname()
+            memoryTotal = meminfo.get("MemTotal")
+            bootTime = None
+            try:
+                with open(os.path.join(self.procPath, "stat")) as f:
+                    for line in f:
+                        if line.startswith("btime "):
+                            bootTime = int(line.split()[1]) * 1000
+                            break
+            except (IOError, OSError):
+                pass
+            self._static = [
+                " ".join(uname),
+                cpuinfo.get("Hardware"),
+                cpuinfo.get("Revision"),
+                cpuinfo.get("Serial"),
+                socket.gethostname(),
+                cpuinfo.get("model name") or cpuinfo.get("Model") or uname[4],
+                multiprocessing.cpu_count(),
+                int(memoryTotal.split()[0]) * 1024 if memoryTotal else None,
+                bootTime,
+            ]
+        return self._static
+
+    ##################################################################
+    # Values of DYNAMIC_METRICS, re-read if older than refreshMs.  CPU
+    # usage is over the time since the previous refresh, since boot on
+    # the first one.
+    ##################################################################
+    def dynamicValues(self):
+        now = time.time()
+        if self._dynamic is not None and (now - self._refreshed) * 1000 < self.refreshMs:
+            return self._dynamic
+        self._refreshed = now
+
+        cpuUsage = None
+        try:
+            with open(os.path.join(self.procPath, "stat")) as f:
+                # cpu  user nice system idle iowait irq softirq steal ...
+                fields = [int(field) for field in f.readline().split()[1:]]
+            idle = fields[3] + (fields[4] if len(fields) > 4 else 0)
+            total = sum(fields[:8])
+            if self._cpuTimes is not None:
+                lastIdle, lastTotal = self._cpuTimes
+                idle, total, self._cpuTimes = idle - lastIdle, total - lastTotal, (idle, total)
+            else:
+                self._cpuTimes = (idle, total)
+            if total > 0:
+                cpuUsage = round(100.0 * (total - idle) / total, 1)
+        except (IOError, OSError, ValueError, IndexError):
+            pass
+
+        meminfo = _readKeyValues(os.path.join(self.procPath, "meminfo"))
+        if "MemAvailable" in meminfo:
+            available = int(meminfo["MemAvailable"].split()[0])
+        elif "MemFree" in meminfo:
+            # Kernels before 3.14 do not report MemAvailable
+            available = sum(int(meminfo.get(key, "0").split()[0]) for key in ("MemFree", "Buffers", "Cached"))
+        else:
+            available = None
+
+        self._dynamic = [cpuUsage, available * 1024 if available is not None else None]
+        return self._dynamic
+
+    ##################################################################
+    # Add all node info metrics to a NBIRTH payload.  Can be registered
+    # as an EdgeNode birth extension.
+    ##################################################################
+    def addBirthMetrics(self, payload):
+        metrics = STATIC_METRICS + DYNAMIC_METRICS
+        values = self.staticValues() + self.dynamicValues()
+        for index, (name, type) in enumerate(metrics):
+            self._addMetric(payload, name, index, type, values[index])
+        self._lastValues = dict(enumerate(values[len(STATIC_METRICS):]))
+
+    ##################################################################
+    # NDATA payload with the dynamic metrics which changed since they
+    # were last published, None if none did.  The payload is only
+    # created when needed so no sequence number is wasted.
+    ##################################################################
+    def getChangedPayload(self):
+        payload = None
+        for index, value in enumerate(self.dynamicValues()):
+            if self._lastValues.get(index) == value:
+                continue
+            if payload is None:
+                payload = sparkplug.getDdataPayload()
+            name, type = DYNAMIC_METRICS[index]
+            # Metrics without aliases are identified by name after the birth
+            self._addMetric(payload, name if self.aliasBase is None else None,
+                    len(STATIC_METRICS) + index, type, value)
+            self._lastValues[index] = value
+        return payload
+
+    def _addMetric(self, payload, name, index, type, value):
+        if value is None:
+            sparkplug.addNullMetric(payload, name, self._alias(index), type)
+        else:
+            addMetric(payload, name, self._alias(index), type, value)
+######################################################################
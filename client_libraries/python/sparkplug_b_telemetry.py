@@ -0,0 +1,127 @@
+#/********************************************************************************
+# * Copyright (c) 2014, 2018 Cirrus Link Solutions and others
+# *
+# * This program and the accompanying materials are made available under the
+# * terms of the Eclipse Public License 2.0 which is available at
+# * http://www.eclipse.org/legal/epl-2.0.
+# *
+# * SPDX-License-Identifier: EPL-2.0
+# *
+# * Contributors:
+# *   Cirrus Link Solutions - initial implementation
+# ********************************************************************************/
+import time
+
+import sparkplug_b as sparkplug
+from sparkplug_b import addMetric, MetricDataType
+
+# Folder the telemetry metrics are published under
+TELEMETRY_FOLDER = "Node Info/Perf/"
+
+# Telemetry metrics in alias order
+TELEMETRY_METRICS = [
+    ("Messages Per Second", MetricDataType.Double),
+    ("Bytes Per Second", MetricDataType.Double),
+    ("Queue Depth", MetricDataType.Int64),
+    ("Build Latency P50 ms", MetricDataType.Double),
+    ("Build Latency P95 ms", MetricDataType.Double),
+    ("Build Latency P99 ms", MetricDataType.Double),
+    ("Reconnects", MetricDataType.Int64),
+    ("Seq Gaps", MetricDataType.Int64),
+    ("Dropped Messages", MetricDataType.Int64),
+    ("Rebirths Requested", MetricDataType.Int64),
+    ("Rebirths Performed", MetricDataType.Int64),
+    ("Last Failover ms", MetricDataType.Double),
+]
+
+######################################################################
+# Operational metrics an EdgeNode publishes about itself.  The metrics
+# are added to every NBIRTH under TELEMETRY_FOLDER and afterwards only
+# the values which changed since the last report are published, every
+# periodMs milliseconds.  The build latency percentiles need
+# sparkplug_b.enableInstrumentation() and are null otherwise.
+######################################################################
+class NodeTelemetry:
+    def __init__(self, node, periodMs=60000, aliasBase=None):
+        self.node = node
+        self.periodMs = periodMs
+        self.aliasBase = aliasBase
+        self._lastValues = {}
+        self._lastReport = None
+        node.addBirthExtension(self.addBirthMetrics)
+        node.addScanTask(self.report, periodMs)
+
+    def _alias(self, index):
+        if self.aliasBase is None:
+            return None
+        return self.aliasBase + index
+
+    ##################################################################
+    # Current value of every telemetry metric
+    ##################################################################
+    def collect(self):
+        node = self.node
+        now = time.time()
+        messages = node.messagesPublished
+        byteCount = node.bytesPublished
+        if self._lastReport is None:
+            messageRate = 0.0
+            byteRate = 0.0
+        else:
+            lastTime, lastMessages, lastBytes = self._lastReport
+            elapsed = max(now - lastTime, 1e-9)
+            messageRate = round((messages - lastMessages) / elapsed, 2)
+            byteRate = round((byteCount - lastBytes) / elapsed, 2)
+        self._lastReport = (now, messages, byteCount)
+
+        p50 = p95 = p99 = None
+        instrumentation = sparkplug.instrumentation
+        if instrumentation is not None and instrumentation.buildLatency.count > 0:
+            histogram = instrumentation.buildLatency
+            p50 = histogram.percentile(50) * 1000
+            p95 = histogram.percentile(95) * 1000
+            p99 = histogram.percentile(99) * 1000
+
+        dropped = node.dataDropped
+        if node.outbound is not None:
+            dropped += node.outbound.dropped
+        limiter = node.rebirthLimiter
+        return [messageRate, byteRate, node.queueDepth(), p50, p95, p99,
+                max(node.connects - 1, 0), node.seqGaps, dropped,
+                limiter.requested if limiter is not None else None,
+                limiter.performed if limiter is not None else None,
+                node.lastFailoverMs]
+
+    ##################################################################
+    # Birth extension adding all telemetry metrics to the NBIRTH
+    ##################################################################
+    def addBirthMetrics(self, payload):
+        values = self.collect()
+        for index, (name, type) in enumerate(TELEMETRY_METRICS):
+            self._addMetric(payload, TELEMETRY_FOLDER + name, index, type, values[index])
+        self._lastValues = dict(enumerate(values))
+
+    ##################################################################
+    # Scan task publishing the telemetry metrics which changed
+    ##################################################################
+    async def report(self, node):
+        values = self.collect()
+        payload = None
+        for index, (name, type) in enumerate(TELEMETRY_METRICS):
+            if self._lastValues.get(index) == values[index]:
+                continue
+            if payload is None:
+                payload = sparkplug.getDdataPayload()
+            # Metrics without aliases are identified by name after the birth
+            name = TELEMETRY_FOLDER + name if self.aliasBase is None else None
+            self._addMetric(payload, name, index, type, values[index])
+            self._lastValues[index] = values[index]
+        if payload is not None:
+            await node.publishNodeData(payload)
+
+    def _addMetric(self, payload, name, index, type, value):
+        if value is None:
+            sparkplug.addNullMetric(payload, name, self._alias(index), type)
+        else:
+            addMetric(payload, name, self._alias(index), type, value)
+######################################################################
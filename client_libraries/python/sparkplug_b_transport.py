@@ -0,0 +1,448 @@
+#/********************************************************************************
+# * Copyright (c) 2014, 2018 Cirrus Link Solutions and others
+# *
+# * This program and the accompanying materials are made available under the
+# * terms of the Eclipse Public License 2.0 which is available at
+# * http://www.eclipse.org/legal/epl-2.0.
+# *
+# * SPDX-License-Identifier: EPL-2.0
+# *
+# * Contributors:
+# *   Cirrus Link Solutions - initial implementation
+# ********************************************************************************/
+import asyncio
+
+try:
+    import paho.mqtt.client as mqtt
+except ImportError:
+    mqtt = None
+
+######################################################################
+# Interface between the Sparkplug runtimes and an MQTT connection.
+# connect, disconnect and publish are coroutines, onMessage(topic,
+# payload) is called from the event loop for every inbound message and
+# onDisconnect(rc) when the connection is lost, rc is 0 after a clean
+# disconnect().
+######################################################################
+class Transport:
+    onMessage = None
+    onDisconnect = None
+
+    async def connect(self, willTopic=None, willPayload=None, willQos=0, willRetain=False):
+        raise NotImplementedError()
+
+    async def disconnect(self):
+        raise NotImplementedError()
+
+    def subscribe(self, topic, qos=0):
+        raise NotImplementedError()
+
+    def unsubscribe(self, topic):
+        raise NotImplementedError()
+
+    async def publish(self, topic, payload, qos=0, retain=False):
+        raise NotImplementedError()
+
+    ##################################################################
+    # Number of published messages not yet handed to the network
+    ##################################################################
+    def queueDepth(self):
+        return 0
+
+    ##################################################################
+    # Whether the server looks reachable, without connecting to it
+    ##################################################################
+    async def probe(self, timeoutMs=1000):
+        return True
+######################################################################
+
+######################################################################
+# Whether an MQTT topic filter, which may contain the '+' and '#'
+# wildcards, matches a topic name
+######################################################################
+def topicMatches(topicFilter, topic):
+    if topicFilter == topic:
+        return True
+    filterLevels = topicFilter.split("/")
+    topicLevels = topic.split("/")
+
+    # Wildcards at the first level never match topics starting with '$'
+    if topic.startswith("$") and filterLevels[0] in ("+", "#"):
+        return False
+    for index, level in enumerate(filterLevels):
+        if level == "#":
+            return True
+        if index >= len(topicLevels):
+            return False
+        if level != "+" and level != topicLevels[index]:
+            return False
+    return len(filterLevels) == len(topicLevels)
+######################################################################
+
+######################################################################
+# MQTT transport driven by an asyncio event loop.  Instead of polling
+# client.loop() the paho socket is registered with the event loop, so
+# inbound messages are handled as soon as they are readable and an idle
+# connection costs no wakeups beyond the keepalive housekeeping.
+#
+# onMessage(topic, payload) is called from the event loop for every
+# inbound message.
+######################################################################
+class AsyncioMqttTransport(Transport):
+    def __init__(self, host, port=1883, keepalive=60, clientId="", username=None, password=None):
+        self.host = host
+        self.port = port
+        self.keepalive = keepalive
+        self.onMessage = None
+        self.onConnect = None
+        self.onDisconnect = None
+
+        self.client = mqtt.Client(client_id=clientId)
+        if username is not None:
+            self.client.username_pw_set(username, password)
+        self.client.on_connect = self._on_connect
+        self.client.on_disconnect = self._on_disconnect
+        self.client.on_message = self._on_message
+        self.client.on_publish = self._on_publish
+        self.client.on_socket_open = self._on_socket_open
+        self.client.on_socket_close = self._on_socket_close
+        self.client.on_socket_register_write = self._on_socket_register_write
+        self.client.on_socket_unregister_write = self._on_socket_unregister_write
+
+        self._loop = None
+        self._misc = None
+        self._connected = None
+        self._pending = {}
+        self._published = set()
+
+    ##################################################################
+    # Connect to the server, registering the Sparkplug death
+    # certificate as the last will.  Returns once the CONNACK arrived.
+    ##################################################################
+    async def connect(self, willTopic=None, willPayload=None, willQos=0, willRetain=False):
+        self._loop = asyncio.get_event_loop()
+        self._connected = self._loop.create_future()
+        if willTopic is not None:
+            self.client.will_set(willTopic, willPayload, willQos, willRetain)
+        self.client.connect(self.host, self.port, self.keepalive)
+        rc = await self._connected
+        if rc != 0:
+            raise ConnectionError("Failed to connect with result code " + str(rc))
+
+    async def disconnect(self):
+        self.client.disconnect()
+
+    def subscribe(self, topic, qos=0):
+        self.client.subscribe(topic, qos)
+
+    def unsubscribe(self, topic):
+        self.client.unsubscribe(topic)
+
+    ##################################################################
+    # Publish a message and wait until paho has handed it to the
+    # network (QoS 0) or the server acknowledged it (QoS 1 and 2)
+    ##################################################################
+    async def publish(self, topic, payload, qos=0, retain=False):
+        info = self.client.publish(topic, payload, qos, retain)
+        if info.rc != mqtt.MQTT_ERR_SUCCESS:
+            raise ConnectionError("Failed to publish with result code " + str(info.rc))
+
+        # on_publish may already have fired from inside client.publish()
+        if info.mid in self._published:
+            self._published.discard(info.mid)
+            return
+        future = self._loop.create_future()
+        self._pending[info.mid] = future
+        await future
+
+    def queueDepth(self):
+        return len(self._pending)
+
+    ##################################################################
+    # Open and close a TCP connection to the server
+    ##################################################################
+    async def probe(self, timeoutMs=1000):
+        try:
+            reader, writer = await asyncio.wait_for(asyncio.open_connection(self.host, self.port), timeoutMs / 1000.0)
+        except (OSError, asyncio.TimeoutError):
+            return False
+        writer.close()
+        return True
+
+    def _on_connect(self, client, userdata, flags, rc):
+        if self._connected is not None and not self._connected.done():
+            self._connected.set_result(rc)
+        if self.onConnect is not None:
+            self.onConnect(rc)
+
+    def _on_disconnect(self, client, userdata, rc):
+        for future in self._pending.values():
+            if not future.done():
+                future.set_exception(ConnectionError("Disconnected with result code " + str(rc)))
+        self._pending = {}
+        self._published = set()
+        if self.onDisconnect is not None:
+            self.onDisconnect(rc)
+
+    def _on_message(self, client, userdata, msg):
+        if self.onMessage is not None:
+            self.onMessage(msg.topic, msg.payload)
+
+    def _on_publish(self, client, userdata, mid):
+        future = self._pending.pop(mid, None)
+        if future is None:
+            self._published.add(mid)
+        elif not future.done():
+            future.set_result(None)
+
+    def _on_socket_open(self, client, userdata, sock):
+        self._loop.add_reader(sock, client.loop_read)
+        self._misc = self._loop.create_task(self._miscLoop())
+
+    def _on_socket_close(self, client, userdata, sock):
+        self._loop.remove_reader(sock)
+        if self._misc is not None:
+            self._misc.cancel()
+            self._misc = None
+
+    def _on_socket_register_write(self, client, userdata, sock):
+        self._loop.add_writer(sock, client.loop_write)
+
+    def _on_socket_unregister_write(self, client, userdata, sock):
+        self._loop.remove_writer(sock)
+
+    async def _miscLoop(self):
+        # Keepalive pings and retries only need a coarse timer
+        while self.client.loop_misc() == mqtt.MQTT_ERR_SUCCESS:
+            try:
+                await asyncio.sleep(1)
+            except asyncio.CancelledError:
+                break
+######################################################################
+
+######################################################################
+# In-process MQTT broker for tests and benchmarks.  Messages are routed
+# between LoopbackTransports by topic filter on the asyncio event loop,
+# retained messages are kept per topic and the last will of a client is
+# delivered when it drops off without a clean disconnect.
+######################################################################
+class LoopbackBroker:
+    def __init__(self):
+        self.clients = set()
+        self.retained = {}
+        self.online = True
+        self.messageCount = 0
+        self.byteCount = 0
+
+    ##################################################################
+    # Simulate the broker going down, which drops every client without
+    # delivering their wills
+    ##################################################################
+    def shutdown(self):
+        self.online = False
+        for client in list(self.clients):
+            client.lose()
+
+    def route(self, topic, payload, retain=False):
+        self.messageCount += 1
+        self.byteCount += len(payload)
+        if retain:
+            if len(payload) == 0:
+                self.retained.pop(topic, None)
+            else:
+                self.retained[topic] = payload
+        for client in self.clients:
+            if client.isSubscribed(topic):
+                client.deliver(topic, payload)
+######################################################################
+
+######################################################################
+# Transport connected to a LoopbackBroker
+######################################################################
+class LoopbackTransport(Transport):
+    def __init__(self, broker):
+        self.broker = broker
+        self.onMessage = None
+        self.onDisconnect = None
+        self.subscriptions = set()
+        self.connected = False
+        self._will = None
+        self._loop = None
+
+    async def connect(self, willTopic=None, willPayload=None, willQos=0, willRetain=False):
+        if not self.broker.online:
+            raise ConnectionError("Broker is offline")
+        self._loop = asyncio.get_event_loop()
+        self._will = (willTopic, willPayload, willRetain) if willTopic is not None else None
+        self.connected = True
+        self.broker.clients.add(self)
+
+    async def disconnect(self):
+        self._close()
+
+    ##################################################################
+    # Simulate losing the connection, which publishes the last will
+    ##################################################################
+    def drop(self):
+        will = self._will
+        self.lose()
+        if will is not None:
+            topic, payload, retain = will
+            self.broker.route(topic, payload, retain)
+
+    ##################################################################
+    # Close the connection without a clean disconnect
+    ##################################################################
+    def lose(self):
+        self._close()
+        if self.onDisconnect is not None:
+            self._loop.call_soon(self.onDisconnect, 1)
+
+    async def probe(self, timeoutMs=1000):
+        return self.broker.online
+
+    def subscribe(self, topic, qos=0):
+        self.subscriptions.add(topic)
+        for retainedTopic, payload in list(self.broker.retained.items()):
+            if topicMatches(topic, retainedTopic):
+                self.deliver(retainedTopic, payload)
+
+    def unsubscribe(self, topic):
+        self.subscriptions.discard(topic)
+
+    async def publish(self, topic, payload, qos=0, retain=False):
+        if not self.connected:
+            raise ConnectionError("Not connected")
+        self.broker.route(topic, bytes(payload), retain)
+
+    def isSubscribed(self, topic):
+        for topicFilter in self.subscriptions:
+            if topicMatches(topicFilter, topic):
+                return True
+        return False
+
+    def deliver(self, topic, payload):
+        if self.onMessage is not None:
+            self._loop.call_soon(self.onMessage, topic, payload)
+
+    def _close(self):
+        self.connected = False
+        self._will = None
+        self.broker.clients.discard(self)
+######################################################################
+
+######################################################################
+# Transport over a prioritized list of server transports, for instance
+# one AsyncioMqttTransport per broker.  connect() goes through the
+# servers in priority order, known unhealthy ones last, and returns as
+# soon as one accepts the connection; it raises ConnectionError when
+# none did.  After nextServer() the next connect() starts with the
+# server after the current one.
+#
+# checkHealth() probes every server which is not in use so that a
+# failover does not have to wait for a dead server to time out;
+# startHealthChecks() does so every intervalMs.
+######################################################################
+class ServerPoolTransport(Transport):
+    def __init__(self, servers, connectTimeoutMs=2000, probeTimeoutMs=500):
+        if len(servers) == 0:
+            raise ValueError("The server pool is empty")
+        self.servers = list(servers)
+        self.connectTimeoutMs = connectTimeoutMs
+        self.probeTimeoutMs = probeTimeoutMs
+        self.onMessage = None
+        self.onDisconnect = None
+        self.current = None
+        self.healthy = [True] * len(self.servers)
+        self.connectAttempts = 0
+        self._first = 0
+        self._healthTask = None
+        for index, server in enumerate(self.servers):
+            server.onMessage = self._deliver
+            server.onDisconnect = lambda rc, index=index: self._disconnected(index, rc)
+
+    def transport(self):
+        return self.servers[self.current] if self.current is not None else None
+
+    async def connect(self, willTopic=None, willPayload=None, willQos=0, willRetain=False):
+        order = [(self._first + offset) % len(self.servers) for offset in range(len(self.servers))]
+        order.sort(key=lambda index: not self.healthy[index])
+        self._first = 0
+        for index in order:
+            self.connectAttempts += 1
+            try:
+                await asyncio.wait_for(self.servers[index].connect(willTopic, willPayload, willQos, willRetain),
+                        self.connectTimeoutMs / 1000.0)
+            except (ConnectionError, OSError, asyncio.TimeoutError) as e:
+                print("Failed to connect to server " + str(index) + ": " + str(e))
+                self.healthy[index] = False
+                continue
+            self.healthy[index] = True
+            self.current = index
+            return
+        raise ConnectionError("No server in the pool accepted the connection")
+
+    async def disconnect(self):
+        if self.current is not None:
+            current, self.current = self.current, None
+            await self.servers[current].disconnect()
+
+    ##################################################################
+    # Make the next connect() start with the server after the current
+    # one
+    ##################################################################
+    def nextServer(self):
+        if self.current is not None:
+            self._first = (self.current + 1) % len(self.servers)
+
+    def subscribe(self, topic, qos=0):
+        self.servers[self.current].subscribe(topic, qos)
+
+    def unsubscribe(self, topic):
+        self.servers[self.current].unsubscribe(topic)
+
+    async def publish(self, topic, payload, qos=0, retain=False):
+        if self.current is None:
+            raise ConnectionError("Not connected")
+        await self.servers[self.current].publish(topic, payload, qos, retain)
+
+    def queueDepth(self):
+        if self.current is None:
+            return 0
+        return self.servers[self.current].queueDepth()
+
+    ##################################################################
+    # Probe every server not in use and update 'healthy'
+    ##################################################################
+    async def checkHealth(self):
+        indexes = [index for index in range(len(self.servers)) if index != self.current]
+        results = await asyncio.gather(*[self.servers[index].probe(self.probeTimeoutMs) for index in indexes])
+        for index, healthy in zip(indexes, results):
+            self.healthy[index] = healthy
+
+    def startHealthChecks(self, intervalMs=5000):
+        self._healthTask = asyncio.get_event_loop().create_task(self._checkHealthEvery(intervalMs))
+
+    def stopHealthChecks(self):
+        if self._healthTask is not None:
+            self._healthTask.cancel()
+            self._healthTask = None
+
+    async def _checkHealthEvery(self, intervalMs):
+        while True:
+            await self.checkHealth()
+            await asyncio.sleep(intervalMs / 1000.0)
+
+    def _deliver(self, topic, payload):
+        if self.onMessage is not None:
+            self.onMessage(topic, payload)
+
+    def _disconnected(self, index, rc):
+        if index != self.current:
+            return
+        self.current = None
+        if rc != 0:
+            self.healthy[index] = False
+        if self.onDisconnect is not None:
+            self.onDisconnect(rc)
+######################################################################
@@ -0,0 +1,262 @@
+#/********************************************************************************
+# * Copyright (c) 2014, 2018 Cirrus Link Solutions and others
+# *
+# * This program and the accompanying materials are made available under the
+# * terms of the Eclipse Public License 2.0 which is available at
+# * http://www.eclipse.org/legal/epl-2.0.
+# *
+# * SPDX-License-Identifier: EPL-2.0
+# *
+# * Contributors:
+# *   Cirrus Link Solutions - initial implementation
+# ********************************************************************************/
+import json
+import os
+
+######################################################################
+# Validator for JSON payload documents precompiled from
+# sparkplug_b/sparkplug_b.json.  The schema is compiled once into
+# nested Python functions specialized for each schema node, with a
+# dispatch table holding the compiled 'definitions'.  Only the draft-04
+# keywords the Sparkplug schema uses are supported.
+######################################################################
+
+# Default location of the schema in the source tree
+SCHEMA_PATH = os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", "..", "sparkplug_b", "sparkplug_b.json")
+
+# Keywords which carry no validation
+_annotations = ("$schema", "title", "description", "definitions")
+
+######################################################################
+# Raised for the first field of a document which does not validate.
+# path is the list of keys and indexes leading to that field.
+######################################################################
+class ValidationError(ValueError):
+    def __init__(self, message, path=None):
+        self.message = message
+        self.path = path or []
+        ValueError.__init__(self, message)
+
+    def pathString(self):
+        text = "$"
+        for segment in self.path:
+            if isinstance(segment, int):
+                text += "[" + str(segment) + "]"
+            else:
+                text += "." + segment
+        return text
+
+    def __str__(self):
+        return self.pathString() + ": " + self.message
+######################################################################
+
+######################################################################
+# Type checks for the JSON schema primitive types.  bool is a subclass
+# of int in Python so it is excluded from the numeric types.
+######################################################################
+def _isString(value):
+    return isinstance(value, str)
+
+def _isInteger(value):
+    return isinstance(value, int) and not isinstance(value, bool)
+
+def _isNumber(value):
+    return isinstance(value, (int, float)) and not isinstance(value, bool)
+
+def _isBoolean(value):
+    return isinstance(value, bool)
+
+def _isNull(value):
+    return value is None
+
+def _isObject(value):
+    return isinstance(value, dict)
+
+def _isArray(value):
+    return isinstance(value, list)
+
+_typeChecks = {
+    "string" : _isString,
+    "integer" : _isInteger,
+    "number" : _isNumber,
+    "boolean" : _isBoolean,
+    "null" : _isNull,
+    "object" : _isObject,
+    "array" : _isArray,
+}
+######################################################################
+
+######################################################################
+# Compile a schema node into a function validate(value) which raises
+# ValidationError.  'definitions' is the dispatch table $refs resolve
+# through, filled in after all definitions have been compiled so
+# recursive references work.
+######################################################################
+def _compile(schema, definitions):
+    checks = []
+
+    for keyword in schema:
+        if keyword not in _annotations and keyword not in ("type", "properties", "additionalProperties", "items", "$ref", "oneOf", "required", "enum"):
+            raise ValueError("Unsupported schema keyword: " + keyword)
+
+    if "$ref" in schema:
+        reference = schema["$ref"]
+        if not reference.startswith("#/definitions/"):
+            raise ValueError("Unsupported schema reference: " + reference)
+        name = reference[len("#/definitions/"):]
+        def validateReference(value):
+            definitions[name](value)
+        checks.append(validateReference)
+
+    if "type" in schema:
+        types = schema["type"] if isinstance(schema["type"], list) else [schema["type"]]
+        typeChecks = tuple(_typeChecks[type] for type in types)
+        expected = "expected " + " or ".join(types)
+        if len(typeChecks) == 1:
+            typeCheck = typeChecks[0]
+            def validateType(value):
+                if not typeCheck(value):
+                    raise ValidationError(expected)
+        else:
+            def validateType(value):
+                for typeCheck in typeChecks:
+                    if typeCheck(value):
+                        return
+                raise ValidationError(expected)
+        checks.append(validateType)
+
+    if "enum" in schema:
+        allowed = schema["enum"]
+        def validateEnum(value):
+            if value not in allowed:
+                raise ValidationError("expected one of " + json.dumps(allowed))
+        checks.append(validateEnum)
+
+    if "required" in schema:
+        required = schema["required"]
+        def validateRequired(value):
+            if isinstance(value, dict):
+                for key in required:
+                    if key not in value:
+                        raise ValidationError("missing required field '" + key + "'")
+        checks.append(validateRequired)
+
+    if "properties" in schema or "additionalProperties" in schema:
+        properties = dict((key, _compile(subschema, definitions)) for key, subschema in schema.get("properties", {}).items())
+        additional = schema.get("additionalProperties", True)
+        if additional is True:
+            additionalCheck = None
+        elif additional is False:
+            additionalCheck = False
+        else:
+            additionalCheck = _compile(additional, definitions)
+        def validateProperties(value):
+            if not isinstance(value, dict):
+                return
+            for key, item in value.items():
+                check = properties.get(key)
+                if check is None:
+                    if additionalCheck is None:
+                        continue
+                    if additionalCheck is False:
+                        raise ValidationError("unexpected field", [key])
+                    check = additionalCheck
+                try:
+                    check(item)
+                except ValidationError as e:
+                    e.path.insert(0, key)
+                    raise
+        checks.append(validateProperties)
+
+    if "items" in schema:
+        itemCheck = _compile(schema["items"], definitions)
+        def validateItems(value):
+            if not isinstance(value, list):
+                return
+            for index, item in enumerate(value):
+                try:
+                    itemCheck(item)
+                except ValidationError as e:
+                    e.path.insert(0, index)
+                    raise
+        checks.append(validateItems)
+
+    if "oneOf" in schema:
+        alternatives = [_compile(subschema, definitions) for subschema in schema["oneOf"]]
+        def validateOneOf(value):
+            matched = 0
+            firstError = None
+            for alternative in alternatives:
+                try:
+                    alternative(value)
+                    matched += 1
+                except ValidationError as e:
+                    if firstError is None or len(e.path) > len(firstError.path):
+                        firstError = e
+            if matched == 1:
+                return
+            if matched == 0:
+                # Report the alternative which got furthest into the value
+                raise firstError
+            raise ValidationError("matches more than one of the oneOf schemas")
+        checks.append(validateOneOf)
+
+    if len(checks) == 0:
+        return lambda value: None
+    if len(checks) == 1:
+        return checks[0]
+    checks = tuple(checks)
+    def validateAll(value):
+        for check in checks:
+            check(value)
+    return validateAll
+######################################################################
+
+######################################################################
+# Compile a whole schema document.  Returns the validator of the root
+# schema, the validators of the definitions are available in its
+# 'definitions' attribute.
+######################################################################
+def compileSchema(schema):
+    definitions = {}
+    for name, subschema in schema.get("definitions", {}).items():
+        definitions[name] = _compile(subschema, definitions)
+    root = _compile(schema, definitions)
+    def validate(value):
+        root(value)
+    validate.definitions = definitions
+    return validate
+######################################################################
+
+######################################################################
+# Load and compile a schema file, the Sparkplug B payload schema by
+# default
+######################################################################
+def loadValidator(path=SCHEMA_PATH):
+    with open(path) as f:
+        return compileSchema(json.load(f))
+######################################################################
+
+_payloadValidator = None
+
+######################################################################
+# Validate a parsed JSON payload document against sparkplug_b.json,
+# raising ValidationError for the first field which does not validate
+######################################################################
+def validatePayload(document):
+    global _payloadValidator
+    if _payloadValidator is None:
+        _payloadValidator = loadValidator()
+    _payloadValidator(document)
+######################################################################
+
+######################################################################
+# Validate one of the schema 'definitions' such as "metric" or
+# "dataset"
+######################################################################
+def validateDefinition(name, document):
+    global _payloadValidator
+    if _payloadValidator is None:
+        _payloadValidator = loadValidator()
+    _payloadValidator.definitions[name](document)
+######################################################################
@@ -0,0 +1,64 @@
+#/********************************************************************************
+# * Copyright (c) 2014, 2018 Cirrus Link Solutions and others
+# *
+# * This program and the accompanying materials are made available under the
+# * terms of the Eclipse Public License 2.0 which is available at
+# * http://www.eclipse.org/legal/epl-2.0.
+# *
+# * SPDX-License-Identifier: EPL-2.0
+# *
+# * Contributors:
+# *   Cirrus Link Solutions - initial implementation
+# ********************************************************************************/
+import sparkplug_b_pb2
+from sparkplug_b import MetricDataType, getMetricValue
+from sparkplug_b_aggregation import MetricAggregator, AggregateMode
+
+def _values(payload):
+    return dict((metric.name, getMetricValue(metric)) for metric in payload.metrics)
+
+def test_siblings():
+    aggregator = MetricAggregator(1000)
+    aggregator.register("Temp", MetricDataType.Int32)
+    for value in (3, -7, 10, 2):
+        aggregator.addValue("Temp", value)
+    payload = sparkplug_b_pb2.Payload()
+    assert aggregator.flush(payload) == 1
+    values = _values(payload)
+    assert values["Temp/Max"] == 10
+    assert values["Temp/Mean"] == 2.0
+    assert values["Temp/Last"] == 2
+    assert values["Temp/Count"] == 4
+    # Int32 is sent as two's complement
+    assert payload.metrics[0].int_value == (-7) & 0xFFFFFFFF
+
+def test_dataset():
+    aggregator = MetricAggregator(1000, AggregateMode.DataSet)
+    aggregator.register("A", MetricDataType.Double)
+    aggregator.register("B", MetricDataType.Double)
+    aggregator.addValues("A", [1.0, 2.0])
+    payload = sparkplug_b_pb2.Payload()
+    assert aggregator.flush(payload) == 1
+    dataset = payload.metrics[0].dataset_value
+    assert len(dataset.rows) == 1
+    assert dataset.rows[0].elements[0].string_value == "A"
+
+def test_windows_stay_on_grid():
+    aggregator = MetricAggregator(1000)
+    aggregator.register("A", MetricDataType.Double)
+    aggregator.windowStart = 10000
+    payload = sparkplug_b_pb2.Payload()
+
+    # Flushed 30 ms late, the next window still starts on the grid
+    assert not aggregator.isWindowClosed(10999)
+    aggregator.flushIfClosed(payload, 11030)
+    assert aggregator.windowStart == 11000
+    assert aggregator.isWindowClosed(12000)
+
+    # An early flush does not move the window
+    aggregator.flush(payload, 11500)
+    assert aggregator.windowStart == 11000
+
+    # After an idle gap the window is the one now falls in
+    aggregator.flushIfClosed(payload, 15250)
+    assert aggregator.windowStart == 15000
@@ -0,0 +1,93 @@
+#/********************************************************************************
+# * Copyright (c) 2014, 2018 Cirrus Link Solutions and others
+# *
+# * This program and the accompanying materials are made available under the
+# * terms of the Eclipse Public License 2.0 which is available at
+# * http://www.eclipse.org/legal/epl-2.0.
+# *
+# * SPDX-License-Identifier: EPL-2.0
+# *
+# * Contributors:
+# *   Cirrus Link Solutions - initial implementation
+# ********************************************************************************/
+import pytest
+
+from sparkplug_b_capture import CaptureReader, CaptureWriter, MAGIC, replay
+
+MESSAGES = [
+    (1000.0, "spBv1.0/G/NBIRTH/N", b"\x01\x02"),
+    (1000.5, "spBv1.0/G/NDATA/N", b""),
+    (1001.0, "spBv1.0/G/DDATA/N/D", b"\x03" * 1000),
+    (1001.5, "spBv1.0/G/NDATA/N", b"\x04"),
+]
+
+def _capture(path):
+    with CaptureWriter(str(path)) as writer:
+        for receiveTime, topic, payload in MESSAGES:
+            writer.write(topic, payload, receiveTime)
+    return writer.count
+
+def _read(path):
+    with CaptureReader(str(path)) as reader:
+        return [(receiveTime, topic, bytes(payload)) for receiveTime, topic, payload in reader]
+
+def test_round_trip(tmp_path):
+    path = tmp_path / "capture"
+    assert _capture(path) == len(MESSAGES)
+    assert _read(path) == MESSAGES
+
+def test_append(tmp_path):
+    path = tmp_path / "capture"
+    _capture(path)
+    _capture(path)
+    assert path.read_bytes().count(MAGIC) == 1
+    assert _read(path) == MESSAGES * 2
+
+def test_truncated_last_record(tmp_path):
+    path = tmp_path / "capture"
+    _capture(path)
+    path.write_bytes(path.read_bytes()[:-1])
+    assert _read(path) == MESSAGES[:-1]
+
+@pytest.mark.parametrize("cut", [1, 10, 20], ids=["payload", "topic", "header"])
+def test_append_after_crash(tmp_path, cut):
+    path = tmp_path / "capture"
+    _capture(path)
+    path.write_bytes(path.read_bytes()[:-cut])
+    _capture(path)
+    assert _read(path) == MESSAGES[:-1] + MESSAGES
+
+def test_append_to_partial_magic(tmp_path):
+    path = tmp_path / "capture"
+    path.write_bytes(MAGIC[:3])
+    _capture(path)
+    assert _read(path) == MESSAGES
+
+def test_not_a_capture(tmp_path):
+    path = tmp_path / "capture"
+    path.write_bytes(b"something else")
+    with pytest.raises(ValueError):
+        CaptureReader(str(path))
+    with pytest.raises(ValueError):
+        CaptureWriter(str(path))
+    assert path.read_bytes() == b"something else"
+
+def test_replay(tmp_path):
+    path = tmp_path / "capture"
+    _capture(path)
+    published = []
+    with CaptureReader(str(path)) as reader:
+        count = replay(reader, lambda topic, payload: published.append((topic, bytes(payload))),
+                topicFilters=["spBv1.0/G/NDATA/+"])
+    assert count == 2
+    assert published == [("spBv1.0/G/NDATA/N", b""), ("spBv1.0/G/NDATA/N", b"\x04")]
+
+def test_replay_keeps_timing(tmp_path, monkeypatch):
+    path = tmp_path / "capture"
+    _capture(path)
+    sleeps = []
+    monkeypatch.setattr("sparkplug_b_capture.time.sleep", sleeps.append)
+    monkeypatch.setattr("sparkplug_b_capture.time.time", lambda: 0.0)
+    with CaptureReader(str(path)) as reader:
+        assert replay(reader, lambda topic, payload: None, speed=2.0) == len(MESSAGES)
+    assert sleeps == [0.25, 0.5, 0.75]
@@ -0,0 +1,87 @@
+#/********************************************************************************
+# * Copyright (c) 2014, 2018 Cirrus Link Solutions and others
+# *
+# * This program and the accompanying materials are made available under the
+# * terms of the Eclipse Public License 2.0 which is available at
+# * http://www.eclipse.org/legal/epl-2.0.
+# *
+# * SPDX-License-Identifier: EPL-2.0
+# *
+# * Contributors:
+# *   Cirrus Link Solutions - initial implementation
+# ********************************************************************************/
+import threading
+
+import pytest
+
+from sparkplug_b import MetricDataType, getMetricValue
+from sparkplug_b_coalesce import CoalesceMode, EventCoalescer
+
+METRICS = { "a" : ("A", 1, MetricDataType.Int16), "b" : ("B", 2, MetricDataType.Boolean) }
+
+def _values(payload):
+    return [(metric.alias, getMetricValue(metric), metric.timestamp) for metric in payload.metrics]
+
+def test_keep_latest():
+    published = []
+    coalescer = EventCoalescer(published.append, METRICS)
+    coalescer.put("a", 1, 10)
+    coalescer.put("b", True, 11)
+    coalescer.put("a", -2, 12)
+    payload = coalescer.flush()
+    assert published == [payload]
+    assert _values(payload) == [(2, True, 11), (1, -2, 12)]
+    assert (coalescer.eventCount, coalescer.metricCount, coalescer.payloadCount) == (3, 2, 1)
+    assert coalescer.flush() is None
+
+def test_keep_all():
+    published = []
+    coalescer = EventCoalescer(published.append, METRICS, mode=CoalesceMode.KeepAll)
+    for value in range(3):
+        coalescer.put("a", -value, value)
+    assert _values(coalescer.flush()) == [(1, 0, 0), (1, -1, 1), (1, -2, 2)]
+
+def test_unknown_key():
+    published = []
+    coalescer = EventCoalescer(published.append, dict(METRICS))
+    with pytest.raises(KeyError):
+        coalescer.put("c", 1)
+    coalescer.put("a", 1, 10)
+    coalescer.put("b", False, 11)
+    # A key removed after it was queued does not lose the other events
+    del coalescer.metrics["a"]
+    assert _values(coalescer.flush()) == [(2, False, 11)]
+    assert coalescer.metricCount == 1
+
+def test_invalid_value():
+    published = []
+    coalescer = EventCoalescer(published.append, dict(METRICS))
+    with pytest.raises(ValueError):
+        coalescer.put("a", 40000)
+    with pytest.raises(ValueError):
+        coalescer.put("b", "yes")
+    assert len(coalescer.events) == 0
+
+    coalescer.put("a", 200, 10)
+    coalescer.put("b", True, 11)
+    # Only fails once the payload is built, the rest is still published
+    coalescer.metrics["a"] = ("A", 1, MetricDataType.Int8)
+    payload = coalescer.flush()
+    assert published == [payload]
+    assert _values(payload) == [(2, True, 11)]
+    assert coalescer.metricCount == 1
+
+def test_background_thread():
+    published = []
+    flushed = threading.Event()
+    def publish(payload):
+        published.append(payload)
+        flushed.set()
+    coalescer = EventCoalescer(publish, METRICS, intervalMs=10)
+    coalescer.start()
+    try:
+        coalescer.put("a", 5)
+        assert flushed.wait(5)
+    finally:
+        coalescer.stop()
+    assert [getMetricValue(metric) for payload in published for metric in payload.metrics] == [5]
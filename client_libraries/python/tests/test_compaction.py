@@ -0,0 +1,55 @@
+#/********************************************************************************
+# * Copyright (c) 2014, 2018 Cirrus Link Solutions and others
+# *
+# * This program and the accompanying materials are made available under the
+# * terms of the Eclipse Public License 2.0 which is available at
+# * http://www.eclipse.org/legal/epl-2.0.
+# *
+# * SPDX-License-Identifier: EPL-2.0
+# *
+# * Contributors:
+# *   Cirrus Link Solutions - initial implementation
+# ********************************************************************************/
+import sparkplug_b as sparkplug
+from sparkplug_b import MetricDataType, addMetric
+from sparkplug_b_compaction import PayloadCompactor
+
+def _birth():
+    payload = sparkplug.getDeviceBirthPayload()
+    addMetric(payload, "Temp", 1, MetricDataType.Int32, 5)
+    addMetric(payload, "Name", 2, MetricDataType.String, "x")
+    return payload
+
+def test_strips_fields_known_to_the_birth():
+    compactor = PayloadCompactor()
+    compactor.recordBirth(_birth(), "dev")
+    payload = sparkplug.getDdataPayload()
+    payload.timestamp = 100
+    addMetric(payload, "Temp", None, MetricDataType.Int32, -3, 100)
+    addMetric(payload, "Name", 2, MetricDataType.String, "y", 90)
+
+    assert compactor.compact(payload, "dev") > 0
+    temp, name = payload.metrics
+    assert temp.alias == 1 and not temp.HasField("name")
+    assert not temp.HasField("datatype") and not temp.HasField("timestamp")
+    assert name.timestamp == 90 and not name.HasField("name")
+
+def test_keeps_metrics_unknown_to_the_birth():
+    compactor = PayloadCompactor()
+    compactor.recordBirth(_birth(), "dev")
+    payload = sparkplug.getDdataPayload()
+    addMetric(payload, "Other", 9, MetricDataType.Int32, 1)
+    addMetric(payload, "Unknown", None, MetricDataType.Int32, 1)
+
+    assert compactor.compact(payload, "dev") == 0
+    assert [metric.name for metric in payload.metrics] == ["Other", "Unknown"]
+    assert payload.metrics[0].datatype == MetricDataType.Int32
+
+def test_node_birth_resets_aliases():
+    compactor = PayloadCompactor()
+    compactor.recordBirth(_birth(), "dev")
+    compactor.recordBirth(sparkplug.getNodeBirthPayload())
+    payload = sparkplug.getDdataPayload()
+    addMetric(payload, "Temp", 1, MetricDataType.Int32, 1)
+    compactor.compact(payload, "dev")
+    assert payload.metrics[0].name == "Temp"
@@ -0,0 +1,358 @@
+#/********************************************************************************
+# * Copyright (c) 2014, 2018 Cirrus Link Solutions and others
+# *
+# * This program and the accompanying materials are made available under the
+# * terms of the Eclipse Public License 2.0 which is available at
+# * http://www.eclipse.org/legal/epl-2.0.
+# *
+# * SPDX-License-Identifier: EPL-2.0
+# *
+# * Contributors:
+# *   Cirrus Link Solutions - initial implementation
+# ********************************************************************************/
+import asyncio
+
+import sparkplug_b as sparkplug
+from sparkplug_b import MetricDataType, addMetric
+from sparkplug_b_edge import EdgeNode
+from sparkplug_b_outbound import OutboundPolicy, OutboundQueue
+from sparkplug_b_rebirth import RebirthLimiter
+from sparkplug_b_state import HostOfflinePolicy, PrimaryHostState
+from sparkplug_b_transport import LoopbackBroker, LoopbackTransport, ServerPoolTransport
+
+GROUP = "G"
+NODE = "N"
+
+######################################################################
+# Client subscribed to everything the node publishes, keeping the
+# (messageType, payload) of each message in order
+######################################################################
+class Recorder:
+    def __init__(self, broker):
+        self.messages = []
+        self.transport = LoopbackTransport(broker)
+        self.transport.onMessage = self._onMessage
+
+    async def connect(self):
+        await self.transport.connect()
+        self.transport.subscribe("spBv1.0/" + GROUP + "/#")
+
+    def _onMessage(self, topic, payload):
+        messageType = topic.split("/")[2]
+        if messageType not in ("NCMD", "DCMD"):
+            self.messages.append((messageType, sparkplug.parsePayload(payload)))
+
+    def types(self):
+        return [messageType for messageType, payload in self.messages]
+
+async def _birth(node):
+    payload = sparkplug.getNodeBirthPayload()
+    addMetric(payload, "Node Control/Rebirth", 1, MetricDataType.Boolean, False)
+    await node.publishNodeBirth(payload)
+    payload = sparkplug.getDeviceBirthPayload()
+    addMetric(payload, "Out", 2, MetricDataType.Int16, 0)
+    await node.publishDeviceBirth("D", payload)
+
+async def _settle():
+    for _ in range(20):
+        await asyncio.sleep(0)
+
+async def _waitFor(condition, timeout=5.0):
+    loop = asyncio.get_event_loop()
+    deadline = loop.time() + timeout
+    while not condition():
+        assert loop.time() < deadline, "timed out"
+        await asyncio.sleep(0.01)
+
+def _ddata(value):
+    payload = sparkplug.getDdataPayload()
+    addMetric(payload, None, 2, MetricDataType.Int16, value)
+    return payload
+
+def test_malformed_command_is_dropped():
+    async def main():
+        errors = []
+        asyncio.get_event_loop().set_exception_handler(lambda loop, context: errors.append(context))
+        broker = LoopbackBroker()
+        writes = []
+        node = EdgeNode(LoopbackTransport(broker), GROUP, NODE, _birth)
+        node.addCommandHandler("Out", 2, lambda node, deviceId, metric: writes.append((deviceId, metric.int_value)))
+        await node.start()
+
+        sender = LoopbackTransport(broker)
+        await sender.connect()
+        await sender.publish(node.deviceTopic("DCMD", "D"), b"\xff\xff\xff")
+        payload = sparkplug.getDdataPayload()
+        addMetric(payload, None, 2, MetricDataType.Int16, 7)
+        await sender.publish(node.deviceTopic("DCMD", "D"), sparkplug.serializePayload(payload))
+        await _settle()
+        await node.stop()
+        return writes, errors
+
+    writes, errors = asyncio.run(main())
+    assert writes == [("D", 7)]
+    assert errors == []
+
+def _rebirthCommand():
+    payload = sparkplug.getDdataPayload()
+    addMetric(payload, "Node Control/Rebirth", None, MetricDataType.Boolean, True)
+    return sparkplug.serializePayload(payload)
+
+def test_rebirth_requests_coalesce():
+    async def main():
+        broker = LoopbackBroker()
+        recorder = Recorder(broker)
+        await recorder.connect()
+        node = EdgeNode(LoopbackTransport(broker), GROUP, NODE, _birth)
+        node.rebirthLimiter = RebirthLimiter(windowMs=50)
+        await node.start()
+
+        sender = LoopbackTransport(broker)
+        await sender.connect()
+        for _ in range(5):
+            await sender.publish(node.nodeTopic("NCMD"), _rebirthCommand())
+        await asyncio.sleep(0.2)
+        await node.stop()
+        return recorder, node.rebirthLimiter
+
+    recorder, limiter = asyncio.run(main())
+    assert recorder.types() == ["NBIRTH", "DBIRTH", "NBIRTH", "DBIRTH", "NDEATH"]
+    assert (limiter.requested, limiter.performed) == (5, 1)
+
+######################################################################
+# Failover: nothing of the previous session may reach the server before
+# the new NBIRTH and DBIRTH
+######################################################################
+def _afterDeath(recorder):
+    types = recorder.types()
+    return types[types.index("NDEATH") + 1:]
+
+def test_failover_without_queue():
+    async def main():
+        broker = LoopbackBroker()
+        recorder = Recorder(broker)
+        await recorder.connect()
+        async def slowBirth(node):
+            # Reading the devices takes a while, scans keep running meanwhile
+            await asyncio.sleep(0.03)
+            await _birth(node)
+        node = EdgeNode(LoopbackTransport(broker), GROUP, NODE, slowBirth)
+        async def scan(node):
+            await node.publishDeviceData("D", _ddata(-1))
+        node.addScanTask(scan, 5)
+        await node.start()
+        await asyncio.sleep(0.05)
+
+        node.transport.drop()
+        await _waitFor(lambda: node.failovers == 1)
+        await asyncio.sleep(0.05)
+        await node.stop()
+        return recorder, node
+
+    recorder, node = asyncio.run(main())
+    after = _afterDeath(recorder)
+    assert after[:2] == ["NBIRTH", "DBIRTH"]
+    assert "DDATA" in after
+    assert node.seqGaps == 0
+
+def test_failover_discards_queued_data():
+    async def main():
+        broker = LoopbackBroker()
+        recorder = Recorder(broker)
+        await recorder.connect()
+        node = EdgeNode(LoopbackTransport(broker), GROUP, NODE, _birth, outbound=OutboundQueue())
+        await node.start()
+        await _waitFor(lambda: recorder.types() == ["NBIRTH", "DBIRTH"])
+
+        node.transport.drop()
+        # Queued after the connection was lost, before the failover started
+        await node.publishDeviceData("D", _ddata(-2))
+        await _waitFor(lambda: node.failovers == 1)
+        await _waitFor(lambda: recorder.types()[-1] == "DBIRTH")
+        await node.publishDeviceData("D", _ddata(3))
+        await _waitFor(lambda: recorder.types()[-1] == "DDATA")
+        await node.stop()
+        return recorder, node
+
+    recorder, node = asyncio.run(main())
+    assert _afterDeath(recorder) == ["NBIRTH", "DBIRTH", "DDATA", "NDEATH"]
+    assert sparkplug.getMetricValue(recorder.messages[-2][1].metrics[0]) == 3
+    assert node.outbound.dropped + node.dataDropped == 1
+    assert node.seqGaps == 0
+
+def test_failover_keeps_spilled_data(tmp_path):
+    async def main():
+        broker = LoopbackBroker()
+        recorder = Recorder(broker)
+        await recorder.connect()
+        outbound = OutboundQueue(maxDepth=0, policy=OutboundPolicy.Spill, spillPath=str(tmp_path / "spill"))
+        node = EdgeNode(LoopbackTransport(broker), GROUP, NODE, _birth, outbound=outbound)
+        await node.start()
+        await _waitFor(lambda: recorder.types() == ["NBIRTH", "DBIRTH"])
+
+        node.transport.drop()
+        await node.publishDeviceData("D", _ddata(-2))
+        await _waitFor(lambda: node.failovers == 1)
+        await _waitFor(lambda: recorder.types()[-1] == "DDATA")
+        await node.stop()
+        outbound.close()
+        return recorder, node
+
+    recorder, node = asyncio.run(main())
+    assert _afterDeath(recorder) == ["NBIRTH", "DBIRTH", "DDATA", "NDEATH"]
+    metric = recorder.messages[-2][1].metrics[0]
+    assert sparkplug.getMetricValue(metric) == -2 and metric.is_historical
+    assert node.outbound.dropped + node.dataDropped == 0
+    assert node.seqGaps == 0
+
+######################################################################
+# Loopback transport which takes a while to publish an NBIRTH, or loses
+# the connection on the next publish
+######################################################################
+class FlakyTransport(LoopbackTransport):
+    birthDelay = 0
+    loseOnPublish = False
+
+    async def publish(self, topic, payload, qos=0, retain=False):
+        if self.loseOnPublish:
+            self.loseOnPublish = False
+            self.drop()
+            raise ConnectionError("Connection lost")
+        if topic.endswith("/NBIRTH/" + NODE):
+            await asyncio.sleep(self.birthDelay)
+        await super().publish(topic, payload, qos, retain)
+
+def test_failover_waits_for_queued_birth():
+    async def main():
+        broker = LoopbackBroker()
+        recorder = Recorder(broker)
+        await recorder.connect()
+        transport = FlakyTransport(broker)
+        node = EdgeNode(transport, GROUP, NODE, _birth, outbound=OutboundQueue())
+        async def scan(node):
+            await node.publishDeviceData("D", _ddata(-1))
+        node.addScanTask(scan, 5)
+        await node.start()
+        await asyncio.sleep(0.03)
+
+        transport.birthDelay = 0.1
+        transport.drop()
+        await _waitFor(lambda: node.failovers == 1)
+        await asyncio.sleep(0.03)
+        await node.stop()
+        return recorder, node
+
+    recorder, node = asyncio.run(main())
+    assert _afterDeath(recorder)[:3] == ["NBIRTH", "DBIRTH", "DDATA"]
+    # Measured until the NBIRTH was published, not merely queued
+    assert node.lastFailoverMs >= 100
+    assert node.dataDropped > 0
+    assert node.seqGaps == 0
+
+def test_sender_resumes_on_reconnect():
+    async def main():
+        broker = LoopbackBroker()
+        recorder = Recorder(broker)
+        await recorder.connect()
+        transport = FlakyTransport(broker)
+        node = EdgeNode(transport, GROUP, NODE, _birth, outbound=OutboundQueue())
+        await node.start()
+        await _waitFor(lambda: recorder.types() == ["NBIRTH", "DBIRTH"])
+
+        transport.loseOnPublish = True
+        await node.publishDeviceData("D", _ddata(-1))
+        await _waitFor(lambda: node.failovers == 1)
+        await node.stop()
+        return recorder, node
+
+    recorder, node = asyncio.run(main())
+    assert _afterDeath(recorder) == ["NBIRTH", "DBIRTH", "NDEATH"]
+    # The sender did not sit out a retry delay before the new births
+    assert node.lastFailoverMs < 500
+
+def test_next_server():
+    async def main():
+        brokers = [LoopbackBroker(), LoopbackBroker()]
+        recorders = [Recorder(broker) for broker in brokers]
+        for recorder in recorders:
+            await recorder.connect()
+        transport = ServerPoolTransport([LoopbackTransport(broker) for broker in brokers])
+        node = EdgeNode(transport, GROUP, NODE, _birth, outbound=OutboundQueue())
+        await node.start()
+        await _waitFor(lambda: len(recorders[0].messages) == 2)
+
+        await node.publishDeviceData("D", _ddata(1))
+        payload = sparkplug.getDdataPayload()
+        addMetric(payload, "Node Control/Next Server", None, MetricDataType.Boolean, True)
+        sender = LoopbackTransport(brokers[0])
+        await sender.connect()
+        await sender.publish(node.nodeTopic("NCMD"), sparkplug.serializePayload(payload))
+        await _waitFor(lambda: node.failovers == 1)
+        await _waitFor(lambda: len(recorders[1].messages) == 2)
+        await node.publishDeviceData("D", _ddata(2))
+        await _waitFor(lambda: len(recorders[1].messages) == 3)
+        await node.stop()
+        return recorders, node, transport
+
+    recorders, node, transport = asyncio.run(main())
+    assert recorders[0].types()[-1] == "NDEATH"
+    assert recorders[1].types() == ["NBIRTH", "DBIRTH", "DDATA", "NDEATH"]
+    assert transport.current is None and node.failovers == 1
+    # The new birth carries the bdSeq of the death in the new will
+    birthBdSeq = [metric.long_value for metric in recorders[1].messages[0][1].metrics if metric.name == "bdSeq"]
+    assert birthBdSeq == [node.deathPayload.metrics[0].long_value]
+
+######################################################################
+# Primary host outage: the host must see consecutive seq numbers once
+# it is back
+######################################################################
+def _seqs(recorder):
+    return [payload.seq for messageType, payload in recorder.messages if payload.HasField("seq")]
+
+def _hostOutage(policy, outbound=None):
+    async def main():
+        broker = LoopbackBroker()
+        recorder = Recorder(broker)
+        await recorder.connect()
+        primaryHost = PrimaryHostState("H", policy, rebirthOnReturn=False)
+        node = EdgeNode(LoopbackTransport(broker), GROUP, NODE, _birth, outbound=outbound, primaryHost=primaryHost)
+        node.rebirthLimiter = RebirthLimiter(windowMs=50)
+        await node.start()
+        await node.publishDeviceData("D", _ddata(1))
+
+        host = LoopbackTransport(broker)
+        await host.connect()
+        await host.publish("STATE/H", b"OFFLINE")
+        await _settle()
+        await node.publishDeviceData("D", _ddata(2))
+        await node.publishDeviceData("D", _ddata(3))
+        await host.publish("STATE/H", b"ONLINE")
+        await asyncio.sleep(0.1)
+        await node.publishDeviceData("D", _ddata(4))
+        await _waitFor(lambda: recorder.types()[-1] == "DDATA" and recorder.messages[-1][1].metrics[0].int_value == 4)
+        await node.stop()
+        return recorder, node
+
+    return asyncio.run(main())
+
+def test_suspended_data_rebirths():
+    recorder, node = _hostOutage(HostOfflinePolicy.Suspend)
+    # Through the limiter even though the node was born just before
+    assert recorder.types() == ["NBIRTH", "DBIRTH", "DDATA", "NBIRTH", "DBIRTH", "DDATA", "NDEATH"]
+    assert _seqs(recorder) == [0, 1, 2, 0, 1, 2]
+    assert node.seqGaps == 0
+
+def test_buffered_data_continues_seq():
+    recorder, node = _hostOutage(HostOfflinePolicy.Buffer)
+    assert recorder.types() == ["NBIRTH", "DBIRTH", "DDATA", "DDATA", "DDATA", "DDATA", "NDEATH"]
+    assert _seqs(recorder) == [0, 1, 2, 3, 4, 5]
+    assert [payload.metrics[0].is_historical for messageType, payload in recorder.messages[3:5]] == [True, True]
+    assert node.seqGaps == 0
+
+def test_buffered_data_through_queue():
+    recorder, node = _hostOutage(HostOfflinePolicy.Buffer, OutboundQueue())
+    # The replayed messages were conflated, both historical values are kept
+    assert recorder.types() == ["NBIRTH", "DBIRTH", "DDATA", "DDATA", "DDATA", "NDEATH"]
+    assert [metric.int_value for metric in recorder.messages[3][1].metrics] == [2, 3]
+    assert _seqs(recorder) == [0, 1, 2, 3, 4]
+    assert node.seqGaps == 0
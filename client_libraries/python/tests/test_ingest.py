@@ -0,0 +1,135 @@
+#/********************************************************************************
+# * Copyright (c) 2014, 2018 Cirrus Link Solutions and others
+# *
+# * This program and the accompanying materials are made available under the
+# * terms of the Eclipse Public License 2.0 which is available at
+# * http://www.eclipse.org/legal/epl-2.0.
+# *
+# * SPDX-License-Identifier: EPL-2.0
+# *
+# * Contributors:
+# *   Cirrus Link Solutions - initial implementation
+# ********************************************************************************/
+import pytest
+
+import sparkplug_b as sparkplug
+from sparkplug_b import MetricDataType, addMetric
+from sparkplug_b_ingest import ShmRing, ShardedIngestor, decodeMessage
+
+@pytest.fixture
+def ring():
+    ring = ShmRing(64)
+    yield ring
+    ring.close()
+
+def test_ring_wraps(ring):
+    # Records of every size up to the limit, wrapping many times
+    for size in range(0, 28):
+        for _ in range(5):
+            record = bytes(range(size))
+            ring.write(record[:size // 2], record[size // 2:])
+            assert ring.readNowait() == record
+    assert ring.readNowait() is None
+
+def test_ring_rejects_records_which_cannot_wrap(ring):
+    ring.write(b"x" * 24)
+    assert ring.read(0) == b"x" * 24
+    # 40 bytes with the header, more than fits after skipping the 32 at the end
+    with pytest.raises(ValueError):
+        ring.write(b"y" * 36)
+    ring.write(b"z" * 28)
+    assert ring.read(0) == b"z" * 28
+
+def _birth():
+    payload = sparkplug.getNodeBirthPayload()
+    addMetric(payload, "Temp", 1, MetricDataType.Int16, -5)
+    return sparkplug.serializePayload(payload)
+
+def _data(value):
+    payload = sparkplug.getDdataPayload()
+    metric = payload.metrics.add()
+    metric.alias = 1
+    metric.int_value = value & 0xFFFFFFFF
+    return sparkplug.serializePayload(payload)
+
+def test_decode_resolves_aliases():
+    aliases = {}
+    birth = decodeMessage("spBv1.0/G/NBIRTH/N", _birth(), aliases)
+    assert birth.metrics[-1][:2] == ("Temp", 1)
+    data = decodeMessage("spBv1.0/G/DDATA/N/D", _data(-7), aliases)
+    assert data.deviceId == "D"
+    name, alias, timestamp, datatype, value = data.metrics[0]
+    assert (name, alias, datatype, value) == ("Temp", 1, MetricDataType.Int16, -7)
+    assert decodeMessage("STATE/host", b"ONLINE", aliases) is None
+
+def test_sharded_ingestor():
+    ingestor = ShardedIngestor(workers=2, ringSize=1 << 16, batchSize=8)
+    ingestor.start()
+    try:
+        for node in range(4):
+            ingestor.submit("spBv1.0/G/NBIRTH/N%d" % node, _birth())
+            for value in range(10):
+                ingestor.submit("spBv1.0/G/NDATA/N%d" % node, _data(-value))
+    finally:
+        results = ingestor.stop()
+    assert len(results) == 44
+    for node in range(4):
+        values = [result.metrics[-1][4] for result in results if result.edgeNodeId == "N%d" % node]
+        # In order per node, with the Int16 values decoded through the birth
+        assert values == [-5] + [-value for value in range(10)]
+
+def _largeBirth(metrics):
+    payload = sparkplug.getNodeBirthPayload()
+    for index in range(metrics):
+        addMetric(payload, "Metric %d" % index, index + 1, MetricDataType.Int32, -index)
+    return sparkplug.serializePayload(payload)
+
+def test_large_batches_are_split():
+    ingestor = ShardedIngestor(workers=1, ringSize=1 << 16, batchSize=256)
+    ingestor.start()
+    try:
+        for node in range(10):
+            ingestor.submit("spBv1.0/G/NBIRTH/N%d" % node, _largeBirth(300))
+    finally:
+        results = ingestor.stop(timeout=30.0)
+    assert [result.edgeNodeId for result in results] == ["N%d" % node for node in range(10)]
+    assert all(result.metrics[-1][4] == -299 for result in results)
+
+def _deviceBirth(first, count):
+    payload = sparkplug.getDeviceBirthPayload()
+    for alias in range(first, first + count):
+        addMetric(payload, "Device metric with a long name %d" % alias, alias, MetricDataType.Int32, 0)
+    return sparkplug.serializePayload(payload)
+
+def test_result_too_large_is_dropped(capfd):
+    ingestor = ShardedIngestor(workers=1, ringSize=1 << 16, batchSize=256)
+    ingestor.start()
+    try:
+        ingestor.submit("spBv1.0/G/DBIRTH/N/D", _deviceBirth(1, 500))
+        ingestor.submit("spBv1.0/G/DBIRTH/N/D", _deviceBirth(501, 500))
+        # Small on the wire, but carrying the 1000 names once decoded
+        payload = sparkplug.getDdataPayload()
+        for alias in range(1, 1001):
+            payload.metrics.add(alias=alias, int_value=alias)
+        ingestor.submit("spBv1.0/G/DDATA/N/D", sparkplug.serializePayload(payload))
+        ingestor.submit("spBv1.0/G/DDATA/N/D", _data(-1))
+    finally:
+        results = ingestor.stop(timeout=30.0)
+    assert [result.messageType for result in results] == ["DBIRTH", "DBIRTH", "DDATA"]
+    assert results[-1].metrics[0][4] == -1
+    assert "Dropped the decoded message on spBv1.0/G/DDATA/N/D" in capfd.readouterr().out
+
+def test_dead_worker_does_not_block_stop(capfd):
+    ingestor = ShardedIngestor(workers=2, ringSize=1 << 16, batchSize=8)
+    ingestor.start()
+    try:
+        ingestor.processes[0].kill()
+        ingestor.processes[0].join()
+        for node in range(8):
+            ingestor.submit("spBv1.0/G/NBIRTH/N%d" % node, _birth())
+        live = [node for node in range(8) if ingestor.shard("spBv1.0/G/NBIRTH/N%d" % node) == 1]
+        results = ingestor.poll(0.5)
+    finally:
+        results += ingestor.stop(timeout=5.0)
+    assert sorted(result.edgeNodeId for result in results) == ["N%d" % node for node in live]
+    assert "Ingest worker 0 exited with code -9" in capfd.readouterr().out
@@ -0,0 +1,98 @@
+#/********************************************************************************
+# * Copyright (c) 2014, 2018 Cirrus Link Solutions and others
+# *
+# * This program and the accompanying materials are made available under the
+# * terms of the Eclipse Public License 2.0 which is available at
+# * http://www.eclipse.org/legal/epl-2.0.
+# *
+# * SPDX-License-Identifier: EPL-2.0
+# *
+# * Contributors:
+# *   Cirrus Link Solutions - initial implementation
+# ********************************************************************************/
+import asyncio
+
+import pytest
+
+import sparkplug_b as sparkplug
+import sparkplug_b_instrumentation
+from sparkplug_b import MetricDataType, addMetric
+from sparkplug_b_edge import EdgeNode
+from sparkplug_b_outbound import OutboundQueue
+from sparkplug_b_transport import LoopbackBroker, LoopbackTransport
+
+@pytest.fixture
+def instrumentation():
+    instrumentation = sparkplug.enableInstrumentation()
+    yield instrumentation
+    sparkplug.disableInstrumentation()
+
+def test_build_latency_recorded(instrumentation):
+    # Runs on whichever protobuf backend is loaded, upb messages cannot be weakly referenced
+    events = []
+    instrumentation.addHook(lambda event, value: events.append(event))
+    payload = sparkplug.getDdataPayload()
+    addMetric(payload, "m", None, MetricDataType.Int8, -1)
+    data = sparkplug.serializePayload(payload)
+    sparkplug.parsePayload(data)
+
+    snapshot = instrumentation.snapshot()
+    assert snapshot["payloads_built"] == 1
+    assert snapshot["metrics_added"] == {MetricDataType.Int8: 1}
+    assert snapshot["bytes_serialized"] == snapshot["bytes_parsed"] == len(data)
+    assert instrumentation.buildLatency.count == 1
+    assert instrumentation.buildLatency.percentile(50) is not None
+    assert events == ["payload", "metric", "serialize", "serialize_latency", "build_latency", "parse"]
+
+def test_build_latency_recorded_once(instrumentation):
+    payload = sparkplug.getDdataPayload()
+    sparkplug.serializePayload(payload)
+    sparkplug.serializePayload(payload)
+    assert instrumentation.buildLatency.count == 1
+    assert instrumentation.serializeLatency.count == 2
+
+def test_pending_builds_bounded(instrumentation, monkeypatch):
+    monkeypatch.setattr(sparkplug_b_instrumentation, "MAX_PENDING_BUILDS", 10)
+    payloads = [sparkplug.getDdataPayload() for _ in range(50)]
+    assert len(instrumentation._buildStarts) == 10
+    sparkplug.serializePayload(payloads[-1])
+    sparkplug.serializePayload(payloads[0])
+    assert instrumentation.buildLatency.count == 1
+
+def test_histogram_percentile():
+    histogram = sparkplug_b_instrumentation.Histogram([1, 2, 3])
+    assert histogram.percentile(50) is None
+    for value in (0.5, 1.5, 1.5, 5):
+        histogram.record(value)
+    assert histogram.percentile(50) == 2
+    assert histogram.percentile(100) == float("inf")
+
+def test_build_latency_excludes_queue_wait(instrumentation):
+    # Published through the outbound queue, serialized only once the sender gets to it
+    async def main():
+        broker = LoopbackBroker()
+        node = EdgeNode(LoopbackTransport(broker), "G", "N", outbound=OutboundQueue())
+        await node.start()
+        before = (instrumentation.buildLatency.count, instrumentation.buildLatency.sum, node.messagesPublished)
+        await node.publishDeviceData("D", sparkplug.getDdataPayload())
+        handed = (instrumentation.buildLatency.count, instrumentation.buildLatency.sum)
+        await asyncio.sleep(0.05)
+        sent = (instrumentation.buildLatency.count, instrumentation.buildLatency.sum, node.messagesPublished)
+        await node.stop()
+        return before, handed, sent
+
+    before, handed, sent = asyncio.run(main())
+    assert handed[0] == before[0] + 1 and handed[1] - before[1] < 0.05
+    # Sending it later did not add to the build latency
+    assert sent == handed + (before[2] + 1,)
+
+def test_publish_payload_records_build_latency(instrumentation):
+    events = []
+    instrumentation.addHook(lambda event, value: events.append(event))
+    published = []
+    class Client:
+        def publish(self, topic, data, qos, retain):
+            published.append(data)
+    sparkplug.publishPayload(Client(), "spBv1.0/G/DDATA/N/D", sparkplug.getDdataPayload())
+    assert events == ["payload", "build_latency", "serialize", "serialize_latency"]
+    assert instrumentation.buildLatency.count == 1 and len(published) == 1
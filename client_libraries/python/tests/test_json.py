@@ -0,0 +1,79 @@
+#/********************************************************************************
+# * Copyright (c) 2014, 2018 Cirrus Link Solutions and others
+# *
+# * This program and the accompanying materials are made available under the
+# * terms of the Eclipse Public License 2.0 which is available at
+# * http://www.eclipse.org/legal/epl-2.0.
+# *
+# * SPDX-License-Identifier: EPL-2.0
+# *
+# * Contributors:
+# *   Cirrus Link Solutions - initial implementation
+# ********************************************************************************/
+import io
+import json
+
+import sparkplug_b as sparkplug
+from sparkplug_b import MetricDataType, DataSetDataType, ParameterDataType, addMetric
+from sparkplug_b_json import payloadToJson, payloadFromJson, writePayloadJson
+from sparkplug_b_validator import validatePayload
+
+def _payload():
+    payload = sparkplug.getDdataPayload()
+    payload.timestamp = 1500000000000
+    payload.seq = 3
+    addMetric(payload, "Int8", 1, MetricDataType.Int8, -128)
+    addMetric(payload, "Int64", 2, MetricDataType.Int64, -2**63)
+    addMetric(payload, "UInt64", 3, MetricDataType.UInt64, 2**64 - 1)
+    addMetric(payload, "Double", 4, MetricDataType.Double, 3.5)
+    addMetric(payload, "Boolean", 5, MetricDataType.Boolean, True)
+    addMetric(payload, "String", 6, MetricDataType.String, "héllo \"quoted\"")
+    addMetric(payload, "Bytes", 7, MetricDataType.Bytes, b"\x00\xff")
+    sparkplug.addNullMetric(payload, "Null", 8, MetricDataType.Int32)
+
+    dataset = sparkplug.initDatasetMetric(payload, "DataSet", 9, ["A", "B"], [DataSetDataType.Int16, DataSetDataType.String])
+    row = dataset.rows.add()
+    row.elements.add().int_value = (-5) & 0xFFFFFFFF
+    row.elements.add().string_value = "x"
+    # An element without a value
+    row = dataset.rows.add()
+    row.elements.add()
+    row.elements.add().string_value = "y"
+
+    metric = payload.metrics.add()
+    metric.name = "Template"
+    metric.datatype = MetricDataType.Template
+    template = metric.template_value
+    template.template_ref = "Motor"
+    parameter = template.parameters.add()
+    parameter.name = "Speed"
+    parameter.type = ParameterDataType.Int32
+    parameter.int_value = 7
+    # A parameter without a value
+    parameter = template.parameters.add()
+    parameter.name = "Unset"
+    parameter.type = ParameterDataType.String
+    addMetric(template, "Inner", None, MetricDataType.Float, 1.5)
+    return payload
+
+def test_output_validates():
+    document = json.loads(payloadToJson(_payload()))
+    validatePayload(document)
+    assert document["metrics"][8]["value"]["rows"][1] == [0, "y"]
+    assert "value" not in document["metrics"][9]["value"]["parameters"][1]
+    assert document["metrics"][7]["value"] is None
+
+def test_round_trip():
+    payload = _payload()
+    decoded = payloadFromJson(payloadToJson(payload))
+    # The unset dataset element comes back as its default value
+    payload.metrics[8].dataset_value.rows[1].elements[0].int_value = 0
+    assert decoded == payload
+    assert sparkplug.getMetricValue(decoded.metrics[0]) == -128
+    assert not decoded.metrics[9].template_value.parameters[1].HasField("string_value")
+
+def test_stream_matches_text():
+    payload = _payload()
+    stream = io.StringIO()
+    writePayloadJson(payload, stream)
+    assert stream.getvalue() == payloadToJson(payload)
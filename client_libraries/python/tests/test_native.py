@@ -0,0 +1,182 @@
+#/********************************************************************************
+# * Copyright (c) 2014, 2018 Cirrus Link Solutions and others
+# *
+# * This program and the accompanying materials are made available under the
+# * terms of the Eclipse Public License 2.0 which is available at
+# * http://www.eclipse.org/legal/epl-2.0.
+# *
+# * SPDX-License-Identifier: EPL-2.0
+# *
+# * Contributors:
+# *   Cirrus Link Solutions - initial implementation
+# ********************************************************************************/
+import math
+
+import pytest
+
+import sparkplug_b as sparkplug
+import sparkplug_b_native
+import sparkplug_b_pb2
+from sparkplug_b import *
+
+try:
+    import _sparkplug_b_native
+except ImportError:
+    _sparkplug_b_native = None
+
+######################################################################
+# The pure Python fallback and, when it is built, the native extension
+# as (encode, decode)
+######################################################################
+@pytest.fixture(params=["fallback", "native"])
+def codec(request):
+    if request.param == "fallback":
+        return sparkplug_b_native._encodePayload, sparkplug_b_native._decodePayload
+    if _sparkplug_b_native is None:
+        pytest.skip("The native codec is not built, see setup_native.py")
+    return _sparkplug_b_native.encode_payload, _sparkplug_b_native.decode_payload
+
+######################################################################
+# Payloads covering every field of the Sparkplug B schema the native
+# codec handles
+######################################################################
+def _corpus():
+    entries = []
+    entries.append(("empty", sparkplug_b_pb2.Payload()))
+    entries.append(("ndeath", sparkplug.getNodeDeathPayload()))
+
+    payload = sparkplug.getNodeBirthPayload()
+    for index in range(20):
+        addMetric(payload, "Node Metric%d" % index, index, MetricDataType.Double, index * 1.5)
+    entries.append(("nbirth", payload))
+
+    payload = sparkplug.getDdataPayload()
+    payload.uuid = "c0ffee00-0000-4000-8000-000000000000"
+    payload.body = b"\x00\xffbody"
+    addMetric(payload, "Limits/Int8", 1, MetricDataType.Int8, -128)
+    addMetric(payload, "Limits/Int64", 2, MetricDataType.Int64, -9223372036854775808)
+    addMetric(payload, "Limits/UInt64", 3, MetricDataType.UInt64, 18446744073709551615)
+    addMetric(payload, "Limits/UInt32", 4, MetricDataType.UInt32, 4294967295)
+    addMetric(payload, "Limits/Float", 5, MetricDataType.Float, 3.4e38)
+    addMetric(payload, "Limits/Double", 6, MetricDataType.Double, float("inf"))
+    addMetric(payload, "Limits/NaN", 7, MetricDataType.Double, float("nan"))
+    addMetric(payload, "Unicode/é中\U0001f600", 8, MetricDataType.String, "é中\U0001f600")
+    addMetric(payload, "Empty/String", 9, MetricDataType.String, "")
+    addMetric(payload, "Empty/Bytes", 10, MetricDataType.Bytes, b"")
+    addNullMetric(payload, "Null", 11, MetricDataType.Int32)
+    historical = addHistoricalMetric(payload, "Historical", 12, MetricDataType.Boolean, True)
+    historical.is_transient = True
+    entries.append(("limits", payload))
+
+    payload = sparkplug.getDdataPayload()
+    metric = addMetric(payload, "File", 1, MetricDataType.File, bytes(range(256)) * 64)
+    metric.metadata.is_multi_part = False
+    metric.metadata.content_type = "application/octet-stream"
+    metric.metadata.size = 16384
+    metric.metadata.seq = 0
+    metric.metadata.file_name = "firmware.bin"
+    metric.metadata.file_type = "bin"
+    metric.metadata.md5 = "d41d8cd98f00b204e9800998ecf8427e"
+    metric.metadata.description = "firmware image"
+    entries.append(("file metadata", payload))
+
+    payload = sparkplug.getDdataPayload()
+    metric = addMetric(payload, "Properties", 1, MetricDataType.Int32, 5)
+    metric.properties.keys.extend(["engUnit", "null", "nested", "list", "quality", "double", "long"])
+    metric.properties.values.add(type=ParameterDataType.String, string_value="degC")
+    metric.properties.values.add(type=ParameterDataType.String, is_null=True)
+    value = metric.properties.values.add(type=20)
+    value.propertyset_value.keys.append("inner")
+    value.propertyset_value.values.add(type=ParameterDataType.Boolean, boolean_value=True)
+    value = metric.properties.values.add(type=21)
+    inner = value.propertysets_value.propertyset.add()
+    inner.keys.append("a")
+    inner.values.add(type=ParameterDataType.Float, float_value=0.5)
+    value.propertysets_value.propertyset.add()
+    metric.properties.values.add(type=ParameterDataType.Int32, int_value=192)
+    metric.properties.values.add(type=ParameterDataType.Double, double_value=-1.25)
+    metric.properties.values.add(type=ParameterDataType.Int64, long_value=2 ** 63)
+    metric = addMetric(payload, "Properties/Empty", 2, MetricDataType.Int32, 5)
+    metric.properties.SetInParent()
+    entries.append(("properties", payload))
+
+    payload = sparkplug.getDdataPayload()
+    dataset = initDatasetMetric(payload, "AllTypes", 1, ["i8", "i64", "u64", "f", "d", "b", "s", "dt", "t"],
+            [DataSetDataType.Int8, DataSetDataType.Int64, DataSetDataType.UInt64, DataSetDataType.Float,
+            DataSetDataType.Double, DataSetDataType.Boolean, DataSetDataType.String, DataSetDataType.DateTime, DataSetDataType.Text])
+    addDatasetRows(dataset, [(-1, -2, 2 ** 64 - 1, 1.5, 2.5, True, "x", 1500000000000, "text")] * 10)
+    dataset.rows.add()
+    entries.append(("dataset all types", payload))
+
+    payload = sparkplug.getDdataPayload()
+    template = initTemplateMetric(payload, "Motor 1", 1, "Custom_Motor")
+    template.version = "1.0"
+    for type, field, value in ((ParameterDataType.Int32, "int_value", 7), (ParameterDataType.Int64, "long_value", 7),
+            (ParameterDataType.Float, "float_value", 0.25), (ParameterDataType.Double, "double_value", 0.125),
+            (ParameterDataType.Boolean, "boolean_value", False), (ParameterDataType.String, "string_value", "p")):
+        template.parameters.add(name=field, type=type, **{ field : value })
+    template.parameters.add(name="unset")
+    nested = initTemplateMetric(template, "Inner", None, "Inner_Type")
+    addMetric(nested, "Deep", None, MetricDataType.UInt16, 65535)
+    entries.append(("nested template", payload))
+    return entries
+
+CORPUS = _corpus()
+
+######################################################################
+# Dict equality treating NaN as equal to NaN
+######################################################################
+def _same(a, b):
+    if isinstance(a, dict):
+        return isinstance(b, dict) and a.keys() == b.keys() and all(_same(a[key], b[key]) for key in a)
+    if isinstance(a, list):
+        return isinstance(b, list) and len(a) == len(b) and all(_same(x, y) for x, y in zip(a, b))
+    if isinstance(a, float) and isinstance(b, float) and math.isnan(a) and math.isnan(b):
+        return True
+    return type(a) == type(b) and a == b
+
+@pytest.mark.parametrize("name, payload", CORPUS, ids=[name for name, payload in CORPUS])
+def test_parity(codec, name, payload):
+    encode, decode = codec
+    data = payload.SerializeToString()
+    # The dict form read straight from sparkplug_b_pb2
+    expected = sparkplug_b_native.messageToDict(payload)
+    assert _same(decode(data), expected)
+    assert _same(decode(memoryview(data)), expected)
+    assert encode(expected) == data
+    assert sparkplug_b_native._encodePayload(decode(data)) == data
+
+@pytest.mark.parametrize("data", [CORPUS[2][1].SerializeToString()[:-3], b"\xff" * 8], ids=["truncated", "garbage"])
+def test_invalid_data(codec, data):
+    encode, decode = codec
+    with pytest.raises(ValueError):
+        decode(data)
+
+def test_invalid_dict(codec):
+    encode, decode = codec
+    with pytest.raises((ValueError, TypeError)):
+        encode({ "metrics" : [{ "bogus" : 1 }] })
+    with pytest.raises((ValueError, TypeError)):
+        encode({ "metrics" : [{ "int_value" : 1, "long_value" : 2 }] })
+
+def test_default_codec():
+    assert sparkplug_b_native.native == (_sparkplug_b_native is not None)
+
+def test_encode_iterables(codec):
+    encode, decode = codec
+    # Repeated fields given as generators, whose items are only alive
+    # while the encoder holds on to them
+    payload = {
+        "metrics" : ({ "name" : ("m%d-" % i) * 300, "datatype" : 12, "string_value" : ("v%d" % i) * 400 } for i in range(50)),
+        "uuid" : "u" * 2000,
+    }
+    decoded = decode(encode(payload))
+    assert [metric["name"] for metric in decoded["metrics"]] == [("m%d-" % i) * 300 for i in range(50)]
+    assert [metric["string_value"] for metric in decoded["metrics"]] == [("v%d" % i) * 400 for i in range(50)]
+    def row(i):
+        return { "elements" : ({ "int_value" : i * 3 + j } for j in range(3)) }
+    payload = { "metrics" : [{ "name" : "d", "datatype" : 16, "dataset_value" : {
+        "columns" : map(str, range(3)), "types" : iter([3, 3, 3]), "rows" : map(row, range(2)) } }] }
+    dataset = decode(encode(payload))["metrics"][0]["dataset_value"]
+    assert dataset["columns"] == ["0", "1", "2"]
+    assert [[element["int_value"] for element in row["elements"]] for row in dataset["rows"]] == [[0, 1, 2], [3, 4, 5]]
@@ -0,0 +1,167 @@
+#/********************************************************************************
+# * Copyright (c) 2014, 2018 Cirrus Link Solutions and others
+# *
+# * This program and the accompanying materials are made available under the
+# * terms of the Eclipse Public License 2.0 which is available at
+# * http://www.eclipse.org/legal/epl-2.0.
+# *
+# * SPDX-License-Identifier: EPL-2.0
+# *
+# * Contributors:
+# *   Cirrus Link Solutions - initial implementation
+# ********************************************************************************/
+import pytest
+
+import sparkplug_b as sparkplug
+from sparkplug_b import MetricDataType, addMetric, getMetricValue
+from sparkplug_b_outbound import OutboundPolicy, OutboundQueue
+
+NBIRTH = "spBv1.0/G/NBIRTH/N"
+DDATA = "spBv1.0/G/DDATA/N/D"
+
+def _data(value, alias=1):
+    payload = sparkplug.getDdataPayload()
+    addMetric(payload, None, alias, MetricDataType.Int32, value)
+    return payload
+
+def _drain(queue):
+    messages = []
+    while True:
+        message = queue.get()
+        if message is None:
+            return messages
+        messages.append(message)
+
+def _summary(messages):
+    summary = []
+    for topic, payload, qos, retain in messages:
+        messageType = topic.split("/")[2]
+        if messageType == "NBIRTH":
+            summary.append((messageType, payload.seq))
+        else:
+            summary.append((messageType, payload.seq, [getMetricValue(metric) for metric in payload.metrics]))
+    return summary
+
+def test_conflate():
+    queue = OutboundQueue(policy=OutboundPolicy.Conflate)
+    queue.put(NBIRTH, sparkplug.getNodeBirthPayload())
+    queue.put(DDATA, _data(1))
+    queue.put(DDATA, _data(2, alias=2))
+    queue.put(DDATA, _data(-3))
+    assert queue.conflated == 2
+    assert _summary(_drain(queue)) == [("NBIRTH", 0), ("DDATA", 1, [-3, 2])]
+
+def _history(values):
+    payload = sparkplug.getDdataPayload()
+    sparkplug.addHistoricalMetrics(payload, None, 1, MetricDataType.Int32, range(len(values)), values)
+    return payload
+
+def test_conflate_caps_history():
+    queue = OutboundQueue(policy=OutboundPolicy.Conflate, maxHistorical=4)
+    queue.put(NBIRTH, sparkplug.getNodeBirthPayload())
+    queue.put(DDATA, _history([1, 2]))
+    queue.put(DDATA, _history([3, 4]))
+    # Would make five historical metrics
+    queue.put(DDATA, _history([5]))
+    # Current values are still merged into the latest message
+    queue.put(DDATA, _data(6, alias=2))
+    assert queue.conflated == 2
+    assert _summary(_drain(queue)) == [("NBIRTH", 0), ("DDATA", 1, [1, 2, 3, 4]), ("DDATA", 2, [5, 6])]
+
+def test_drop_oldest_keeps_births():
+    queue = OutboundQueue(maxDepth=2, policy=OutboundPolicy.DropOldest)
+    queue.put(NBIRTH, sparkplug.getNodeBirthPayload())
+    queue.put(DDATA, _data(1))
+    queue.put(DDATA, _data(2))
+    assert queue.put(DDATA, _data(3))
+    assert queue.dropped == 2
+    assert _summary(_drain(queue)) == [("NBIRTH", 0), ("DDATA", 1, [3])]
+
+def test_drop_when_only_births_pending():
+    queue = OutboundQueue(maxDepth=1, policy=OutboundPolicy.DropOldest)
+    queue.put(NBIRTH, sparkplug.getNodeBirthPayload())
+    assert not queue.put(DDATA, _data(1))
+    assert queue.dropped == 1
+
+def test_spill_replays_as_history(tmp_path):
+    queue = OutboundQueue(maxDepth=1, policy=OutboundPolicy.Spill, spillPath=str(tmp_path / "spill"))
+    queue.put(NBIRTH, sparkplug.getNodeBirthPayload())
+    for value in range(4):
+        queue.put(DDATA, _data(-value))
+    assert queue.spilled == 4
+    assert queue.depth() == 5
+    messages = _drain(queue)
+    assert _summary(messages) == [("NBIRTH", 0)] + [("DDATA", value + 1, [-value]) for value in range(4)]
+    assert all(metric.is_historical for topic, payload, qos, retain in messages[1:] for metric in payload.metrics)
+    queue.close()
+
+def test_spill_kept_across_rebirth(tmp_path):
+    queue = OutboundQueue(maxDepth=1, policy=OutboundPolicy.Spill, spillPath=str(tmp_path / "spill"))
+    queue.put(NBIRTH, sparkplug.getNodeBirthPayload())
+    queue.put(DDATA, _data(1))
+    queue.put(DDATA, _data(2))
+    queue.put(DDATA, _data(3))
+    # The birth and the first DDATA were published, then the node rebirths
+    assert _summary([queue.get(), queue.get()]) == [("NBIRTH", 0), ("DDATA", 1, [1])]
+    queue.put(NBIRTH, sparkplug.getNodeBirthPayload())
+    queue.put(DDATA, _data(4))
+    assert queue.dropped == 0
+    # The spilled data follows the new birth as history
+    messages = _drain(queue)
+    assert _summary(messages) == [("NBIRTH", 0), ("DDATA", 1, [2]), ("DDATA", 2, [3]), ("DDATA", 3, [4])]
+    assert all(payload.metrics[0].is_historical for topic, payload, qos, retain in messages[1:])
+    queue.close()
+
+def test_discarded_session_holds_spill(tmp_path):
+    queue = OutboundQueue(maxDepth=1, policy=OutboundPolicy.Spill, spillPath=str(tmp_path / "spill"))
+    queue.put(NBIRTH, sparkplug.getNodeBirthPayload())
+    queue.put(DDATA, _data(1))
+    queue.put(DDATA, _data(2))
+    queue.get()
+    # Publishing the first spilled message failed and the session ended
+    queue.unget(*queue.get())
+    assert queue.discardData(session=True) == 0
+    assert queue.get() is None
+    assert queue.depth() == 2
+    queue.put(NBIRTH, sparkplug.getNodeBirthPayload())
+    assert _summary(_drain(queue)) == [("NBIRTH", 0), ("DDATA", 1, [1]), ("DDATA", 2, [2])]
+    queue.close()
+
+def test_spill_left_over_by_previous_run(tmp_path):
+    path = str(tmp_path / "spill")
+    queue = OutboundQueue(maxDepth=0, policy=OutboundPolicy.Spill, spillPath=path)
+    queue.put(DDATA, _data(1))
+    queue.put(DDATA, _data(2))
+    queue.close()
+    # Half a record written by a crash is dropped
+    with open(path, "ab") as f:
+        f.write(b"\x00\x05\x00")
+
+    queue = OutboundQueue(maxDepth=0, policy=OutboundPolicy.Spill, spillPath=path)
+    assert queue.depth() == 2
+    # Until a birth the seq numbers are left alone
+    assert [summary[2] for summary in _summary(_drain(queue))] == [[1], [2]]
+    queue.close()
+
+def test_unreadable_spill_tail(tmp_path):
+    queue = OutboundQueue(maxDepth=0, policy=OutboundPolicy.Spill, spillPath=str(tmp_path / "spill"))
+    queue.put(DDATA, _data(1))
+    # Cut the record short behind the queue's back
+    queue.spillFile.file.truncate(queue.spillFile.writeOffset - 2)
+    assert queue.get() is None
+    assert queue.depth() == 0
+    queue.close()
+
+def test_unget_keeps_seq():
+    queue = OutboundQueue()
+    queue.put(NBIRTH, sparkplug.getNodeBirthPayload())
+    queue.put(DDATA, _data(1))
+    queue.get()
+    message = queue.get()
+    assert message[1].seq == 1
+    queue.unget(*message)
+    assert queue.get()[1].seq == 1
+
+def test_spill_needs_path():
+    with pytest.raises(ValueError):
+        OutboundQueue(policy=OutboundPolicy.Spill)
@@ -0,0 +1,68 @@
+#/********************************************************************************
+# * Copyright (c) 2014, 2018 Cirrus Link Solutions and others
+# *
+# * This program and the accompanying materials are made available under the
+# * terms of the Eclipse Public License 2.0 which is available at
+# * http://www.eclipse.org/legal/epl-2.0.
+# *
+# * SPDX-License-Identifier: EPL-2.0
+# *
+# * Contributors:
+# *   Cirrus Link Solutions - initial implementation
+# ********************************************************************************/
+import pytest
+
+from sparkplug_b_rebirth import RebirthLimiter
+
+class Clock:
+    def __init__(self):
+        self.now = 100.0
+
+    def __call__(self):
+        return self.now
+
+def test_requests_before_the_birth_coalesce():
+    clock = Clock()
+    limiter = RebirthLimiter(clock=clock)
+    assert limiter.delay() is None
+    assert not limiter.due()
+    for _ in range(5):
+        limiter.request()
+    assert limiter.delay() == 0
+    assert limiter.due()
+    assert not limiter.due()
+    assert (limiter.requested, limiter.performed) == (5, 1)
+
+def test_births_are_a_window_apart():
+    clock = Clock()
+    limiter = RebirthLimiter(windowMs=1000, clock=clock)
+    limiter.recordBirth()
+    limiter.request()
+    assert limiter.delay() == pytest.approx(1.0)
+    clock.now += 0.4
+    assert not limiter.due()
+    assert limiter.delay() == pytest.approx(0.6)
+    clock.now += 0.6
+    assert limiter.due()
+
+def test_token_bucket():
+    clock = Clock()
+    limiter = RebirthLimiter(windowMs=0, rate=0.5, burst=2, clock=clock)
+    for _ in range(2):
+        limiter.request()
+        assert limiter.due()
+    limiter.request()
+    # Bucket empty, one token takes 2 s at 0.5 per second
+    assert limiter.delay() == pytest.approx(2.0)
+    clock.now += 1.0
+    assert not limiter.due()
+    clock.now += 1.0
+    assert limiter.due()
+    # Refilling stops at the burst size
+    clock.now += 100
+    for _ in range(2):
+        limiter.request()
+        assert limiter.due()
+    limiter.request()
+    assert limiter.delay() > 0
+    assert limiter.performed == 5
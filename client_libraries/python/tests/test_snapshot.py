@@ -0,0 +1,121 @@
+#/********************************************************************************
+# * Copyright (c) 2014, 2018 Cirrus Link Solutions and others
+# *
+# * This program and the accompanying materials are made available under the
+# * terms of the Eclipse Public License 2.0 which is available at
+# * http://www.eclipse.org/legal/epl-2.0.
+# *
+# * SPDX-License-Identifier: EPL-2.0
+# *
+# * Contributors:
+# *   Cirrus Link Solutions - initial implementation
+# ********************************************************************************/
+import pytest
+
+import sparkplug_b as sparkplug
+import sparkplug_b_pb2
+from sparkplug_b import MetricDataType, addMetric, getMetricValue
+from sparkplug_b_snapshot import HostStateSnapshot
+
+NODE = ("G", "N")
+
+def _payload(seq, bdSeq=None):
+    payload = sparkplug_b_pb2.Payload()
+    payload.seq = seq
+    if bdSeq is not None:
+        addMetric(payload, "bdSeq", None, MetricDataType.Int64, bdSeq)
+    return payload
+
+def _birth(snapshot, bdSeq=5):
+    payload = _payload(0, bdSeq)
+    addMetric(payload, "Temp", 1, MetricDataType.Int16, -1)
+    addMetric(payload, "Label", None, MetricDataType.String, "a")
+    assert not snapshot.update("spBv1.0/G/NBIRTH/N", payload)
+    payload = _payload(1)
+    addMetric(payload, "Out", 2, MetricDataType.Int8, -3)
+    assert not snapshot.update("spBv1.0/G/DBIRTH/N/D", payload)
+
+def _data(snapshot, seq, value, topic="spBv1.0/G/DDATA/N/D"):
+    payload = _payload(seq)
+    metric = payload.metrics.add()
+    metric.alias = 2
+    metric.int_value = value & 0xFFFFFFFF
+    return snapshot.update(topic, payload)
+
+def test_reload(tmp_path):
+    path = str(tmp_path / "state")
+    with HostStateSnapshot(path) as snapshot:
+        _birth(snapshot)
+        assert not _data(snapshot, 2, -7)
+
+    with HostStateSnapshot(path) as snapshot:
+        node = snapshot.nodes[NODE]
+        assert (node.bdSeq, node.seq, node.online) == (5, 2, True)
+        assert node.aliases == { 1 : ("Temp", MetricDataType.Int16), 2 : ("Out", MetricDataType.Int8) }
+        metric = node.lastValue("D", 2)
+        assert metric.int_value == (-7) & 0xFFFFFFFF
+        assert getMetricValue(node.lastValue(None, 1)) == -1
+        assert node.lastValue(None, "Label").string_value == "a"
+        assert sorted(node.keys(), key=repr) == sorted([(None, "bdSeq"), (None, 1), (None, "Label"), ("D", 2)], key=repr)
+        assert not snapshot.rebirthNeeded("G", "N", 5)
+        assert snapshot.rebirthNeeded("G", "N", 6)
+        # The node carries on where it left off before the restart
+        assert not _data(snapshot, 3, 4)
+
+def test_rebirth_needed(tmp_path):
+    with HostStateSnapshot(str(tmp_path / "state")) as snapshot:
+        assert _data(snapshot, 0, 1, "spBv1.0/G/NDATA/Unknown")
+        _birth(snapshot)
+        # seq 2 was skipped
+        assert _data(snapshot, 3, 1)
+        assert not _data(snapshot, 4, 1)
+
+def test_death(tmp_path):
+    path = str(tmp_path / "state")
+    with HostStateSnapshot(path) as snapshot:
+        _birth(snapshot, bdSeq=5)
+        # The will of an older session is ignored
+        assert not snapshot.update("spBv1.0/G/NDEATH/N", _payload(0, 4))
+        assert snapshot.nodes[NODE].online
+        snapshot.update("spBv1.0/G/NDEATH/N", _payload(0, 5))
+
+    with HostStateSnapshot(path) as snapshot:
+        assert not snapshot.nodes[NODE].online
+        assert _data(snapshot, 2, 1)
+        assert snapshot.rebirthNeeded("G", "N", 5)
+
+def test_compaction_keeps_state(tmp_path):
+    path = str(tmp_path / "state")
+    with HostStateSnapshot(path, initialSize=4096) as snapshot:
+        _birth(snapshot)
+        for seq in range(2, 20000):
+            _data(snapshot, seq % 256, -seq)
+        used = snapshot.used
+    # Far less than the log of 20000 messages
+    assert used < 1 << 18
+
+    with HostStateSnapshot(path) as snapshot:
+        node = snapshot.nodes[NODE]
+        assert node.seq == 19999 % 256
+        assert node.lastValue("D", 2).int_value == (-19999) & 0xFFFFFFFF
+        assert node.aliases[1] == ("Temp", MetricDataType.Int16)
+
+def test_records_past_the_length_in_use_are_ignored(tmp_path):
+    path = str(tmp_path / "state")
+    with HostStateSnapshot(path) as snapshot:
+        _birth(snapshot)
+        used = snapshot.used
+        assert not _data(snapshot, 2, 9)
+        # As if the process died before the length in use was moved on
+        snapshot.map[8:16] = used.to_bytes(8, "little")
+
+    with HostStateSnapshot(path) as snapshot:
+        node = snapshot.nodes[NODE]
+        assert node.seq == 1
+        assert node.lastValue("D", 2).int_value == (-3) & 0xFFFFFFFF
+
+def test_not_a_snapshot(tmp_path):
+    path = tmp_path / "state"
+    path.write_bytes(b"x" * 64)
+    with pytest.raises(ValueError):
+        HostStateSnapshot(str(path))
@@ -0,0 +1,160 @@
+#/********************************************************************************
+# * Copyright (c) 2014, 2018 Cirrus Link Solutions and others
+# *
+# * This program and the accompanying materials are made available under the
+# * terms of the Eclipse Public License 2.0 which is available at
+# * http://www.eclipse.org/legal/epl-2.0.
+# *
+# * SPDX-License-Identifier: EPL-2.0
+# *
+# * Contributors:
+# *   Cirrus Link Solutions - initial implementation
+# ********************************************************************************/
+import array
+
+import pytest
+
+import sparkplug_b as sparkplug
+import sparkplug_b_pb2
+from sparkplug_b import MetricDataType, DataSetDataType, getMetricValue
+
+try:
+    import numpy
+except ImportError:
+    numpy = None
+
+needsNumpy = pytest.mark.skipif(numpy is None, reason="NumPy is not installed")
+
+def test_coerce_signed():
+    assert sparkplug.coerceValue(MetricDataType.Int8, -1) == 0xFFFFFFFF
+    assert sparkplug.coerceValue(MetricDataType.Int64, -1) == 0xFFFFFFFFFFFFFFFF
+    with pytest.raises(ValueError):
+        sparkplug.coerceValue(MetricDataType.Int8, 128)
+
+def test_coerce_values_list():
+    values, errors = sparkplug.coerceValues(MetricDataType.Int16, [-32768, 5, 40000])
+    assert values == [0xFFFF8000, 5, None]
+    assert [index for index, message in errors] == [2]
+
+@needsNumpy
+def test_coerce_values_numpy_signed():
+    values, errors = sparkplug.coerceValues(MetricDataType.Int8, numpy.array([-1, 5, -128, 200]))
+    assert values == [0xFFFFFFFF, 5, 0xFFFFFF80, None]
+    assert [index for index, message in errors] == [3]
+
+@needsNumpy
+def test_coerce_values_numpy_unsigned_does_not_wrap():
+    values, errors = sparkplug.coerceValues(MetricDataType.Int64, numpy.array([2**64 - 1, 7], dtype=numpy.uint64))
+    assert values == [None, 7]
+    assert errors[0][1].endswith(str(2**64 - 1))
+
+    values, errors = sparkplug.coerceValues(MetricDataType.UInt32, numpy.array([2**64 - 1], dtype=numpy.uint64))
+    assert values == [None]
+    assert errors[0][1].endswith(str(2**64 - 1))
+
+def test_historical_payloads_negative_values():
+    for type, values in ((MetricDataType.Int8, [-1, 5, -128]), (MetricDataType.Int16, [-32768, -2, 32767])):
+        payloads = list(sparkplug.getHistoricalDdataPayloads("m", None, type, [1, 2, 3], values, maxMetrics=2))
+        assert len(payloads) == 2
+        decoded = [getMetricValue(metric) for payload in payloads for metric in payload.metrics]
+        assert decoded == values
+        assert all(metric.is_historical for payload in payloads for metric in payload.metrics)
+
+@needsNumpy
+def test_historical_payloads_numpy():
+    timestamps = numpy.arange(5, dtype=numpy.int64)
+    values = numpy.array([-3, -2, -1, 0, 1], dtype=numpy.int16)
+    payloads = list(sparkplug.getHistoricalDdataPayloads("m", 1, MetricDataType.Int16, timestamps, values))
+    assert [getMetricValue(metric) for metric in payloads[0].metrics] == [-3, -2, -1, 0, 1]
+
+def test_add_historical_metrics_mismatch():
+    payload = sparkplug_b_pb2.Payload()
+    with pytest.raises(ValueError):
+        sparkplug.addHistoricalMetrics(payload, "m", None, MetricDataType.Int8, [1, 2], [1])
+
+@pytest.mark.parametrize("nativeBackend", [False, True], ids=["prototype", "per field"])
+def test_add_historical_metrics(monkeypatch, nativeBackend):
+    # Both fill strategies, whichever backend is loaded
+    monkeypatch.setattr(sparkplug, "_nativeBackend", nativeBackend)
+    payload = sparkplug_b_pb2.Payload()
+    sparkplug.addHistoricalMetrics(payload, "Temp", 4, MetricDataType.Int32, [10, 20, 30], [-1, 0, 2**31 - 1])
+    assert [(metric.name, metric.alias, metric.timestamp, metric.datatype, metric.is_historical, getMetricValue(metric))
+            for metric in payload.metrics] == [
+            ("Temp", 4, 10, MetricDataType.Int32, True, -1),
+            ("Temp", 4, 20, MetricDataType.Int32, True, 0),
+            ("Temp", 4, 30, MetricDataType.Int32, True, 2**31 - 1)]
+
+    template = sparkplug_b_pb2.Payload.Template()
+    sparkplug.addHistoricalMetrics(template, None, 5, MetricDataType.Double, (1, 2), array.array("d", [0.5, 1.5]))
+    assert not template.metrics[0].HasField("name")
+    assert [metric.double_value for metric in template.metrics] == [0.5, 1.5]
+
+def test_add_historical_metrics_invalid():
+    payload = sparkplug_b_pb2.Payload()
+    with pytest.raises(ValueError):
+        sparkplug.addHistoricalMetrics(payload, "m", None, MetricDataType.DataSet, [1], [None])
+    with pytest.raises(ValueError) as info:
+        sparkplug.addHistoricalMetrics(payload, "m", None, MetricDataType.UInt8, [1, 2, 3], [1, 256, -1])
+    assert "[1, 2]" in str(info.value)
+    assert len(payload.metrics) == 0
+
+def test_historical_payloads_split():
+    payloads = list(sparkplug.getHistoricalDdataPayloads(None, 1, MetricDataType.Boolean, range(5), [True] * 5, maxMetrics=2))
+    assert [len(payload.metrics) for payload in payloads] == [2, 2, 1]
+    assert [metric.timestamp for payload in payloads for metric in payload.metrics] == [0, 1, 2, 3, 4]
+
+@pytest.mark.parametrize("timestamps, values", [([1, 2], [1, 2, 3, 4, 5]), ([1, 2, 3, 4, 5], [1, 2])],
+        ids=["fewer timestamps", "fewer values"])
+def test_historical_payloads_mismatch(timestamps, values):
+    seq = sparkplug.seqNum
+    # Raised on the call, before any payload takes a sequence number
+    with pytest.raises(ValueError):
+        sparkplug.getHistoricalDdataPayloads("m", None, MetricDataType.Int8, timestamps, values)
+    assert sparkplug.seqNum == seq
+
+def test_historical_payloads_invalid():
+    with pytest.raises(ValueError):
+        sparkplug.getHistoricalDdataPayloads("m", None, MetricDataType.DataSet, [1], [None])
+    with pytest.raises(ValueError):
+        sparkplug.getHistoricalDdataPayloads("m", None, MetricDataType.Int8, [1], [1], maxMetrics=0)
+    assert list(sparkplug.getHistoricalDdataPayloads("m", None, MetricDataType.Int8, [], [])) == []
+
+def test_serialize_and_parse():
+    payload = sparkplug.getDdataPayload()
+    sparkplug.addMetric(payload, "m", 1, MetricDataType.Int16, -2)
+    data = sparkplug.serializePayload(payload)
+    # Handed to the MQTT client as is, without a bytearray copy
+    assert type(data) is bytes
+    assert data == payload.SerializeToString()
+    parsed = sparkplug.parsePayload(data)
+    assert parsed == payload
+    assert sparkplug.parsePayload(bytearray(data)) == payload
+
+def test_protobuf_backend():
+    backend = sparkplug.protobufBackend()
+    assert backend in ("python", "cpp", "upb")
+    assert sparkplug._nativeBackend == (backend != "python")
+
+@pytest.mark.parametrize("nativeBackend", [False, True], ids=["setattr", "constructor"])
+def test_add_dataset_rows(monkeypatch, nativeBackend):
+    monkeypatch.setattr(sparkplug, "_nativeBackend", nativeBackend)
+    payload = sparkplug_b_pb2.Payload()
+    dataset = sparkplug.initDatasetMetric(payload, "DataSet", 1, ["a", "b", "c"],
+            [DataSetDataType.Int8, DataSetDataType.Double, DataSetDataType.String])
+    sparkplug.addDatasetRows(dataset, [(-1, 0.5, "x"), (127, 1.5, "y")])
+    assert [[element.WhichOneof("value") for element in row.elements] for row in dataset.rows] == \
+            [["int_value", "double_value", "string_value"]] * 2
+    assert dataset.rows[0].elements[0].int_value == 0xFFFFFFFF
+    assert dataset.rows[1].elements[2].string_value == "y"
+    with pytest.raises(ValueError):
+        sparkplug.addDatasetRows(dataset, [(1, 2.0)])
+    with pytest.raises(ValueError):
+        sparkplug.addDatasetRows(dataset, [(1, 2.0, "z"), (128, 2.0, "z")])
+    # Found by protobuf rather than the range checks
+    with pytest.raises(TypeError):
+        sparkplug.addDatasetRows(dataset, [(1, 2.0, "z"), (2, "not a double", "z")])
+    # Nothing of a failed call is left behind
+    assert len(dataset.rows) == 2
+    sparkplug.addDatasetRows(dataset, [(-128, 2.5, "z")])
+    assert len(dataset.rows) == 3
+    assert sparkplug.parsePayload(sparkplug.serializePayload(payload)) == payload
@@ -0,0 +1,70 @@
+#/********************************************************************************
+# * Copyright (c) 2014, 2018 Cirrus Link Solutions and others
+# *
+# * This program and the accompanying materials are made available under the
+# * terms of the Eclipse Public License 2.0 which is available at
+# * http://www.eclipse.org/legal/epl-2.0.
+# *
+# * SPDX-License-Identifier: EPL-2.0
+# *
+# * Contributors:
+# *   Cirrus Link Solutions - initial implementation
+# ********************************************************************************/
+import sparkplug_b as sparkplug
+from sparkplug_b import MetricDataType, addMetric
+from sparkplug_b_state import HostOfflinePolicy, PrimaryHostState, parseStateMessage, stateTopics
+
+DDATA = "spBv1.0/G/DDATA/N/D"
+
+def test_parse_state_messages():
+    assert stateTopics("H") == ["STATE/H", "spBv1.0/STATE/H"]
+    assert parseStateMessage("STATE/H", b"ONLINE") == ("H", True)
+    assert parseStateMessage("STATE/H", b"OFFLINE ") == ("H", False)
+    assert parseStateMessage("STATE/H", b"maybe") is None
+    assert parseStateMessage("spBv1.0/STATE/H", b'{"online": false, "timestamp": 1}') == ("H", False)
+    assert parseStateMessage("spBv1.0/STATE/H", b'{"timestamp": 1}') is None
+    assert parseStateMessage("spBv1.0/STATE/H", b"not json") is None
+    assert parseStateMessage("spBv1.0/G/NDATA/N", b"") is None
+
+def test_follows_only_the_primary_host():
+    state = PrimaryHostState("H")
+    assert state.online
+    assert not state.onMessage("STATE/Other", b"OFFLINE")
+    assert state.onMessage("STATE/H", b"OFFLINE")
+    assert not state.online
+    state.onMessage("spBv1.0/STATE/H", b'{"online": false}')
+    assert state.outages == 1
+    state.onMessage("spBv1.0/STATE/H", b'{"online": true}')
+    assert state.online
+
+def test_suspend():
+    state = PrimaryHostState("H", HostOfflinePolicy.Suspend)
+    state.onMessage("STATE/H", b"OFFLINE")
+    assert not state.shouldPublish(DDATA, sparkplug.getDdataPayload())
+    assert state.suspended == 1
+    assert state.drain() == []
+
+def test_publish_policy():
+    state = PrimaryHostState("H", HostOfflinePolicy.Publish)
+    state.onMessage("STATE/H", b"OFFLINE")
+    assert state.shouldPublish(DDATA, sparkplug.getDdataPayload())
+
+def test_buffer_marks_history():
+    state = PrimaryHostState("H", maxBuffered=2)
+    state.onMessage("STATE/H", b"OFFLINE")
+    for value in range(3):
+        payload = sparkplug.getDdataPayload()
+        payload.timestamp = 1000 + value
+        metric = addMetric(payload, None, 1, MetricDataType.Int32, -value)
+        metric.ClearField("timestamp")
+        assert not state.shouldPublish(DDATA, payload, 1)
+    assert (state.buffered, state.dropped) == (3, 1)
+
+    messages = state.drain()
+    assert [topic for topic, payload, qos, retain in messages] == [DDATA, DDATA]
+    for value, (topic, payload, qos, retain) in zip((1, 2), messages):
+        metric = payload.metrics[0]
+        assert metric.is_historical
+        assert metric.timestamp == 1000 + value
+        assert qos == 1
+    assert state.drain() == []
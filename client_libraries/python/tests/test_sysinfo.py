@@ -0,0 +1,86 @@
+#/********************************************************************************
+# * Copyright (c) 2014, 2018 Cirrus Link Solutions and others
+# *
+# * This program and the accompanying materials are made available under the
+# * terms of the Eclipse Public License 2.0 which is available at
+# * http://www.eclipse.org/legal/epl-2.0.
+# *
+# * SPDX-License-Identifier: EPL-2.0
+# *
+# * Contributors:
+# *   Cirrus Link Solutions - initial implementation
+# ********************************************************************************/
+import sparkplug_b as sparkplug
+from sparkplug_b import MetricDataType
+from sparkplug_b_sysinfo import NodeInfoProvider, STATIC_METRICS, DYNAMIC_METRICS
+
+CPUINFO = """processor\t: 0
+model name\t: ARMv7 Processor rev 4 (v7l)
+Hardware\t: BCM2835
+Revision\t: a02082
+Serial\t\t: 00000000deadbeef
+
+processor\t: 1
+model name\t: Other
+"""
+
+def _proc(tmp_path, stat="cpu  100 0 100 700 100 0 0 0 0 0\nbtime 1600000000\n",
+          meminfo="MemTotal:        1000 kB\nMemAvailable:     400 kB\n"):
+    (tmp_path / "cpuinfo").write_text(CPUINFO)
+    (tmp_path / "stat").write_text(stat)
+    (tmp_path / "meminfo").write_text(meminfo)
+    return str(tmp_path)
+
+def test_static_values(tmp_path):
+    values = NodeInfoProvider(procPath=_proc(tmp_path)).staticValues()
+    assert values[1:4] == ["BCM2835", "a02082", "00000000deadbeef"]
+    assert values[5] == "ARMv7 Processor rev 4 (v7l)"
+    assert values[7:] == [1000 * 1024, 1600000000 * 1000]
+
+def test_missing_proc(tmp_path):
+    provider = NodeInfoProvider(procPath=str(tmp_path / "missing"))
+    values = provider.staticValues()
+    assert values[1:4] == [None, None, None]
+    assert values[7:] == [None, None]
+    assert provider.dynamicValues() == [None, None]
+
+    # Unavailable values are null metrics in the birth
+    payload = sparkplug.getNodeBirthPayload()
+    provider.addBirthMetrics(payload)
+    metrics = {metric.name: metric for metric in payload.metrics}
+    assert metrics["Parameters/hw_serial"].is_null
+    assert metrics["Node Info/CPU Usage"].is_null
+
+def test_dynamic_values(tmp_path):
+    procPath = _proc(tmp_path)
+    provider = NodeInfoProvider(refreshMs=0, procPath=procPath)
+    # Since boot: 800 idle of 1000
+    assert provider.dynamicValues() == [20.0, 400 * 1024]
+    _proc(tmp_path, stat="cpu  190 0 110 750 150 0 0 0 0 0\n",
+          meminfo="MemTotal: 1000 kB\nMemFree: 100 kB\nBuffers: 10 kB\nCached: 90 kB\n")
+    # Since the last refresh: 100 idle of 200
+    assert provider.dynamicValues() == [50.0, 200 * 1024]
+
+def test_dynamic_values_cached(tmp_path):
+    provider = NodeInfoProvider(refreshMs=60000, procPath=_proc(tmp_path))
+    values = provider.dynamicValues()
+    _proc(tmp_path, meminfo="MemAvailable: 1 kB\n")
+    assert provider.dynamicValues() is values
+
+def test_birth_and_changes(tmp_path):
+    provider = NodeInfoProvider(refreshMs=0, aliasBase=10, procPath=_proc(tmp_path))
+    payload = sparkplug.getNodeBirthPayload()
+    provider.addBirthMetrics(payload)
+    metrics = [metric for metric in payload.metrics if metric.alias >= 10]
+    assert [metric.name for metric in metrics] == [name for name, type in STATIC_METRICS + DYNAMIC_METRICS]
+    assert [metric.alias for metric in metrics] == list(range(10, 10 + len(metrics)))
+    assert metrics[6].datatype == MetricDataType.Int32
+
+    # Same stat counters again, so no CPU time passed and the usage is null
+    _proc(tmp_path, meminfo="MemAvailable: 500 kB\n")
+    payload = provider.getChangedPayload()
+    assert [(metric.name, metric.alias) for metric in payload.metrics] == \
+            [("", 10 + len(STATIC_METRICS)), ("", 11 + len(STATIC_METRICS))]
+    assert payload.metrics[0].is_null
+    assert payload.metrics[1].long_value == 500 * 1024
+    assert provider.getChangedPayload() is None
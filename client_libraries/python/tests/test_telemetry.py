@@ -0,0 +1,93 @@
+#/********************************************************************************
+# * Copyright (c) 2014, 2018 Cirrus Link Solutions and others
+# *
+# * This program and the accompanying materials are made available under the
+# * terms of the Eclipse Public License 2.0 which is available at
+# * http://www.eclipse.org/legal/epl-2.0.
+# *
+# * SPDX-License-Identifier: EPL-2.0
+# *
+# * Contributors:
+# *   Cirrus Link Solutions - initial implementation
+# ********************************************************************************/
+import asyncio
+
+import sparkplug_b as sparkplug
+from sparkplug_b import MetricDataType, addMetric
+from sparkplug_b_edge import EdgeNode
+from sparkplug_b_telemetry import NodeTelemetry, TELEMETRY_FOLDER, TELEMETRY_METRICS
+from sparkplug_b_transport import LoopbackBroker, LoopbackTransport
+
+async def _birth(node):
+    payload = sparkplug.getNodeBirthPayload()
+    addMetric(payload, "Out", 1, MetricDataType.Int16, 0)
+    await node.publishNodeBirth(payload)
+
+async def _run(aliasBase, instrumented):
+    broker = LoopbackBroker()
+    messages = []
+    recorder = LoopbackTransport(broker)
+    recorder.onMessage = lambda topic, payload: messages.append(
+            (topic.split("/")[2], sparkplug.parsePayload(payload)))
+    await recorder.connect()
+    recorder.subscribe("spBv1.0/G/#")
+
+    node = EdgeNode(LoopbackTransport(broker), "G", "N", _birth)
+    telemetry = NodeTelemetry(node, periodMs=20, aliasBase=aliasBase)
+    if instrumented:
+        sparkplug.enableInstrumentation()
+    try:
+        await node.start()
+        payload = sparkplug.getDdataPayload()
+        addMetric(payload, None, 1, MetricDataType.Int16, 1)
+        await node.publishNodeData(payload)
+        await asyncio.sleep(0.1)
+        await node.stop()
+    finally:
+        sparkplug.disableInstrumentation()
+    return messages, telemetry
+
+def _telemetry(payload):
+    return {metric.name: metric for metric in payload.metrics if metric.name.startswith(TELEMETRY_FOLDER)}
+
+def test_birth_contains_all_metrics():
+    messages, telemetry = asyncio.run(_run(aliasBase=100, instrumented=False))
+    messageType, birth = messages[0]
+    assert messageType == "NBIRTH"
+    metrics = _telemetry(birth)
+    assert list(metrics) == [TELEMETRY_FOLDER + name for name, type in TELEMETRY_METRICS]
+    for index, (name, type) in enumerate(TELEMETRY_METRICS):
+        metric = metrics[TELEMETRY_FOLDER + name]
+        assert (metric.alias, metric.datatype) == (100 + index, type)
+    # No instrumentation, no latency
+    assert metrics[TELEMETRY_FOLDER + "Build Latency P50 ms"].is_null
+    assert not metrics[TELEMETRY_FOLDER + "Reconnects"].is_null
+
+def test_reports_only_changes():
+    messages, telemetry = asyncio.run(_run(aliasBase=100, instrumented=False))
+    reports = [payload for messageType, payload in messages
+               if messageType == "NDATA" and all(metric.alias >= 100 for metric in payload.metrics)]
+    assert reports
+    for payload in reports:
+        # Reported by alias only, the birth named them
+        assert all(metric.name == "" for metric in payload.metrics)
+        # The queue depth, reconnects and the like do not change
+        assert len(payload.metrics) < len(TELEMETRY_METRICS)
+
+def test_reports_by_name_without_aliases():
+    messages, telemetry = asyncio.run(_run(aliasBase=None, instrumented=False))
+    birth = messages[0][1]
+    assert all(not metric.HasField("alias") for metric in _telemetry(birth).values())
+    reports = [payload for messageType, payload in messages[1:]
+               if messageType == "NDATA" and _telemetry(payload)]
+    assert reports
+    assert all(metric.name.startswith(TELEMETRY_FOLDER) for metric in reports[0].metrics)
+
+def test_build_latency_with_instrumentation():
+    messages, telemetry = asyncio.run(_run(aliasBase=100, instrumented=True))
+    values = []
+    for messageType, payload in messages:
+        for metric in payload.metrics:
+            if metric.alias == 103 and not metric.is_null:
+                values.append(metric.double_value)
+    assert values and all(value >= 0 for value in values)
@@ -0,0 +1,171 @@
+#/********************************************************************************
+# * Copyright (c) 2014, 2018 Cirrus Link Solutions and others
+# *
+# * This program and the accompanying materials are made available under the
+# * terms of the Eclipse Public License 2.0 which is available at
+# * http://www.eclipse.org/legal/epl-2.0.
+# *
+# * SPDX-License-Identifier: EPL-2.0
+# *
+# * Contributors:
+# *   Cirrus Link Solutions - initial implementation
+# ********************************************************************************/
+import asyncio
+
+import pytest
+
+from sparkplug_b_transport import LoopbackBroker, LoopbackTransport, ServerPoolTransport, topicMatches
+
+async def _settle():
+    for _ in range(5):
+        await asyncio.sleep(0)
+
+def _client(broker, received):
+    transport = LoopbackTransport(broker)
+    transport.onMessage = lambda topic, payload: received.append((topic, payload))
+    return transport
+
+@pytest.mark.parametrize("topicFilter, topic, expected", [
+    ("spBv1.0/G/NDATA/N", "spBv1.0/G/NDATA/N", True),
+    ("spBv1.0/G/#", "spBv1.0/G/NDATA/N", True),
+    ("spBv1.0/+/NDATA/N", "spBv1.0/G/NDATA/N", True),
+    ("spBv1.0/+/NDATA", "spBv1.0/G/NDATA/N", False),
+    ("spBv1.0/G/NDATA/N/D", "spBv1.0/G/NDATA/N", False),
+    ("#", "$SYS/broker", False),
+    ("+/broker", "$SYS/broker", False),
+    ("spBv1.0/#", "spBv1.0", True),
+])
+def test_topic_matches(topicFilter, topic, expected):
+    assert topicMatches(topicFilter, topic) == expected
+
+def test_loopback_routing():
+    async def main():
+        broker = LoopbackBroker()
+        received = []
+        subscriber = _client(broker, received)
+        await subscriber.connect()
+        subscriber.subscribe("spBv1.0/G/+/N")
+        publisher = LoopbackTransport(broker)
+        await publisher.connect()
+        await publisher.publish("spBv1.0/G/NDATA/N", b"1")
+        await publisher.publish("spBv1.0/H/NDATA/N", b"2")
+        await _settle()
+        subscriber.unsubscribe("spBv1.0/G/+/N")
+        await publisher.publish("spBv1.0/G/NDATA/N", b"3")
+        await _settle()
+        return received, broker
+
+    received, broker = asyncio.run(main())
+    assert received == [("spBv1.0/G/NDATA/N", b"1")]
+    assert (broker.messageCount, broker.byteCount) == (3, 3)
+
+def test_loopback_retained():
+    async def main():
+        broker = LoopbackBroker()
+        publisher = LoopbackTransport(broker)
+        await publisher.connect()
+        await publisher.publish("STATE/host", b"online", retain=True)
+        await publisher.publish("STATE/gone", b"x", retain=True)
+        await publisher.publish("STATE/gone", b"", retain=True)
+        received = []
+        subscriber = _client(broker, received)
+        await subscriber.connect()
+        subscriber.subscribe("STATE/#")
+        await _settle()
+        return received
+
+    assert asyncio.run(main()) == [("STATE/host", b"online")]
+
+def test_loopback_will():
+    async def main():
+        broker = LoopbackBroker()
+        received = []
+        subscriber = _client(broker, received)
+        await subscriber.connect()
+        subscriber.subscribe("#")
+
+        disconnects = []
+        clean = LoopbackTransport(broker)
+        await clean.connect("will/clean", b"dead")
+        await clean.disconnect()
+        dropped = LoopbackTransport(broker)
+        dropped.onDisconnect = disconnects.append
+        await dropped.connect("will/dropped", b"dead")
+        dropped.drop()
+        await _settle()
+        with pytest.raises(ConnectionError):
+            await dropped.publish("topic", b"")
+        return received, disconnects
+
+    received, disconnects = asyncio.run(main())
+    assert received == [("will/dropped", b"dead")]
+    assert disconnects == [1]
+
+def test_loopback_shutdown():
+    async def main():
+        broker = LoopbackBroker()
+        client = LoopbackTransport(broker)
+        await client.connect()
+        broker.shutdown()
+        assert not client.connected
+        assert not await client.probe()
+        with pytest.raises(ConnectionError):
+            await client.connect()
+
+    asyncio.run(main())
+
+def test_server_pool_failover():
+    async def main():
+        brokers = [LoopbackBroker(), LoopbackBroker()]
+        pool = ServerPoolTransport([LoopbackTransport(broker) for broker in brokers])
+        disconnects = []
+        pool.onDisconnect = disconnects.append
+        await pool.connect()
+        assert pool.current == 0
+
+        # The first server goes down, the next connect skips it
+        brokers[0].shutdown()
+        await _settle()
+        assert (pool.current, disconnects, pool.healthy) == (None, [1], [False, True])
+        await pool.connect()
+        assert pool.current == 1
+
+        # Healthy again, nextServer() still moves on from the current one
+        brokers[0].online = True
+        await pool.checkHealth()
+        assert pool.healthy == [True, True]
+        pool.nextServer()
+        await pool.disconnect()
+        await pool.connect()
+        assert pool.current == 0
+
+        brokers[0].shutdown()
+        brokers[1].shutdown()
+        await _settle()
+        with pytest.raises(ConnectionError):
+            await pool.connect()
+        with pytest.raises(ConnectionError):
+            await pool.publish("topic", b"")
+
+    asyncio.run(main())
+
+def test_server_pool_delivers_messages():
+    async def main():
+        broker = LoopbackBroker()
+        received = []
+        pool = ServerPoolTransport([LoopbackTransport(LoopbackBroker()), LoopbackTransport(broker)])
+        pool.onMessage = lambda topic, payload: received.append((topic, payload))
+        pool.servers[0].broker.online = False
+        await pool.connect()
+        pool.subscribe("a/#")
+        await pool.publish("a/b", b"1")
+        await _settle()
+        return received, pool.connectAttempts
+
+    received, connectAttempts = asyncio.run(main())
+    assert received == [("a/b", b"1")]
+    assert connectAttempts == 2
+
+def test_server_pool_empty():
+    with pytest.raises(ValueError):
+        ServerPoolTransport([])
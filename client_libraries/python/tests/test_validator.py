@@ -0,0 +1,62 @@
+#/********************************************************************************
+# * Copyright (c) 2014, 2018 Cirrus Link Solutions and others
+# *
+# * This program and the accompanying materials are made available under the
+# * terms of the Eclipse Public License 2.0 which is available at
+# * http://www.eclipse.org/legal/epl-2.0.
+# *
+# * SPDX-License-Identifier: EPL-2.0
+# *
+# * Contributors:
+# *   Cirrus Link Solutions - initial implementation
+# ********************************************************************************/
+import pytest
+
+from sparkplug_b_validator import ValidationError, compileSchema, validateDefinition, validatePayload
+
+def _error(document):
+    with pytest.raises(ValidationError) as info:
+        validatePayload(document)
+    return info.value
+
+def test_valid_payload():
+    validatePayload({
+        "timestamp" : 1, "seq" : 0,
+        "metrics" : [
+            { "name" : "a", "alias" : 1, "datatype" : "Int32", "value" : -1 },
+            { "name" : "b", "value" : None, "properties" : { "unit" : { "type" : "String", "value" : "C" } } },
+            { "name" : "c", "datatype" : "DataSet",
+                "value" : { "numberOfColumns" : 1, "columnNames" : ["x"], "types" : ["Int8"], "rows" : [[1], [2]] } },
+            { "name" : "d", "datatype" : "Template",
+                "value" : { "reference" : "T", "parameters" : [{ "name" : "p", "type" : "Int32" }],
+                    "metrics" : [{ "name" : "inner", "value" : 1.5 }] } },
+        ]
+    })
+
+def test_error_paths():
+    assert str(_error({ "seq" : "1" })) == "$.seq: expected integer"
+    assert _error({ "metrics" : [{ "alias" : True }] }).pathString() == "$.metrics[0].alias"
+    error = _error({ "metrics" : [{}, { "value" : { "rows" : [[1, None]] } }] })
+    assert error.pathString() == "$.metrics[1].value.rows[0][1]"
+    error = _error({ "metrics" : [{ "value" : { "parameters" : [{ "name" : "p", "value" : None }] } }] })
+    assert error.pathString() == "$.metrics[0].value.parameters[0].value"
+
+def test_unexpected_field():
+    error = _error({ "metrics" : [{ "value" : { "rows" : [], "extra" : 1 } }] })
+    assert error.pathString() == "$.metrics[0].value.extra"
+    assert error.message == "unexpected field"
+
+def test_recursive_property_sets():
+    validateDefinition("propertySet", { "a" : { "type" : "PropertySet", "value" : { "b" : { "type" : "Int8", "value" : 1 } } } })
+    with pytest.raises(ValidationError):
+        validateDefinition("propertySet", { "a" : { "type" : "PropertySet", "value" : { "b" : { "value" : [1] } } } })
+
+def test_compile_schema():
+    validate = compileSchema({ "type" : "object", "required" : ["a"], "properties" : { "a" : { "enum" : [1, 2] } } })
+    validate({ "a" : 2 })
+    with pytest.raises(ValidationError):
+        validate({})
+    with pytest.raises(ValidationError):
+        validate({ "a" : 3 })
+    with pytest.raises(ValueError):
+        compileSchema({ "minimum" : 1 })
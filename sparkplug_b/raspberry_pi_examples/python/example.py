@@ -17,12 +17,14 @@ sys.path.insert(0, "client_lib")
 import paho.mqtt.client as mqtt
 import pibrella
 import sparkplug_b as sparkplug
+import sparkplug_b_pb2
 import time
 import random
-import subprocess
 
 from sparkplug_b import *
-from threading import Lock
+from sparkplug_b_sysinfo import NodeInfoProvider
+from sparkplug_b_coalesce import EventCoalescer, CoalesceMode
+from sparkplug_b_rebirth import RebirthLimiter
 
 serverUrl = "192.168.1.53"
 myGroupId = "Sparkplug B Devices"
@@ -30,21 +32,33 @@ myNodeName = "Python Raspberry Pi"
 mySubNodeName = "Pibrella"
 myUsername = "admin"
 myPassword = "changeme"
-lock = Lock()
+
+# Node info refreshed every 10 seconds, static values are read once
+nodeInfo = NodeInfoProvider(refreshMs=10000)
+
+# Rebirth requests within a second share one birth, at most 3 births in
+# a row and one every 5 seconds after that
+rebirthLimiter = RebirthLimiter(windowMs=1000, rate=0.2, burst=3)
+
+# Button and input changes are queued by the pibrella callbacks and
+# published together by the main loop.  Every transition is kept with
+# its own timestamp so a short button press is not lost.
+def publishInputEvents(payload):
+    publishPayload(client, "spBv1.0/" + myGroupId + "/DDATA/" + myNodeName + "/" + mySubNodeName, payload, 0, False)
+inputEvents = EventCoalescer(publishInputEvents,
+        dict((name, (name, None, MetricDataType.Boolean)) for name in ("button", "Inputs/a", "Inputs/b", "Inputs/c", "Inputs/d")),
+        mode=CoalesceMode.KeepAll)
 
 ######################################################################
 # Button press event handler
 ######################################################################
 def button_changed(pin):
-    outboundPayload = sparkplug.getDdataPayload()
     buttonValue = pin.read()
     if buttonValue == 1:
         print("You pressed the button!")
     else:
         print("You released the button!")
-    addMetric(outboundPayload, "button", None, MetricDataType.Boolean, buttonValue);
-    byteArray = bytearray(outboundPayload.SerializeToString())
-    client.publish("spBv1.0/" + myGroupId + "/DDATA/" + myNodeName + "/" + mySubNodeName, byteArray, 0, False)
+    inputEvents.put("button", buttonValue)
 
 ######################################################################
 # Input change event handler
@@ -58,15 +72,9 @@ def input_c_changed(pin):
 def input_d_changed(pin):
     input_changed("Inputs/d", pin)
 def input_changed(name, pin):
-    lock.acquire()
-    try:
-        # Lock the block around the callback handler to prevent inproper access based on debounce
-        outboundPayload = sparkplug.getDdataPayload()
-        addMetric(outboundPayload, name, None, MetricDataType.Boolean, pin.read());
-        byteArray = bytearray(outboundPayload.SerializeToString())
-        client.publish("spBv1.0/" + myGroupId + "/DDATA/" + myNodeName + "/" + mySubNodeName, byteArray, 0, False)
-    finally:
-        lock.release()
+    # Only queue the change, the main loop publishes everything queued
+    # since its last pass in one DDATA
+    inputEvents.put(name, pin.read())
 ######################################################################
 
 ######################################################################
@@ -132,18 +140,19 @@ def on_message(client, userdata, msg):
             elif metric.name == "buzzer_success":
                 pibrella.buzzer.success()
 
-        byteArray = bytearray(outboundPayload.SerializeToString())
-        client.publish("spBv1.0/" + myGroupId + "/DDATA/" + myNodeName + "/" + mySubNodeName, byteArray, 0, False)
+        publishPayload(client, "spBv1.0/" + myGroupId + "/DDATA/" + myNodeName + "/" + mySubNodeName, outboundPayload, 0, False)
     elif tokens[0] == "spBv1.0" and tokens[1] == myGroupId and tokens[2] == "NCMD" and tokens[3] == myNodeName:
         inboundPayload = sparkplug_b_pb2.Payload()
         inboundPayload.ParseFromString(msg.payload)
         for metric in inboundPayload.metrics:
+            # The births are published by the main loop, once for all the
+            # requests which arrive close together
             if metric.name == "Node Control/Next Server":
-                publishBirths()
+                rebirthLimiter.request()
             if metric.name == "Node Control/Rebirth":
-                publishBirths()
+                rebirthLimiter.request()
             if metric.name == "Node Control/Reboot":
-                publishBirths()
+                rebirthLimiter.request()
     else:
         print "Unknown command..."
 
@@ -164,31 +173,11 @@ def publishBirths():
     addMetric(payload, "Node Control/Rebirth", None, MetricDataType.Boolean, False)
     addMetric(payload, "Node Control/Reboot", None, MetricDataType.Boolean, False)
 
-    # Set up the device Parameters
-    p = subprocess.Popen('uname -a', shell=True, stdout=subprocess.PIPE, stderr=subprocess.STDOUT)
-    for line in p.stdout.readlines():
-        unameOutput = line,
-    retVal = p.wait()
-    p = subprocess.Popen('cat /proc/cpuinfo | grep Hardware', shell=True, stdout=subprocess.PIPE, stderr=subprocess.STDOUT)
-    for line in p.stdout.readlines():
-        hardwareOutput = line,
-    retVal = p.wait()
-    p = subprocess.Popen('cat /proc/cpuinfo | grep Revision', shell=True, stdout=subprocess.PIPE, stderr=subprocess.STDOUT)
-    for line in p.stdout.readlines():
-        revisionOutput = line,
-    retVal = p.wait()
-    p = subprocess.Popen('cat /proc/cpuinfo | grep Serial', shell=True, stdout=subprocess.PIPE, stderr=subprocess.STDOUT)
-    for line in p.stdout.readlines():
-        serialOutput = line,
-    retVal = p.wait()
-    addMetric(payload, "Parameters/sw_version", None, MetricDataType.String, ''.join(unameOutput))
-    addMetric(payload, "Parameters/hw_version", None, MetricDataType.String, ''.join(hardwareOutput))
-    addMetric(payload, "Parameters/hw_revision", None, MetricDataType.String, ''.join(revisionOutput))
-    addMetric(payload, "Parameters/hw_serial", None, MetricDataType.String, ''.join(serialOutput))
+    # Set up the device Parameters and Node Info
+    nodeInfo.addBirthMetrics(payload)
 
     # Publish the NBIRTH certificate
-    byteArray = bytearray(payload.SerializeToString())
-    client.publish("spBv1.0/" + myGroupId + "/NBIRTH/" + myNodeName, byteArray, 0, False)
+    publishPayload(client, "spBv1.0/" + myGroupId + "/NBIRTH/" + myNodeName, payload, 0, False)
 
     # Set up the DBIRTH with the input metrics
     payload = sparkplug.getDeviceBirthPayload()
@@ -211,8 +200,7 @@ def publishBirths():
     addMetric(payload, "buzzer_success", None, MetricDataType.Boolean, 0)
 
     # Publish the initial data with the DBIRTH certificate
-    totalByteArray = bytearray(payload.SerializeToString())
-    client.publish("spBv1.0/" + myGroupId + "/DBIRTH/" + myNodeName + "/" + mySubNodeName, totalByteArray, 0, False)
+    publishPayload(client, "spBv1.0/" + myGroupId + "/DBIRTH/" + myNodeName + "/" + mySubNodeName, payload, 0, False)
 ######################################################################
 
 # Create the NDEATH payload
@@ -223,8 +211,7 @@ client = mqtt.Client(serverUrl, 1883, 60)
 client.on_connect = on_connect
 client.on_message = on_message
 client.username_pw_set(myUsername, myPassword)
-deathByteArray = bytearray(deathPayload.SerializeToString())
-client.will_set("spBv1.0/" + myGroupId + "/NDEATH/" + myNodeName, deathByteArray, 0, False)
+client.will_set("spBv1.0/" + myGroupId + "/NDEATH/" + myNodeName, deathPayload.SerializeToString(), 0, False)
 client.connect(serverUrl, 1883, 60)
 
 # Short delay to allow connect callback to occur
@@ -232,6 +219,7 @@ time.sleep(.1)
 client.loop()
 
 publishBirths()
+rebirthLimiter.recordBirth()
 
 # Set up the button press event handler
 pibrella.button.changed(button_changed)
@@ -245,3 +233,15 @@ while True:
     time.sleep(.1)
     client.loop()
 
+    # Answer the rebirth requests
+    if rebirthLimiter.due():
+        publishBirths()
+
+    # Publish the queued button and input changes
+    inputEvents.flush()
+
+    # Publish the node info which changed
+    payload = nodeInfo.getChangedPayload()
+    if payload is not None:
+        publishPayload(client, "spBv1.0/" + myGroupId + "/NDATA/" + myNodeName, payload, 0, False)
+
@@ -17,20 +17,33 @@ sys.path.insert(0, "../../../client_libraries/python/")
 
 import paho.mqtt.client as mqtt
 import sparkplug_b as sparkplug
+import sparkplug_b_pb2
 import time
 import random
 import string
 
 from sparkplug_b import *
+from sparkplug_b_compaction import PayloadCompactor
+from sparkplug_b_rebirth import RebirthLimiter
 
 # Application Variables
-serverUrl = "localhost"
+# MQTT servers to use, 'Node Control/Next Server' moves on to the next one
+serverUrls = ["localhost"]
+serverIndex = 0
+nextServerRequested = False
 myGroupId = "Sparkplug B Devices"
 myNodeName = "Python Edge Node 1"
 myDeviceName = "Emulated Device"
 publishPeriod = 5000
 myUsername = "admin"
 myPassword = "changeme"
+compactData = False
+
+# Rebirth requests within a second share one birth, at most 3 births in
+# a row and one every 5 seconds after that
+rebirthLimiter = RebirthLimiter(windowMs=1000, rate=0.2, burst=3)
+
+compactor = PayloadCompactor()
 
 class AliasMap:
     Next_Server = 0
@@ -70,6 +83,8 @@ def on_connect(client, userdata, flags, rc):
 # The callback for when a PUBLISH message is received from the server.
 ######################################################################
 def on_message(client, userdata, msg):
+    global nextServerRequested
+
     print("Message arrived: " + msg.topic)
     tokens = msg.topic.split("/")
 
@@ -81,21 +96,22 @@ def on_message(client, userdata, msg):
                 # 'Node Control/Next Server' is an NCMD used to tell the device/client application to
                 # disconnect from the current MQTT server and connect to the next MQTT server in the
                 # list of available servers.  This is used for clients that have a pool of MQTT servers
-                # to connect to.
-                print( "'Node Control/Next Server' is not implemented in this example")
+                # to connect to.  The main loop switches servers.
+                nextServerRequested = True
             elif metric.name == "Node Control/Rebirth" or metric.alias == AliasMap.Rebirth:
                 # 'Node Control/Rebirth' is an NCMD used to tell the device/client application to resend
                 # its full NBIRTH and DBIRTH again.  MQTT Engine will send this NCMD to a device/client
                 # application if it receives an NDATA or DDATA with a metric that was not published in the
                 # original NBIRTH or DBIRTH.  This is why the application must send all known metrics in
-                # its original NBIRTH and DBIRTH messages.
-                publishBirth()
+                # its original NBIRTH and DBIRTH messages.  The main loop publishes the births, once for
+                # all the requests which arrive close together.
+                rebirthLimiter.request()
             elif metric.name == "Node Control/Reboot" or metric.alias == AliasMap.Reboot:
                 # 'Node Control/Reboot' is an NCMD used to tell a device/client application to reboot
                 # This can be used for devices that need a full application reset via a soft reboot.
                 # In this case, we fake a full reboot with a republishing of the NBIRTH and DBIRTH
                 # messages.
-                publishBirth()
+                rebirthLimiter.request()
             elif metric.name == "output/Device Metric2" or metric.alias == AliasMap.Device_Metric2:
                 # This is a metric we declared in our DBIRTH message and we're emulating an output.
                 # So, on incoming 'writes' to the output we must publish a DDATA with the new output
@@ -111,8 +127,9 @@ def on_message(client, userdata, msg):
                 addMetric(payload, None, AliasMap.Device_Metric2, MetricDataType.Int16, newValue)
 
                 # Publish a message data
-                byteArray = bytearray(payload.SerializeToString())
-                client.publish("spBv1.0/" + myGroupId + "/DDATA/" + myNodeName + "/" + myDeviceName, byteArray, 0, False)
+                if compactData:
+                    compactor.compact(payload, myDeviceName)
+                publishPayload(client, "spBv1.0/" + myGroupId + "/DDATA/" + myNodeName + "/" + myDeviceName, payload, 0, False)
             elif metric.name == "output/Device Metric3" or metric.alias == AliasMap.Device_Metric3:
                 # This is a metric we declared in our DBIRTH message and we're emulating an output.
                 # So, on incoming 'writes' to the output we must publish a DDATA with the new output
@@ -128,8 +145,9 @@ def on_message(client, userdata, msg):
                 addMetric(payload, None, AliasMap.Device_Metric3, MetricDataType.Boolean, newValue)
 
                 # Publish a message data
-                byteArray = bytearray(payload.SerializeToString())
-                client.publish("spBv1.0/" + myGroupId + "/DDATA/" + myNodeName + "/" + myDeviceName, byteArray, 0, False)
+                if compactData:
+                    compactor.compact(payload, myDeviceName)
+                publishPayload(client, "spBv1.0/" + myGroupId + "/DDATA/" + myNodeName + "/" + myDeviceName, payload, 0, False)
             else:
                 print( "Unknown command: " + metric.name)
     else:
@@ -201,8 +219,8 @@ def publishNodeBirth():
     addMetric(template, "AMPs", None, MetricDataType.Int32, 0)    # No alias in UDT members
 
     # Publish the node birth certificate
-    byteArray = bytearray(payload.SerializeToString())
-    client.publish("spBv1.0/" + myGroupId + "/NBIRTH/" + myNodeName, byteArray, 0, False)
+    compactor.recordBirth(payload)
+    publishPayload(client, "spBv1.0/" + myGroupId + "/NBIRTH/" + myNodeName, payload, 0, False)
 ######################################################################
 
 ######################################################################
@@ -230,8 +248,31 @@ def publishDeviceBirth():
     addMetric(template, "AMPs", None, MetricDataType.Int32, 456)    # No alias in UDT members
 
     # Publish the initial data with the Device BIRTH certificate
-    totalByteArray = bytearray(payload.SerializeToString())
-    client.publish("spBv1.0/" + myGroupId + "/DBIRTH/" + myNodeName + "/" + myDeviceName, totalByteArray, 0, False)
+    compactor.recordBirth(payload, myDeviceName)
+    publishPayload(client, "spBv1.0/" + myGroupId + "/DBIRTH/" + myNodeName + "/" + myDeviceName, payload, 0, False)
+######################################################################
+
+######################################################################
+# Move to the next MQTT server with a new bdSeq and publish the births
+######################################################################
+def connectNextServer():
+    global serverIndex
+    global deathPayload
+
+    # A clean disconnect does not trigger the will so send the death here
+    publishPayload(client, "spBv1.0/" + myGroupId + "/NDEATH/" + myNodeName, deathPayload, 0, False)
+    client.disconnect()
+
+    serverIndex = (serverIndex + 1) % len(serverUrls)
+    print("Connecting to " + serverUrls[serverIndex])
+    deathPayload = sparkplug.getNodeDeathPayload()
+    client.will_set("spBv1.0/" + myGroupId + "/NDEATH/" + myNodeName, deathPayload.SerializeToString(), 0, False)
+    client.connect(serverUrls[serverIndex], 1883, 60)
+    time.sleep(.1)
+    client.loop()
+
+    publishBirth()
+    rebirthLimiter.recordBirth()
 ######################################################################
 
 ######################################################################
@@ -243,13 +284,12 @@ print("Starting main application")
 deathPayload = sparkplug.getNodeDeathPayload()
 
 # Start of main program - Set up the MQTT client connection
-client = mqtt.Client(serverUrl, 1883, 60)
+client = mqtt.Client(serverUrls[serverIndex], 1883, 60)
 client.on_connect = on_connect
 client.on_message = on_message
 client.username_pw_set(myUsername, myPassword)
-deathByteArray = bytearray(deathPayload.SerializeToString())
-client.will_set("spBv1.0/" + myGroupId + "/NDEATH/" + myNodeName, deathByteArray, 0, False)
-client.connect(serverUrl, 1883, 60)
+client.will_set("spBv1.0/" + myGroupId + "/NDEATH/" + myNodeName, deathPayload.SerializeToString(), 0, False)
+client.connect(serverUrls[serverIndex], 1883, 60)
 
 # Short delay to allow connect callback to occur
 time.sleep(.1)
@@ -257,6 +297,7 @@ client.loop()
 
 # Publish the birth certificates
 publishBirth()
+rebirthLimiter.recordBirth()
 
 while True:
     # Periodically publish some new data
@@ -273,11 +314,17 @@ while True:
     propertyValue.int_value = 500
 
     # Publish a message data
-    byteArray = bytearray(payload.SerializeToString())
-    client.publish("spBv1.0/" + myGroupId + "/DDATA/" + myNodeName + "/" + myDeviceName, byteArray, 0, False)
+    if compactData:
+        compactor.compact(payload, myDeviceName)
+    publishPayload(client, "spBv1.0/" + myGroupId + "/DDATA/" + myNodeName + "/" + myDeviceName, payload, 0, False)
 
     # Sit and wait for inbound or outbound events
     for _ in range(5):
         time.sleep(.1)
         client.loop()
+        if rebirthLimiter.due():
+            publishBirth()
+        if nextServerRequested:
+            nextServerRequested = False
+            connectNextServer()
 ######################################################################
@@ -0,0 +1,116 @@
+#!/usr/bin/python3
+#/********************************************************************************
+# * Copyright (c) 2014, 2018 Cirrus Link Solutions and others
+# *
+# * This program and the accompanying materials are made available under the
+# * terms of the Eclipse Public License 2.0 which is available at
+# * http://www.eclipse.org/legal/epl-2.0.
+# *
+# * SPDX-License-Identifier: EPL-2.0
+# *
+# * Contributors:
+# *   Cirrus Link Solutions - initial implementation
+# ********************************************************************************/
+import sys
+sys.path.insert(0, "../../../client_libraries/python/")
+
+import asyncio
+import random
+import string
+
+import sparkplug_b as sparkplug
+from sparkplug_b import *
+from sparkplug_b_edge import EdgeNode
+from sparkplug_b_state import PrimaryHostState, HostOfflinePolicy
+from sparkplug_b_transport import AsyncioMqttTransport, ServerPoolTransport
+
+# Application Variables
+# MQTT servers in order of priority, 'Node Control/Next Server' and a
+# lost connection fail over to the next one
+serverUrls = ["localhost"]
+myGroupId = "Sparkplug B Devices"
+myNodeName = "Python Edge Node 1"
+myDeviceName = "Emulated Device"
+publishPeriod = 5000
+myUsername = "admin"
+myPassword = "changeme"
+# Host application ID to follow the STATE of, None to ignore it
+myPrimaryHostId = None
+
+class AliasMap:
+    Next_Server = 0
+    Rebirth = 1
+    Reboot = 2
+    Device_Metric0 = 3
+    Device_Metric1 = 4
+    Device_Metric2 = 5
+
+######################################################################
+# Publish the NBIRTH and DBIRTH certificates
+######################################################################
+async def publishBirth(node):
+    print("Publishing Birth")
+
+    payload = sparkplug.getNodeBirthPayload()
+    addMetric(payload, "Node Control/Next Server", AliasMap.Next_Server, MetricDataType.Boolean, False)
+    addMetric(payload, "Node Control/Rebirth", AliasMap.Rebirth, MetricDataType.Boolean, False)
+    addMetric(payload, "Node Control/Reboot", AliasMap.Reboot, MetricDataType.Boolean, False)
+    await node.publishNodeBirth(payload)
+
+    payload = sparkplug.getDeviceBirthPayload()
+    addMetric(payload, "input/Device Metric0", AliasMap.Device_Metric0, MetricDataType.String, "hello device")
+    addMetric(payload, "input/Device Metric1", AliasMap.Device_Metric1, MetricDataType.Boolean, True)
+    addMetric(payload, "output/Device Metric2", AliasMap.Device_Metric2, MetricDataType.Int16, 16)
+    await node.publishDeviceBirth(myDeviceName, payload)
+######################################################################
+
+######################################################################
+# Handle writes to the emulated output by publishing its new value
+######################################################################
+async def writeDeviceMetric2(node, deviceId, metric):
+    # Hosts may leave out the datatype, it is the one from the DBIRTH
+    if not metric.HasField("datatype"):
+        metric.datatype = MetricDataType.Int16
+    newValue = getMetricValue(metric)
+    print("CMD message for output/Device Metric2 - New Value: {}".format(newValue))
+
+    payload = sparkplug.getDdataPayload()
+    addMetric(payload, None, AliasMap.Device_Metric2, MetricDataType.Int16, newValue)
+    await node.publishDeviceData(myDeviceName, payload)
+######################################################################
+
+######################################################################
+# Periodically publish some new data
+######################################################################
+async def scanInputs(node):
+    payload = sparkplug.getDdataPayload()
+    addMetric(payload, None, AliasMap.Device_Metric0, MetricDataType.String, ''.join(random.choice(string.ascii_lowercase) for i in range(12)))
+    addMetric(payload, None, AliasMap.Device_Metric1, MetricDataType.Boolean, random.choice([True, False]))
+    await node.publishDeviceData(myDeviceName, payload)
+######################################################################
+
+######################################################################
+# Main Application
+######################################################################
+print("Starting main application")
+
+transport = ServerPoolTransport([AsyncioMqttTransport(serverUrl, 1883, 60, username=myUsername, password=myPassword)
+        for serverUrl in serverUrls])
+primaryHost = None
+if myPrimaryHostId is not None:
+    # Keep the data while the host is down and send it as history once it is back
+    primaryHost = PrimaryHostState(myPrimaryHostId, HostOfflinePolicy.Buffer)
+node = EdgeNode(transport, myGroupId, myNodeName, publishBirth, primaryHost=primaryHost)
+node.addCommandHandler("Node Control/Next Server", AliasMap.Next_Server, EdgeNode.nextServerCommand)
+node.addCommandHandler("Node Control/Rebirth", AliasMap.Rebirth, EdgeNode.rebirthCommand)
+node.addCommandHandler("Node Control/Reboot", AliasMap.Reboot, EdgeNode.rebirthCommand)
+node.addCommandHandler("output/Device Metric2", AliasMap.Device_Metric2, writeDeviceMetric2)
+node.addScanTask(scanInputs, publishPeriod)
+
+# Keep track of which standby servers are reachable
+async def main():
+    transport.startHealthChecks(5000)
+    await node.run()
+
+asyncio.run(main())
+######################################################################
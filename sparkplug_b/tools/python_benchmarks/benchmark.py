@@ -0,0 +1,481 @@
+#!/usr/bin/python3
+#/********************************************************************************
+# * Copyright (c) 2014, 2018 Cirrus Link Solutions and others
+# *
+# * This program and the accompanying materials are made available under the
+# * terms of the Eclipse Public License 2.0 which is available at
+# * http://www.eclipse.org/legal/epl-2.0.
+# *
+# * SPDX-License-Identifier: EPL-2.0
+# *
+# * Contributors:
+# *   Cirrus Link Solutions - initial implementation
+# ********************************************************************************/
+import sys
+sys.path.insert(0, "../../../client_libraries/python/")
+
+import argparse
+import json
+import os
+import platform
+import subprocess
+import time
+
+import sparkplug_b as sparkplug
+import sparkplug_b_native
+import sparkplug_b_pb2
+from sparkplug_b import *
+
+# Number of metrics added to a payload per call of the addMetric benchmarks
+BATCH = 100
+
+# Sample value of every datatype addMetric supports
+_values = {
+    "Int8" : -100,
+    "Int16" : -30000,
+    "Int32" : -2000000000,
+    "Int64" : -9000000000000000000,
+    "UInt8" : 200,
+    "UInt16" : 60000,
+    "UInt32" : 4000000000,
+    "UInt64" : 18000000000000000000,
+    "Float" : 1.5,
+    "Double" : 3.14159265358979,
+    "Boolean" : True,
+    "String" : "hello sparkplug",
+    "DateTime" : 1500000000000,
+    "Text" : "hello sparkplug text",
+    "UUID" : "5c4a6e5e-6c8d-4c0c-9a53-2b0b1d1c7f3a",
+    "Bytes" : b"\x00\x01\x02\x03" * 16,
+    "File" : b"\x00\x01\x02\x03" * 256,
+}
+
+######################################################################
+# Registry of benchmarks.  Each benchmark returns (op, opsPerCall,
+# bytesPerOp) where op() is the callable which is timed, optionally
+# followed by teardown() which is called once the timing is done.
+######################################################################
+benchmarks = []
+
+def benchmark(name):
+    def register(function):
+        benchmarks.append((name, function))
+        return function
+    return register
+######################################################################
+
+######################################################################
+# Payloads used by the serialize and parse benchmarks
+######################################################################
+def buildNodeBirth(metrics=100):
+    payload = sparkplug.getNodeBirthPayload()
+    addMetric(payload, "Node Control/Next Server", 0, MetricDataType.Boolean, False)
+    addMetric(payload, "Node Control/Rebirth", 1, MetricDataType.Boolean, False)
+    addMetric(payload, "Node Control/Reboot", 2, MetricDataType.Boolean, False)
+    types = sorted(_values.keys())
+    for index in range(metrics):
+        type = types[index % len(types)]
+        metric = addMetric(payload, "Node Metric%d" % index, index + 3, getattr(MetricDataType, type), _values[type])
+        metric.properties.keys.extend(["engUnit"])
+        propertyValue = metric.properties.values.add()
+        propertyValue.type = ParameterDataType.String
+        propertyValue.string_value = "MyCustomUnits"
+    buildTemplate(payload)
+    return payload
+
+def buildDdata(metrics=20):
+    payload = sparkplug.getDdataPayload()
+    for index in range(metrics):
+        addMetric(payload, None, index + 3, MetricDataType.Double, index * 1.5)
+    return payload
+
+def buildDataset(payload, rows):
+    columns = ["Int32s", "Doubles", "Strings"]
+    types = [DataSetDataType.Int32, DataSetDataType.Double, DataSetDataType.String]
+    dataset = initDatasetMetric(payload, "DataSet", 3, columns, types)
+    for index in range(rows):
+        row = dataset.rows.add()
+        row.elements.add().int_value = index
+        row.elements.add().double_value = index * 0.5
+        row.elements.add().string_value = "row"
+    return payload
+
+def buildTemplate(payload):
+    template = initTemplateMetric(payload, "_types_/Custom_Motor", None, None)
+    templateParameter = template.parameters.add()
+    templateParameter.name = "Index"
+    templateParameter.type = ParameterDataType.String
+    templateParameter.string_value = "0"
+    addMetric(template, "RPMs", None, MetricDataType.Int32, 0)
+    addMetric(template, "AMPs", None, MetricDataType.Int32, 0)
+    return payload
+######################################################################
+
+######################################################################
+# Benchmarks
+######################################################################
+def _addMetricBenchmark(type):
+    def run():
+        datatype = getattr(MetricDataType, type)
+        value = _values[type]
+        def op():
+            payload = sparkplug_b_pb2.Payload()
+            for index in range(BATCH):
+                addMetric(payload, None, index, datatype, value)
+        payload = sparkplug_b_pb2.Payload()
+        addMetric(payload, None, 1, datatype, value)
+        return op, BATCH, payload.ByteSize()
+    return run
+
+for _type in sorted(_values.keys(), key=lambda type: getattr(MetricDataType, type)):
+    benchmark("addMetric/" + _type)(_addMetricBenchmark(_type))
+
+@benchmark("addNullMetric")
+def benchAddNullMetric():
+    def op():
+        payload = sparkplug_b_pb2.Payload()
+        for index in range(BATCH):
+            addNullMetric(payload, None, index, MetricDataType.Int32)
+    payload = sparkplug_b_pb2.Payload()
+    addNullMetric(payload, None, 1, MetricDataType.Int32)
+    return op, BATCH, payload.ByteSize()
+
+def _datasetBenchmark(rows):
+    def run():
+        op = lambda: buildDataset(sparkplug_b_pb2.Payload(), rows)
+        return op, 1, op().ByteSize()
+    return run
+
+for _rows in (10, 100, 1000):
+    benchmark("dataset/build/%d rows" % _rows)(_datasetBenchmark(_rows))
+
+def _datasetRowsBenchmark(rows):
+    def run():
+        values = [(index, index * 0.5, "row") for index in range(rows)]
+        def op():
+            payload = sparkplug_b_pb2.Payload()
+            dataset = initDatasetMetric(payload, "DataSet", 3, ["Int32s", "Doubles", "Strings"],
+                    [DataSetDataType.Int32, DataSetDataType.Double, DataSetDataType.String])
+            addDatasetRows(dataset, values)
+            return payload
+        return op, 1, op().ByteSize()
+    return run
+
+benchmark("dataset/addDatasetRows/1000 rows")(_datasetRowsBenchmark(1000))
+
+@benchmark("historical/1000 values")
+def benchHistorical():
+    timestamps = list(range(1500000000000, 1500000000000 + 1000))
+    values = [index * 0.5 for index in range(1000)]
+    def op():
+        payload = sparkplug_b_pb2.Payload()
+        addHistoricalMetrics(payload, None, 3, MetricDataType.Double, timestamps, values)
+        return payload
+    return op, 1, op().ByteSize()
+
+@benchmark("template/build")
+def benchTemplateBuild():
+    op = lambda: buildTemplate(sparkplug_b_pb2.Payload())
+    return op, 1, op().ByteSize()
+
+@benchmark("nbirth/build")
+def benchNodeBirthBuild():
+    return buildNodeBirth, 1, buildNodeBirth().ByteSize()
+
+@benchmark("nbirth/serialize")
+def benchNodeBirthSerialize():
+    payload = buildNodeBirth()
+    return payload.SerializeToString, 1, payload.ByteSize()
+
+@benchmark("ddata/serialize")
+def benchDdataSerialize():
+    payload = buildDdata()
+    return payload.SerializeToString, 1, payload.ByteSize()
+
+def _parseBenchmark(build):
+    def run():
+        data = build().SerializeToString()
+        return lambda: sparkplug.parsePayload(data), 1, len(data)
+    return run
+
+benchmark("parse/nbirth")(_parseBenchmark(buildNodeBirth))
+benchmark("parse/ddata")(_parseBenchmark(buildDdata))
+benchmark("parse/dataset 1000 rows")(_parseBenchmark(lambda: buildDataset(sparkplug_b_pb2.Payload(), 1000)))
+
+@benchmark("json/encode nbirth")
+def benchJsonEncode():
+    from sparkplug_b_json import payloadToJson
+    payload = buildNodeBirth()
+    return lambda: payloadToJson(payload), 1, len(payloadToJson(payload))
+
+@benchmark("json/decode nbirth")
+def benchJsonDecode():
+    from sparkplug_b_json import payloadToJson, payloadFromJson
+    text = payloadToJson(buildNodeBirth())
+    return lambda: payloadFromJson(text), 1, len(text)
+
+@benchmark("json/validate nbirth")
+def benchJsonValidate():
+    from sparkplug_b_json import payloadToJson
+    from sparkplug_b_validator import validatePayload
+    text = payloadToJson(buildNodeBirth())
+    document = json.loads(text)
+    return lambda: validatePayload(document), 1, len(text)
+
+######################################################################
+# The dict codec of sparkplug_b_native, native or pure Python, and as a
+# baseline the protobuf runtime serializing and parsing the Payload
+# messages the sparkplug_b helpers build, which is the path
+# serializePayload and parsePayload take.  The dict codec does not
+# replace that path, it only helps code which works on dicts anyway.
+######################################################################
+def _codecBenchmark(build, implementation, direction):
+    def run():
+        message = build()
+        data = message.SerializeToString()
+        if implementation == "protobuf":
+            if direction == "encode":
+                return message.SerializeToString, 1, len(data)
+            return lambda: sparkplug_b_pb2.Payload.FromString(data), 1, len(data)
+        if implementation == "native":
+            if not sparkplug_b_native.native:
+                return None
+            encode, decode = sparkplug_b_native.encode_payload, sparkplug_b_native.decode_payload
+        else:
+            encode, decode = sparkplug_b_native._encodePayload, sparkplug_b_native._decodePayload
+        if direction == "encode":
+            payload = decode(data)
+            return lambda: encode(payload), 1, len(data)
+        return lambda: decode(data), 1, len(data)
+    return run
+
+for _implementation in ("protobuf", "python", "native"):
+    for _direction in ("encode", "decode"):
+        benchmark("codec/%s %s nbirth" % (_implementation, _direction))(_codecBenchmark(buildNodeBirth, _implementation, _direction))
+        benchmark("codec/%s %s ddata" % (_implementation, _direction))(_codecBenchmark(buildDdata, _implementation, _direction))
+
+######################################################################
+# Path of a snapshot file in a new temporary directory and the teardown
+# which removes that directory again
+######################################################################
+def _snapshotPath():
+    import shutil
+    import tempfile
+    directory = tempfile.mkdtemp()
+    return os.path.join(directory, "state.snapshot"), lambda: shutil.rmtree(directory, ignore_errors=True)
+
+@benchmark("snapshot/update ddata")
+def benchSnapshotUpdate():
+    from sparkplug_b_snapshot import HostStateSnapshot
+    path, removePath = _snapshotPath()
+    snapshot = HostStateSnapshot(path)
+    snapshot.update("spBv1.0/Benchmark/NBIRTH/Node", buildNodeBirth())
+    payload = buildDdata()
+    def run():
+        payload.seq = (snapshot.nodes[("Benchmark", "Node")].seq + 1) % 256
+        snapshot.update("spBv1.0/Benchmark/NDATA/Node", payload)
+    def teardown():
+        snapshot.close()
+        removePath()
+    return run, 1, payload.ByteSize(), teardown
+
+@benchmark("snapshot/load 100 nodes")
+def benchSnapshotLoad():
+    from sparkplug_b_snapshot import HostStateSnapshot
+    path, removePath = _snapshotPath()
+    with HostStateSnapshot(path) as snapshot:
+        birth = buildNodeBirth()
+        for node in range(100):
+            snapshot.update("spBv1.0/Benchmark/NBIRTH/Node " + str(node), birth)
+        used = snapshot.used
+    return lambda: HostStateSnapshot(path).close(), 1, used, removePath
+######################################################################
+
+######################################################################
+# Time op() for at least minTime seconds, repeat and keep the best run
+######################################################################
+def measure(op, opsPerCall, minTime, repeat):
+    calls = 1
+    while True:
+        started = time.perf_counter()
+        for _ in range(calls):
+            op()
+        elapsed = time.perf_counter() - started
+        if elapsed >= minTime / 10:
+            break
+        calls *= 2
+    calls = max(1, int(calls * minTime / max(elapsed, 1e-9)))
+
+    best = None
+    for _ in range(repeat):
+        started = time.perf_counter()
+        for _ in range(calls):
+            op()
+        elapsed = time.perf_counter() - started
+        if best is None or elapsed < best:
+            best = elapsed
+    return calls * opsPerCall / best
+######################################################################
+
+######################################################################
+# Cold import time in milliseconds: the best of 'repeat' fresh
+# interpreters running an import statement, less the start up time of
+# an interpreter importing nothing
+######################################################################
+def importTime(statement, repeat):
+    environ = dict(os.environ)
+    environ["PYTHONPATH"] = os.pathsep.join([os.path.abspath(sys.path[0])] + [environ.get("PYTHONPATH", "")])
+    # Measure with the bytecode cache in place, as deployed
+    environ.pop("PYTHONDONTWRITEBYTECODE", None)
+    def run(statement):
+        subprocess.check_call([sys.executable, "-c", statement], env=environ)
+        best = None
+        for _ in range(repeat):
+            started = time.perf_counter()
+            subprocess.check_call([sys.executable, "-c", statement], env=environ)
+            elapsed = time.perf_counter() - started
+            if best is None or elapsed < best:
+                best = elapsed
+        return best
+    return (run(statement) - run("pass")) * 1000
+######################################################################
+
+######################################################################
+# Describe the environment the results were produced in
+######################################################################
+def environment():
+    import google.protobuf
+    return {
+        "python" : platform.python_version(),
+        "implementation" : platform.python_implementation(),
+        "machine" : platform.machine(),
+        "protobuf" : google.protobuf.__version__,
+        "protobuf_backend" : sparkplug.protobufBackend(),
+        "native_codec" : sparkplug_b_native.native,
+    }
+######################################################################
+
+######################################################################
+# Run the benchmarks once per protobuf backend in child processes and
+# print their ops/sec side by side.  A backend which is not available
+# in this protobuf build is reported as such.
+######################################################################
+def compareBackends(backends, arguments):
+    import tempfile
+    results = {}
+    for backend in backends:
+        environ = dict(os.environ)
+        environ["PROTOCOL_BUFFERS_PYTHON_IMPLEMENTATION"] = backend
+        with tempfile.NamedTemporaryFile(suffix=".json") as output:
+            command = [sys.executable, os.path.abspath(__file__), "--output", output.name] + arguments
+            if subprocess.call(command, env=environ, stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL) != 0:
+                print("protobuf backend " + backend + " is not available")
+                continue
+            with open(output.name) as f:
+                results[backend] = json.load(f)
+            actual = results[backend]["environment"]["protobuf_backend"]
+            if actual != backend:
+                print("protobuf backend " + backend + " requested but " + actual + " loaded")
+    backends = list(results.keys())
+
+    names = []
+    for result in results.values():
+        for name in result["results"]:
+            if name not in names:
+                names.append(name)
+    print(("%-32s" + " %14s" * len(backends)) % tuple(["benchmark"] + backends))
+    for name in names:
+        row = [name]
+        for backend in backends:
+            result = results[backend]["results"].get(name)
+            if result is None:
+                row.append("")
+            elif "ops_per_sec" in result:
+                row.append("%.0f" % result["ops_per_sec"])
+            elif "error" in result:
+                row.append("failed")
+            else:
+                row.append("%.1f ms" % result["import_ms"])
+        print(("%-32s" + " %14s" * len(backends)) % tuple(row))
+    return results
+######################################################################
+
+######################################################################
+# Main Application
+######################################################################
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Benchmarks of the sparkplug_b payload hot paths")
+    parser.add_argument("--filter", default="", help="only run benchmarks whose name contains this string")
+    parser.add_argument("--min-time", type=float, default=0.2, help="seconds per timed run")
+    parser.add_argument("--repeat", type=int, default=3, help="timed runs per benchmark, the best is kept")
+    parser.add_argument("--output", help="write the results to this JSON file")
+    parser.add_argument("--compare", help="JSON results of an earlier run to compare against")
+    parser.add_argument("--import-time", action="store_true", help="also measure the cold import time of sparkplug_b")
+    parser.add_argument("--backends", help="comma separated protobuf backends (python, cpp, upb) to run and compare")
+    options = parser.parse_args()
+
+    if options.backends:
+        arguments = ["--filter", options.filter, "--min-time", str(options.min_time), "--repeat", str(options.repeat)]
+        if options.import_time:
+            arguments.append("--import-time")
+        results = compareBackends(options.backends.split(","), arguments)
+        if options.output:
+            with open(options.output, "w") as f:
+                json.dump(results, f, indent=2, sort_keys=True)
+        sys.exit(0)
+
+    print("protobuf backend: " + sparkplug.protobufBackend())
+
+    baseline = {}
+    if options.compare:
+        with open(options.compare) as f:
+            previous = json.load(f)
+        baseline = previous["results"]
+        if previous["environment"]["protobuf_backend"] != sparkplug.protobufBackend():
+            print("warning: comparing against results of the " + previous["environment"]["protobuf_backend"] + " backend")
+
+    results = {}
+    print("%-32s %14s %10s %8s" % ("benchmark", "ops/sec", "bytes/op", "change"))
+    for name, setup in benchmarks:
+        if options.filter not in name:
+            continue
+        # A failing benchmark is reported and the others still run
+        try:
+            benchmarkSetup = setup()
+            if benchmarkSetup is None:
+                # Not available in this environment
+                continue
+            op, opsPerCall, bytesPerOp = benchmarkSetup[:3]
+            try:
+                opsPerSec = measure(op, opsPerCall, options.min_time, options.repeat)
+            finally:
+                if len(benchmarkSetup) > 3:
+                    benchmarkSetup[3]()
+        except Exception as e:
+            results[name] = { "error" : str(e) }
+            print("%-32s failed: %s" % (name, e))
+            continue
+        results[name] = { "ops_per_sec" : opsPerSec, "bytes_per_op" : bytesPerOp }
+
+        change = ""
+        if "ops_per_sec" in baseline.get(name, {}):
+            change = "%+.1f%%" % ((opsPerSec / baseline[name]["ops_per_sec"] - 1) * 100)
+        print("%-32s %14.0f %10d %8s" % (name, opsPerSec, bytesPerOp, change))
+
+    if options.import_time:
+        # sparkplug_b imports sparkplug_b_pb2 and the protobuf runtime
+        # only once the first payload is created
+        for name, statement in (("import/sparkplug_b_pb2", "import sparkplug_b_pb2"),
+                ("import/sparkplug_b", "import sparkplug_b"),
+                ("import/sparkplug_b first payload", "import sparkplug_b; sparkplug_b.getDdataPayload()")):
+            milliseconds = importTime(statement, max(options.repeat, 5))
+            results[name] = { "import_ms" : milliseconds }
+            change = ""
+            if name in baseline:
+                change = "%+.1f%%" % ((milliseconds / baseline[name]["import_ms"] - 1) * 100)
+            print("%-32s %11.1f ms %10s %8s" % (name, milliseconds, "", change))
+
+    if options.output:
+        with open(options.output, "w") as f:
+            json.dump({ "environment" : environment(), "time" : time.time(), "results" : results }, f, indent=2, sort_keys=True)
+######################################################################
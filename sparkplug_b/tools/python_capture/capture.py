@@ -0,0 +1,137 @@
+#!/usr/bin/python3
+#/********************************************************************************
+# * Copyright (c) 2014, 2018 Cirrus Link Solutions and others
+# *
+# * This program and the accompanying materials are made available under the
+# * terms of the Eclipse Public License 2.0 which is available at
+# * http://www.eclipse.org/legal/epl-2.0.
+# *
+# * SPDX-License-Identifier: EPL-2.0
+# *
+# * Contributors:
+# *   Cirrus Link Solutions - initial implementation
+# ********************************************************************************/
+import sys
+sys.path.insert(0, "../../../client_libraries/python/")
+
+import argparse
+import time
+
+from sparkplug_b_capture import CaptureReader, CaptureWriter, replay
+
+######################################################################
+# Create and connect a paho client
+######################################################################
+def connect(options):
+    import paho.mqtt.client as mqtt
+    client = mqtt.Client()
+    if options.username is not None:
+        client.username_pw_set(options.username, options.password)
+    client.connect(options.server, options.port, 60)
+    return client
+######################################################################
+
+######################################################################
+# Record all messages matching the topic filters until interrupted
+######################################################################
+def record(options):
+    writer = CaptureWriter(options.file)
+    client = connect(options)
+
+    def on_message(client, userdata, msg):
+        writer.write(msg.topic, msg.payload)
+
+    def on_connect(client, userdata, flags, rc):
+        for topic in options.topic:
+            client.subscribe(topic)
+
+    client.on_connect = on_connect
+    client.on_message = on_message
+    print("Recording to " + options.file + ", press Ctrl-C to stop")
+    try:
+        client.loop_forever()
+    except KeyboardInterrupt:
+        pass
+    writer.close()
+    print("Recorded %d messages" % writer.count)
+######################################################################
+
+######################################################################
+# Republish a capture to a server, or only read it with --dry-run
+######################################################################
+def replayCapture(options):
+    if options.dry_run:
+        publish = lambda topic, payload: None
+    else:
+        client = connect(options)
+        client.loop_start()
+        publish = lambda topic, payload: client.publish(topic, bytes(payload), 0, False)
+
+    speed = None if options.max_speed else options.speed
+    with CaptureReader(options.file) as reader:
+        started = time.time()
+        count = replay(reader, publish, speed, options.topic)
+        elapsed = max(time.time() - started, 1e-9)
+    print("Replayed %d messages in %.2f s (%.0f msgs/s)" % (count, elapsed, count / elapsed))
+
+    if not options.dry_run:
+        client.loop_stop()
+        client.disconnect()
+######################################################################
+
+######################################################################
+# Print a summary of a capture
+######################################################################
+def info(options):
+    count = 0
+    size = 0
+    topics = set()
+    first = last = None
+    with CaptureReader(options.file) as reader:
+        for receiveTime, topic, payload in reader:
+            if first is None:
+                first = receiveTime
+            last = receiveTime
+            count += 1
+            size += len(payload)
+            topics.add(topic)
+    print("%d messages, %d payload bytes, %d topics, %.1f s" % (count, size, len(topics), (last - first) if count else 0))
+######################################################################
+
+######################################################################
+# Main Application
+######################################################################
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Capture and replay Sparkplug traffic")
+    parser.add_argument("--server", default="localhost")
+    parser.add_argument("--port", type=int, default=1883)
+    parser.add_argument("--username", default=None)
+    parser.add_argument("--password", default=None)
+    commands = parser.add_subparsers(dest="command")
+
+    recordParser = commands.add_parser("record", help="record traffic to a capture file")
+    recordParser.add_argument("file")
+    recordParser.add_argument("--topic", action="append", default=None, help="topic filter, may be repeated (default spBv1.0/#)")
+
+    replayParser = commands.add_parser("replay", help="republish a capture file")
+    replayParser.add_argument("file")
+    replayParser.add_argument("--topic", action="append", default=None, help="only replay topics matching this filter, may be repeated")
+    replayParser.add_argument("--speed", type=float, default=1.0, help="timing scale, 2 replays twice as fast as recorded")
+    replayParser.add_argument("--max-speed", action="store_true", help="ignore the recorded timing")
+    replayParser.add_argument("--dry-run", action="store_true", help="read the capture without publishing")
+
+    infoParser = commands.add_parser("info", help="summarize a capture file")
+    infoParser.add_argument("file")
+
+    options = parser.parse_args()
+    if options.command == "record":
+        if options.topic is None:
+            options.topic = ["spBv1.0/#"]
+        record(options)
+    elif options.command == "replay":
+        replayCapture(options)
+    elif options.command == "info":
+        info(options)
+    else:
+        parser.print_help()
+######################################################################
@@ -0,0 +1,205 @@
+#!/usr/bin/python3
+#/********************************************************************************
+# * Copyright (c) 2014, 2018 Cirrus Link Solutions and others
+# *
+# * This program and the accompanying materials are made available under the
+# * terms of the Eclipse Public License 2.0 which is available at
+# * http://www.eclipse.org/legal/epl-2.0.
+# *
+# * SPDX-License-Identifier: EPL-2.0
+# *
+# * Contributors:
+# *   Cirrus Link Solutions - initial implementation
+# ********************************************************************************/
+import sys
+sys.path.insert(0, "../../../client_libraries/python/")
+
+import argparse
+import asyncio
+import random
+import string
+import time
+
+import sparkplug_b_pb2
+from sparkplug_b import addMetric, MetricDataType
+from sparkplug_b_edge import EdgeNode
+from sparkplug_b_transport import AsyncioMqttTransport, LoopbackBroker, LoopbackTransport
+
+######################################################################
+# Random value generators for the datatypes which can be simulated
+######################################################################
+_generators = {
+    "Int8" : lambda: random.randint(-2**7, 2**7 - 1),
+    "Int16" : lambda: random.randint(-2**15, 2**15 - 1),
+    "Int32" : lambda: random.randint(-2**31, 2**31 - 1),
+    "Int64" : lambda: random.randint(-2**63, 2**63 - 1),
+    "UInt8" : lambda: random.randint(0, 2**8 - 1),
+    "UInt16" : lambda: random.randint(0, 2**16 - 1),
+    "UInt32" : lambda: random.randint(0, 2**32 - 1),
+    "UInt64" : lambda: random.randint(0, 2**64 - 1),
+    "Float" : lambda: random.uniform(-1000, 1000),
+    "Double" : lambda: random.uniform(-1000, 1000),
+    "Boolean" : lambda: random.choice([True, False]),
+    "String" : lambda: ''.join(random.choice(string.ascii_lowercase) for i in range(12)),
+    "DateTime" : lambda: int(round(time.time() * 1000)),
+}
+######################################################################
+
+######################################################################
+# Counters shared by all simulated nodes
+######################################################################
+class Statistics:
+    def __init__(self):
+        self.messages = 0
+        self.bytes = 0
+        self.buildTime = 0.0
+        self.serializeTime = 0.0
+        self.births = 0
+        self.deaths = 0
+
+    def report(self, elapsed):
+        messages = max(self.messages, 1)
+        print("%d msgs in %.1f s: %.0f msgs/s, %.0f bytes/s, build %.1f us/msg, serialize %.1f us/msg, %d births, %d deaths" % (
+                self.messages, elapsed, self.messages / elapsed, self.bytes / elapsed,
+                self.buildTime / messages * 1e6, self.serializeTime / messages * 1e6, self.births, self.deaths))
+######################################################################
+
+######################################################################
+# One simulated edge node with its devices.  Each node keeps its own
+# seq counter as the sparkplug_b module level counter is shared by
+# every node in the process.
+######################################################################
+class SimulatedNode:
+    def __init__(self, options, stats, transport, index):
+        self.options = options
+        self.stats = stats
+        self.node = EdgeNode(transport, options.group, "Load Node %d" % index, self.publishBirth)
+        self.devices = ["Device %d" % device for device in range(options.devices)]
+        self.types = [getattr(MetricDataType, options.types[metric % len(options.types)]) for metric in range(options.metrics)]
+        self.generators = [_generators[options.types[metric % len(options.types)]] for metric in range(options.metrics)]
+        self.seq = 0
+
+    def newPayload(self):
+        payload = sparkplug_b_pb2.Payload()
+        payload.timestamp = int(round(time.time() * 1000))
+        payload.seq = self.seq
+        self.seq = (self.seq + 1) % 256
+        return payload
+
+    async def send(self, topic, payload, started):
+        built = time.perf_counter()
+        data = payload.SerializeToString()
+        serialized = time.perf_counter()
+        await self.node.transport.publish(topic, data)
+
+        self.stats.messages += 1
+        self.stats.bytes += len(data)
+        self.stats.buildTime += built - started
+        self.stats.serializeTime += serialized - built
+
+    async def publishBirth(self, node):
+        started = time.perf_counter()
+        self.seq = 0
+        payload = self.newPayload()
+        addMetric(payload, "bdSeq", None, MetricDataType.Int64, node.deathPayload.metrics[0].long_value)
+        addMetric(payload, "Node Control/Rebirth", 0, MetricDataType.Boolean, False)
+        await self.send(node.nodeTopic("NBIRTH"), payload, started)
+
+        for device in self.devices:
+            started = time.perf_counter()
+            payload = self.newPayload()
+            for metric in range(self.options.metrics):
+                addMetric(payload, "Metric %d" % metric, metric + 1, self.types[metric], self.generators[metric]())
+            await self.send(node.deviceTopic("DBIRTH", device), payload, started)
+        self.stats.births += 1
+
+    async def publishData(self, node):
+        changed = max(1, int(round(self.options.metrics * self.options.change_rate)))
+        for device in self.devices:
+            started = time.perf_counter()
+            payload = self.newPayload()
+            for metric in random.sample(range(self.options.metrics), changed):
+                addMetric(payload, None, metric + 1, self.types[metric], self.generators[metric]())
+            await self.send(node.deviceTopic("DDATA", device), payload, started)
+
+    ##################################################################
+    # Run the node, dying and being reborn every 'churn' seconds
+    ##################################################################
+    async def run(self, deadline):
+        self.node.addScanTask(self.publishData, 1000.0 / self.options.rate)
+        loop = asyncio.get_event_loop()
+        # Spread the nodes over the first publish period
+        await asyncio.sleep(random.uniform(0, 1.0 / self.options.rate))
+        while True:
+            await self.node.start()
+            remaining = deadline - loop.time()
+            if self.options.churn > 0 and self.options.churn < remaining:
+                await asyncio.sleep(self.options.churn)
+                await self.node.stop()
+                self.stats.deaths += 1
+            else:
+                await asyncio.sleep(max(0, remaining))
+                await self.node.stop()
+                return
+######################################################################
+
+######################################################################
+# Create the transport of one node
+######################################################################
+def createTransport(options, broker, index):
+    if broker is not None:
+        return LoopbackTransport(broker)
+    return AsyncioMqttTransport(options.server, options.port, 60, "load-node-%d" % index,
+            options.username, options.password)
+######################################################################
+
+######################################################################
+# Print the statistics every 'interval' seconds
+######################################################################
+async def reportPeriodically(stats, interval, started):
+    while True:
+        await asyncio.sleep(interval)
+        stats.report(time.perf_counter() - started)
+######################################################################
+
+async def main(options):
+    stats = Statistics()
+    broker = LoopbackBroker() if options.server == "loopback" else None
+    nodes = [SimulatedNode(options, stats, createTransport(options, broker, index), index) for index in range(options.nodes)]
+
+    loop = asyncio.get_event_loop()
+    deadline = loop.time() + options.duration
+    started = time.perf_counter()
+    reporter = loop.create_task(reportPeriodically(stats, options.interval, started))
+    await asyncio.gather(*[node.run(deadline) for node in nodes])
+    reporter.cancel()
+    stats.report(time.perf_counter() - started)
+
+######################################################################
+# Main Application
+######################################################################
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Sparkplug B load generator")
+    parser.add_argument("--server", default="loopback", help="MQTT server host, or 'loopback' for an in-process broker")
+    parser.add_argument("--port", type=int, default=1883)
+    parser.add_argument("--username", default=None)
+    parser.add_argument("--password", default=None)
+    parser.add_argument("--group", default="Sparkplug B Load")
+    parser.add_argument("--nodes", type=int, default=10, help="number of edge nodes")
+    parser.add_argument("--devices", type=int, default=10, help="devices per edge node")
+    parser.add_argument("--metrics", type=int, default=50, help="metrics per device")
+    parser.add_argument("--types", default="Int32,Double,Boolean,String", help="comma separated datatype mix")
+    parser.add_argument("--change-rate", type=float, default=0.2, help="fraction of metrics changed per DDATA")
+    parser.add_argument("--rate", type=float, default=1.0, help="DDATA payloads per second per device")
+    parser.add_argument("--churn", type=float, default=0, help="seconds between death and rebirth of each node, 0 to disable")
+    parser.add_argument("--duration", type=float, default=30, help="seconds to run")
+    parser.add_argument("--interval", type=float, default=5, help="seconds between reports")
+    options = parser.parse_args()
+
+    options.types = options.types.split(",")
+    for type in options.types:
+        if type not in _generators:
+            parser.error("Unsupported datatype: " + type)
+
+    asyncio.get_event_loop().run_until_complete(main(options))
+######################################################################